@@ -11,6 +11,7 @@ import sys
 import os
 import faulthandler
 import argparse
+import multiprocessing
 
 # PySide imports
 from PySide2.QtWidgets import QApplication
@@ -19,11 +20,15 @@ from PySide2.QtWidgets import QApplication
 from idfplus import __version__ as version
 from idfplus import config
 from idfplus.main import IDFPlus
+from idfplus.eplusio import precompile
 
 
 def process_args():
     parser = argparse.ArgumentParser()
     parser.add_argument('filename', nargs='?', default=None)
+    parser.add_argument('--precompile-idd', nargs='*', metavar='DIR', default=None,
+                        help='process the IDD files of installed EnergyPlus versions '
+                             '(and any found in DIR) before starting')
     return parser.parse_known_args()
 
 
@@ -31,6 +36,9 @@ def main():
     """Main function to start the program.
     """
 
+    # IDD files are processed in worker processes, which frozen builds must support
+    multiprocessing.freeze_support()
+
     with open(os.path.join(config.LOG_DIR, 'idfplus_error_dump.txt'), 'w') as f:
         faulthandler.enable(file=f)
 
@@ -38,6 +46,10 @@ def main():
         parsed_args, unparsed_args = process_args()
         qt_args = sys.argv[:1] + unparsed_args
 
+        # Process installed IDD files ahead of time if requested
+        if parsed_args.precompile_idd is not None:
+            precompile.precompile(precompile.find_idd_files(parsed_args.precompile_idd))
+
         # Retrieve the currently running instance or make a new one
         app = QApplication.instance()
         if app is None:
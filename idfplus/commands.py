@@ -50,10 +50,10 @@ class ObjectCmd(QUndoCommand):
         self.selection_model = self.main_window.classTable.selectionModel()
 
         # Convert indexes to source indexes for storage, then convert back later
-        indexes_source_partial = [self.model.mapToSource(ind)
-                                  for ind in self.indexes_in]
-        self.indexes_source = [self.model.sourceModel().mapToSource(ind)
-                               for ind in indexes_source_partial]
+        self.indexes_source = [self.model.mapToSource(ind) for ind in self.indexes_in]
+
+        # Remember the page of objects shown, as saved selections are relative to it
+        self.page_start = self.model.page_start
 
         # Convert selection to source indexes for storage, then convert back later
         self.selection_saved = []
@@ -73,6 +73,9 @@ class ObjectCmd(QUndoCommand):
         self.model = self.main_window.classTable.model()
         self.selection_model = self.main_window.classTable.selectionModel()
 
+        # Show the page of objects that was shown when the command was created
+        self.model.show_page(self.page_start)
+
     def update_selection(self, highlight_size=None, offset=None):
         """Ensures that the selection is up-to-date and changes it if not.
 
@@ -180,9 +183,6 @@ class ObjectCmd(QUndoCommand):
                                     QItemSelectionModel.SelectCurrent)
         self.main_window.classTable.setFocus()
 
-        # Hack to 'refresh' the class tree
-        self.main_window.classTree.expandAll()
-
 
 class NewObjectCmd(ObjectCmd):
     """Class that handles creating new objects and undoing that creation.
@@ -393,12 +393,9 @@ class ModifyObjectCmd(ObjectCmd):
         self.update_model()
 
         # Use stored source indexes to reconstruct indexes for the current model.
-        # Must do this on-the-fly due to the possibility that any layer of model
+        # Must do this on-the-fly due to the possibility that the proxy model
         # has changed significantly.
-        indexes_partial = [self.model.sourceModel().mapFromSource(ind)
-                           for ind in self.indexes_source]
-        indexes = [self.model.mapFromSource(ind)
-                   for ind in indexes_partial]
+        indexes = [self.model.mapFromSource(ind) for ind in self.indexes_source]
 
         # Call the setData method to change the values
         self.model.setData(indexes[0], self.old_value, Qt.EditRole)
@@ -422,12 +419,9 @@ class ModifyObjectCmd(ObjectCmd):
         self.setText('Modify object')
 
         # Use stored source indexes to reconstruct indexes for the current model.
-        # Must do this on-the-fly due to the possibility that any layer of model
+        # Must do this on-the-fly due to the possibility that the proxy model
         # has changed significantly.
-        indexes_partial = [self.model.sourceModel().mapFromSource(ind)
-                           for ind in self.indexes_source]
-        indexes = [self.model.mapFromSource(ind)
-                   for ind in indexes_partial]
+        indexes = [self.model.mapFromSource(ind) for ind in self.indexes_source]
 
         # Store the old value for use by undo (only once)
         if self.old_value is None:
@@ -496,12 +490,9 @@ class EditCommentCmd(ObjectCmd):
         self.update_model()
 
         # Use stored source indexes to reconstruct indexes for the current model.
-        # Must do this on-the-fly due to the possibility that any layer of model
+        # Must do this on-the-fly due to the possibility that the proxy model
         # has changed significantly.
-        indexes_partial = [self.model.sourceModel().mapFromSource(ind)
-                           for ind in self.indexes_source]
-        indexes = [self.model.mapFromSource(ind)
-                   for ind in indexes_partial]
+        indexes = [self.model.mapFromSource(ind) for ind in self.indexes_source]
 
         # Clear any current selection and select the next item
         self.main_window.classTable.clearSelection()
@@ -512,11 +503,9 @@ class EditCommentCmd(ObjectCmd):
         sel = self.main_window.classTable.selectionModel().selection()
         if not sel:
             return
-        first = sel.first().topLeft()
-        if self.obj_orientation == Qt.Horizontal:
-            ind = first.row()
-        else:
-            ind = first.column()
+        ind = self.model.mapToSource(sel.first().topLeft()).row()
+        if ind < 0:
+            return
 
         comment_list = comments.splitlines(True)
         self.main_window.idf[self.obj_class][ind].comments = comment_list
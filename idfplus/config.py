@@ -31,6 +31,7 @@ CONFIG_FILE_PATH = os.path.join(CONFIG_DIR, APP_NAME, "{}.{}".format(APP_NAME, "
 LOG_FILE_NAME = "idfplus.log"
 LOG_PATH = os.path.join(LOG_DIR, LOG_FILE_NAME)
 MAX_OBJ_HISTORY = 100
+FILTER_DELAY = 250  # ms after the last keystroke before filters are applied
 DEFAULT_IDD_VERSION = "8.6"
 
 # Make sure necessary folders exist
@@ -100,6 +101,7 @@ class Settings(dict):
         self['save_hidden_classes'] = int(settings.value("save_hidden_classes", 0) or 0)
         self['save_hide_groups'] = int(settings.value("save_hide_groups", 0) or 0)
         self['default_idd_version'] = settings.value("default_idd_version", DEFAULT_IDD_VERSION)
+        self['save_processes'] = int(settings.value("save_processes", 0) or 0)
         settings.endGroup()
         self.update_log_level()
 
@@ -144,6 +146,7 @@ class Settings(dict):
         settings.setValue("save_hidden_classes", self['save_hidden_classes'])
         settings.setValue("save_hide_groups", self['save_hide_groups'])
         settings.setValue("default_idd_version", self['default_idd_version'])
+        settings.setValue("save_processes", self['save_processes'])
         settings.endGroup()
         self.update_log_level()
 
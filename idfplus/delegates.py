@@ -54,6 +54,15 @@ class GenericDelegate(QStyledItemDelegate):
         if index in self.delegates:
             del self.delegates[index]
 
+    def reset_choices(self):
+        """Forgets the choices of all combo box delegates, so that they are found again
+        (with any new or renamed objects) the next time an editor is created
+        """
+
+        for delegate in self.delegates.values():
+            if isinstance(delegate, ChoiceDelegate):
+                delegate.model = None
+
     def getRowOrCol(self, index):
         """
 
@@ -141,20 +150,18 @@ class GenericDelegate(QStyledItemDelegate):
         :param idd_obj:
         """
 
-        # List of tags that would go in a combobox
-        combo_fields = ['minimum', 'minimum>', 'maximum', 'maximum<', 'default',
-                        'key', 'object-list']
-
-        # Cycle through field tags
+        # Cycle through fields, using the class's precomputed metadata arrays
         for i, field_key in enumerate(idd_obj.ordered_fields()):
 
-            # Create a list of tags which would go in a combo box
-            field = idd_obj[field_key]
-            matches = set(combo_fields).intersection(set(field.tags))
+            # Check for anything which would go in a combo box
+            has_choices = (idd_obj.field_defaults[i] is not None or
+                           idd_obj.field_bounds[i] or
+                           idd_obj.field_choices[i] or
+                           idd_obj.field_object_lists[i])
 
             # If there are choices then use the choiceDelegate, otherwise check type
-            if len(matches) > 0:
-                self.insertDelegate(i, ChoiceDelegate(self.main_window, field))
+            if has_choices:
+                self.insertDelegate(i, ChoiceDelegate(self.main_window, idd_obj[field_key]))
             else:
                 self.insertDelegate(i, AlphaNumericDelegate(self.main_window))
 
@@ -277,51 +284,38 @@ class ChoiceDelegate(CustomStyledItemDelegate):
         self.model = None
         self.main_window = main_window
         self.prefs = main_window.prefs
-        self.combo_fields = ['minimum>', 'minimum', 'maximum<', 'maximum', 'default',
-                             'key', 'object-list']
 
     def create_model(self):
         self.model = QStandardItemModel()
-        for tag, value in self.field.tags.items():
-            if tag in self.combo_fields:
-                if tag == 'default':
-                    self.model.insertRow(0, [QStandardItem(value),
-                                             QStandardItem(tag)])
-                elif tag == 'object-list':
-                    # Get list of all classes that are part of the object-list
-                    class_list = []
-                    if isinstance(value, set) or isinstance(value, list):
-                        for val in value:
-                            class_list.extend(self.main_window.idd.object_lists[val])
-                    else:
-                        class_list.extend(self.main_window.idd.object_lists[value])
-
-                    # Cycle through all classes in the list
-                    for cls in class_list:
-
-                        # Get the objects for the current class
-                        idf_objects = self.main_window.idf.get(cls)
-
-                        # Cycle through all idf objects in the class
-                        for obj in idf_objects:
-                            self.model.appendRow([QStandardItem(obj[0].value),
-                                                  QStandardItem(cls)])
-                elif tag == 'node':
-                    # Retrieve a list of all nodes?
-                    pass
-                elif tag == 'external-list':
-                    # Retrieve list from external file
-                    pass
-                else:
-                    # Need to check if it's a list...is there a better way?
-                    # Could make them all lists...would be annoying.
-                    if isinstance(value, list):
-                        for val in value:
-                            self.model.appendRow([QStandardItem(val),
-                                                  QStandardItem(tag)])
-                    else:
-                        self.model.appendRow([QStandardItem(value),
-                                              QStandardItem(tag)])
+        idd_object = self.field.idd_object
+        position = self.field.index
+
+        # Numeric bounds and keys
+        for tag, value in idd_object.field_bounds[position]:
+            self.model.appendRow([QStandardItem(value), QStandardItem(tag)])
+        for value in idd_object.field_choices[position]:
+            self.model.appendRow([QStandardItem(value), QStandardItem('key')])
+
+        # Get list of all classes that are part of the object-list(s)
+        class_list = []
+        for object_list in idd_object.field_object_lists[position]:
+            class_list.extend(self.main_window.idd.object_lists[object_list])
+
+        # Cycle through all classes in the list
+        for cls in class_list:
+
+            # Get the objects for the current class
+            idf_objects = self.main_window.idf.get(cls)
+
+            # Cycle through all idf objects in the class
+            for obj in idf_objects:
+                self.model.appendRow([QStandardItem(obj[0].value),
+                                      QStandardItem(cls)])
+
+        # The default always goes first
+        default = idd_object.field_defaults[position]
+        if default is not None:
+            self.model.insertRow(0, [QStandardItem(default), QStandardItem('default')])
 
     def createEditor(self, parent, option, index):
         """Creates a custom editor based on an extended QCombobox
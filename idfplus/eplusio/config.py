@@ -8,6 +8,7 @@
 
 # System imports
 import os
+import sys
 import appdirs
 
 # Constants
@@ -17,6 +18,21 @@ COMPANY_NAME = 'mindfulmodeller'
 APP_NAME = "IDFPlus"
 DATA_DIR = appdirs.user_data_dir(APP_NAME, COMPANY_NAME)
 DEFAULT_IDD_VERSION = '8.2'
+INSTALLED_IDD_NAME = 'Energy+.idd'
+INSTALLED_SCHEMA_NAME = 'Energy+.schema.epJSON'
+
+# Standard EnergyPlus install directories (glob patterns)
+if sys.platform.startswith('win'):
+    INSTALL_DIR_PATTERNS = [os.path.join(directory, 'EnergyPlusV*')
+                            for directory in [os.environ.get('SYSTEMDRIVE', 'C:') + os.sep,
+                                              os.environ.get('PROGRAMFILES'),
+                                              os.environ.get('PROGRAMFILES(X86)')]
+                            if directory]
+elif sys.platform == 'darwin':
+    INSTALL_DIR_PATTERNS = ['/Applications/EnergyPlus-*']
+else:
+    INSTALL_DIR_PATTERNS = ['/usr/local/EnergyPlus-*', '/opt/EnergyPlus-*',
+                            os.path.expanduser('~/EnergyPlus-*')]
 
 # Make sure necessary folders exist
 for directory in [DATA_DIR]:
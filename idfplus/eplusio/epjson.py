@@ -0,0 +1,439 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""This submodule reads and writes epJSON files, the JSON input format of EnergyPlus.
+
+Objects are grouped by class and keyed by name (or by class and number for classes
+without a name field). The fields of extensible groups are stored in a list under a key
+which depends on the class (eg. 'vertices'). Field and group names are read from the
+epJSON schema installed with the matching version of EnergyPlus, so files can only be
+written if it's installed. Without it, field names are derived from the IDD (in lower
+case with words separated by underscores) and the extensible groups are read from a
+list under any key. Fields which don't match stop the parsing. Numeric fields are
+written as JSON numbers, as the schema requires, unless they hold a keyword such as
+'autocalculate'.
+
+epJSON files have no comments and no empty fields, so these are lost, including empty
+fields at the end of an object. Numbers lose their formatting ('0.10' reads back as
+'0.1'). Everything else reads back to the same model.
+
+:copyright: (c) 2019 by Matt Doiron.
+:license: GPL v3, see LICENSE for more details.
+"""
+
+# System imports
+import os
+import re
+import glob
+import json
+import math
+import logging
+import tempfile
+
+# Package imports
+from . import config
+from . import idfmodel
+from .parser import IDFParser, IDFSnapshot, InvalidIDFObject, Writer
+
+# Setup logging
+log = logging.getLogger(__name__)
+
+# Constants
+EPJSON_EXTENSION = '.epjson'
+EPJSON_ENCODING = 'utf-8'
+INDENT = ' ' * 4
+
+# Classes of the installed epJSON schemas, by version
+_SCHEMA_CLASSES = dict()
+
+
+def is_epjson(file_path):
+    """Returns whether the given file path is that of an epJSON file (by extension)
+
+    :param str file_path: File path to check
+    :rtype: bool
+    """
+
+    return os.path.splitext(file_path or '')[1].lower() == EPJSON_EXTENSION
+
+
+def json_name(field_name):
+    """Returns the epJSON name of an IDD field name, eg. 'Vertex 1 X-coordinate' becomes
+    'vertex_1_x_coordinate'. A bare '\\field' tag, which parses as True, has no name.
+
+    :param str field_name: IDD field name
+    :rtype: str
+    """
+
+    if not isinstance(field_name, str):
+        return ''
+    return re.sub('[^0-9a-z]+', '_', field_name.lower()).strip('_')
+
+
+def json_value(value, numeric):
+    """Returns the epJSON version of a field value. Numbers are converted even if they
+    don't read back to the same text, eg. '1E3' becomes 1000.0.
+
+    :param str value: Field value
+    :param bool numeric: Whether the field is numeric
+    """
+
+    if numeric:
+        try:
+            return int(value)
+        except ValueError:
+            pass
+        try:
+            number = float(value)
+        except ValueError:
+            return value
+        if math.isfinite(number):
+            return number
+    return value
+
+
+def schema_classes(version):
+    """Returns the field names of each class of the given version, from the epJSON schema
+    installed with EnergyPlus in one of the standard install directories. The names of
+    each class are in its 'legacy_idd' definition: 'fields', 'extensibles' (the fields of
+    one extensible group) and 'extension' (the key of the list of extensible groups).
+
+    :param str version: IDD version (major and minor version numbers)
+    :returns: The 'legacy_idd' definition of each class (by lower case class name), or
+              None if no schema of that version is installed
+    :rtype: dict
+    """
+
+    if version in _SCHEMA_CLASSES:
+        return _SCHEMA_CLASSES[version]
+    for pattern in config.INSTALL_DIR_PATTERNS:
+        for file_path in sorted(glob.glob(os.path.join(pattern,
+                                                       config.INSTALLED_SCHEMA_NAME))):
+            try:
+                with open(file_path, encoding=EPJSON_ENCODING) as raw_json:
+                    schema = json.load(raw_json)
+            except (IOError, OSError, ValueError) as e:
+                log.debug('Could not read epJSON schema {}: {}'.format(file_path, e))
+                continue
+            schema_version = str(schema.get('epJSON_schema_version', ''))
+            if '.'.join(schema_version.split('.')[0:2]) != version:
+                continue
+            classes = {class_name.lower(): definition.get('legacy_idd', dict())
+                       for class_name, definition in schema.get('properties', dict()).items()}
+            _SCHEMA_CLASSES[version] = classes
+            log.debug('Read epJSON schema version {}: {}'.format(version, file_path))
+            return classes
+    return None
+
+
+class ClassFields(object):
+    """Maps the fields of one IDD class to and from their epJSON names.
+    """
+
+    def __init__(self, idd_object, legacy_idd=None):
+        """Prepares the field names of the given class
+
+        :param IDDObject idd_object: Class whose fields should be mapped
+        :param dict legacy_idd: Definition of the class in the epJSON schema, if known
+                                (see :func:`schema_classes`)
+        """
+
+        names = [json_name(name) or key.lower()
+                 for name, key in zip(idd_object.field_names, idd_object.field_keys)]
+        self.obj_class_display = idd_object.obj_class_display
+        self.numeric = [key.startswith('N') for key in idd_object.field_keys]
+        self.has_name = bool(names) and names[0] == 'name'
+
+        # Extensible groups start at the field tagged with 'begin-extensible'
+        size = idd_object.extensible
+        begin = None
+        if size:
+            begin = next((position for position, tags in enumerate(idd_object.field_tags)
+                          if 'begin-extensible' in tags), None)
+        self.size = size if begin is not None else None
+        self.begin = begin if begin is not None else len(names)
+        self.names = names[:self.begin]
+
+        # Group fields are named after the first group, without its number
+        self.group_names = list()
+        if self.size:
+            for name in idd_object.field_names[begin:begin + size]:
+                name = json_name(re.sub(r'\b\d+\b', '', name)) or 'field'
+                while name in self.group_names:
+                    name += '_{}'.format(len(self.group_names) + 1)
+                self.group_names.append(name)
+
+        # Prefer the names of the schema, where they match the IDD
+        legacy_idd = legacy_idd or dict()
+        schema_names = legacy_idd.get('fields', list())
+        if len(schema_names) == len(self.names):
+            self.names = list(schema_names)
+        schema_names = legacy_idd.get('extensibles', list())
+        if self.size and len(schema_names) == self.size:
+            self.group_names = list(schema_names)
+        self.group_key = legacy_idd.get('extension') if self.size else None
+        self.indexes = {name: index for index, name in enumerate(self.names)}
+        self.group_indexes = {name: offset for offset, name in enumerate(self.group_names)}
+
+    def to_json(self, values):
+        """Returns the epJSON fields of an object
+
+        :param list values: Field values of the object
+        :raises ValueError: If the object has extensible fields and their key is unknown
+        :rtype: dict
+        """
+
+        fields = dict()
+        extensions = list()
+        for index, value in enumerate(values):
+            if not value:
+                continue
+            if index < self.begin:
+                fields[self.names[index]] = json_value(value, self.numeric[index])
+            elif self.size:
+                group, offset = divmod(index - self.begin, self.size)
+                while len(extensions) <= group:
+                    extensions.append(dict())
+                numeric = self.numeric[self.begin + offset]
+                extensions[group][self.group_names[offset]] = json_value(value, numeric)
+            else:
+                log.debug('Field {} is beyond the end of the class, skipping it.'.format(index))
+        if extensions:
+            if not self.group_key:
+                raise ValueError('The epJSON schema has no key for the extensible fields '
+                                 'of {}.'.format(self.obj_class_display))
+            fields[self.group_key] = extensions
+        return fields
+
+    def from_json(self, fields, name=None):
+        """Returns the field values of an object from its epJSON fields
+
+        :param dict fields: epJSON fields of the object
+        :param str name: epJSON name of the object, if it has one
+        :raises InvalidIDFObject: If a field doesn't match the IDD, rather than losing it
+        :rtype: list
+        """
+
+        values = list()
+
+        def put(index, value):
+            if index >= len(values):
+                values.extend([''] * (index + 1 - len(values)))
+            values[index] = value if isinstance(value, str) else str(value)
+
+        def unknown(field_name):
+            return InvalidIDFObject("Unknown field '{}' in {} object '{}'."
+                                    "".format(field_name, self.obj_class_display, name))
+
+        if self.has_name and name is not None and 'name' not in fields:
+            put(0, name)
+        for field_name, value in fields.items():
+            index = self.indexes.get(field_name)
+            if index is not None:
+                if value is not None:
+                    put(index, value)
+                continue
+
+            # Without a schema, any list of objects is the extensible group
+            if not self.size or not isinstance(value, list) or \
+                    field_name != (self.group_key or field_name):
+                raise unknown(field_name)
+            for group, group_fields in enumerate(value):
+                if not isinstance(group_fields, dict):
+                    raise unknown(field_name)
+                for group_name, group_value in group_fields.items():
+                    offset = self.group_indexes.get(group_name)
+                    if offset is None:
+                        raise unknown(group_name)
+                    if group_value is not None:
+                        put(self.begin + group * self.size + offset, group_value)
+        return values
+
+
+class EPJSONParser(IDFParser):
+    """epJSON file parser, populating an :class:`IDFFile` like :class:`IDFParser` does.
+    """
+
+    def parse_epjson(self, raw_json, file_path=None):
+        """Parse the provided epJSON file and populate an IDFFile object with objects.
+
+        :param raw_json: File-like object containing the epJSON to parse
+        :param str file_path: option file path of the epJSON file
+        :raises InvalidIDFObject: If the file isn't valid JSON, or not objects by class
+        :returns: Yields a progress counter between 0 and 100
+        :rtype: generator
+        """
+
+        self.idf.file_path = file_path
+        self.idf.source = None
+        log.info('Parsing epJSON: {}'.format(file_path or 'pasted text'))
+        try:
+            data = json.load(raw_json)
+        except ValueError as e:
+            raise InvalidIDFObject('Invalid epJSON file: {}'.format(e))
+        if not isinstance(data, dict) or not all(
+                isinstance(objects, dict) and
+                all(isinstance(fields, dict) for fields in objects.values())
+                for objects in data.values()):
+            raise InvalidIDFObject('Invalid epJSON file: objects must be grouped by class.')
+
+        # Detect the version first, to select the idd file
+        version = None
+        for class_name, objects in data.items():
+            if class_name.lower() == 'version':
+                for fields in objects.values():
+                    version = fields.get('version_identifier')
+        self.assign_idd(str(version) if version is not None else None)
+        classes = schema_classes(self.idd.version) or dict()
+
+        # Prepare some variables to store the results
+        field_objects = list()
+        intern_value = idfmodel.intern_value
+        create_field = idfmodel.IDFField
+        total = sum(len(objects) for objects in data.values()) or 1
+        done = 0
+
+        for class_name, objects in data.items():
+            obj_class = intern_value(class_name.lower())
+            try:
+                class_fields = ClassFields(self.idd[obj_class], classes.get(obj_class))
+            except KeyError:
+                log.warning('Unknown class skipped: {}'.format(class_name))
+                continue
+
+            for name, fields in objects.items():
+                idf_object = idfmodel.IDFObject(self.idf, obj_class)
+                for index, value in enumerate(class_fields.from_json(fields, name)):
+                    value = intern_value(value)
+                    new_field = create_field(idf_object, value, index=index)
+                    idf_object.append(new_field)
+
+                    # Store the field in a list to be passed to SQL later
+                    if file_path is not None:
+                        field_objects.append((new_field.uuid,
+                                              obj_class,
+                                              new_field.obj_class_display,
+                                              new_field.ref_type,
+                                              value))
+                self.idf.add_objects(obj_class, idf_object, update=False)
+
+                # Yield the current progress for progress bars
+                done += 1
+                yield math.ceil(100.0 * done / total)
+
+        # Be sure we're finished at this point
+        yield 100.0
+
+        # Execute the SQL to insert the new objects
+        if file_path is not None:
+            insert_operation = "INSERT INTO idf_objects VALUES (?,?,?,?,?)"
+            self.idf.db.executemany(insert_operation, field_objects)
+            self.idf.db.commit()
+
+        log.info('Parsing epJSON complete!')
+
+
+class EPJSONWriter(object):
+    """Class to take care of writing epJSON files.
+    """
+
+    @staticmethod
+    def write_idf(idf, progress=None):
+        """Write an epJSON file from the specified idfObject
+
+        :param IDFObject idf: IDFObject to write
+        :param progress: Optional callable which will receive the progress (0 to 100)
+        """
+
+        return EPJSONWriter.write_snapshot(IDFSnapshot(idf), progress)
+
+    @staticmethod
+    def write_snapshot(snapshot, progress=None):
+        """Write an epJSON file from the specified (full) snapshot, one class at a time. Like
+        :meth:`Writer.write_snapshot`, the target is replaced in one step.
+
+        :param IDFSnapshot snapshot: Snapshot of the IDF file to write
+        :param progress: Optional callable which will receive the progress (0 to 100)
+        """
+
+        file_path = snapshot.file_path
+        log.info('Saving epJSON file: {}'.format(file_path))
+        if snapshot.source:
+            log.debug('File not written! Incremental snapshots cannot be written as epJSON.')
+            return False
+        classes = schema_classes(snapshot.version)
+        if classes is None:
+            log.warning('File not written! No epJSON schema found for version {}, which is '
+                        'installed with EnergyPlus.'.format(snapshot.version))
+            return False
+
+        # Create the temporary file next to the target, so that it can be renamed over it.
+        # Symbolic links are followed, so that the link itself isn't replaced.
+        try:
+            target_path = os.path.realpath(file_path)
+            handle, temp_path = tempfile.mkstemp(
+                prefix='.{}.'.format(os.path.basename(target_path)), suffix='.tmp',
+                dir=os.path.dirname(target_path))
+        except IOError as e:
+            log.debug('File not written! Exception!' + str(e.strerror))
+            return False
+
+        try:
+            with open(handle, 'w', encoding=EPJSON_ENCODING, newline='') as json_file:
+                eol_char = os.linesep
+                class_separator = '{'
+                written = 0
+                for idd_object, objects in snapshot.classes:
+                    class_fields = ClassFields(idd_object, classes.get(idd_object.obj_class))
+                    display = idd_object.obj_class_display
+                    used = set()
+                    chunk = ['{}{}{}{}: {{'.format(class_separator, eol_char, INDENT,
+                                                  json.dumps(display))]
+                    object_separator = ''
+                    for number, (comments, values, span) in enumerate(objects, 1):
+                        fields = class_fields.to_json(values)
+
+                        # Objects are keyed by name if they have a unique one. Otherwise,
+                        # they are numbered and their name (even if blank) is a field.
+                        name = fields.pop('name', None) if class_fields.has_name else None
+                        if not isinstance(name, str) or name in used:
+                            if class_fields.has_name:
+                                fields = dict(name=name or '', **fields)
+                            name = '{} {}'.format(display, number)
+                            while name in used:
+                                name += '_'
+                        used.add(name)
+
+                        text = json.dumps(fields, indent=4).replace('\n', eol_char + INDENT * 2)
+                        chunk.append('{}{}{}{}: {}'.format(object_separator, eol_char,
+                                                          INDENT * 2, json.dumps(name), text))
+                        object_separator = ','
+                    chunk.append('{}{}}}'.format(eol_char, INDENT))
+                    json_file.write(''.join(chunk))
+                    class_separator = ','
+
+                    written += len(objects)
+                    if progress:
+                        progress(math.floor(100 * written / snapshot.object_count))
+                json_file.write('{}{}}}{}'.format('{' if class_separator == '{' else '',
+                                                  eol_char, eol_char))
+
+                # Make sure everything is on disk before replacing the target
+                json_file.flush()
+                os.fsync(json_file.fileno())
+
+            Writer._copy_mode(target_path, temp_path)
+            Writer._replace(temp_path, target_path)
+            log.info('File written!')
+            return True
+
+        except IOError as e:
+            log.debug('File not written! Exception!' + str(e.strerror))
+            Writer._remove(temp_path)
+            return False
+        except ValueError as e:
+            log.warning('File not written! {}'.format(e))
+            Writer._remove(temp_path)
+            return False
+        except BaseException:
+            Writer._remove(temp_path)
+            raise
@@ -6,10 +6,9 @@
 :license: GPL v3, see LICENSE for more details.
 """
 
-# Package imports
-from odict.pyodict import _odict
-# from persistent.list import PersistentList
-from persistent.mapping import PersistentMapping
+# System imports
+import sys
+import functools
 
 # Unit Registry
 # Eventually store this somewhere else - put it here for now
@@ -156,6 +155,35 @@ ALLOWED_OPTIONS = {'sort_order': ['SortedOrder', 'OriginalOrderTop', 'OriginalOr
                    'save_hide_groups': ['HideGroups']}
 
 
+def _tag_values(value):
+    """Returns the value(s) of a tag as a tuple. Tags may hold nothing, one value or a list.
+
+    :param value: Value of the tag
+    :rtype: tuple
+    """
+
+    if value is None:
+        return tuple()
+    elif isinstance(value, list):
+        return tuple(value)
+    return value,
+
+
+def _ref_type(tags):
+    """Returns the type of reference defined by the given field tags, if any.
+
+    :param dict tags: Tags of the field
+    :rtype: str
+    """
+
+    if tags.get('type') == 'node':
+        return 'node'
+    for tag in tags:
+        if tag in ('reference', 'object-list'):
+            return tag
+    return None
+
+
 class IDDError(Exception):
     """Base class for IDD exceptions.
     """
@@ -172,27 +200,75 @@ class IDDError(Exception):
         super(IDDError, self).__init__(*args, **kwargs)
 
 
-class MyDict(PersistentMapping):
-    """Subclass PersistentMapping in order to override __getitem__ to always use lower case.
+# Number of recently folded keys that are kept (class names are by far the most common)
+FOLDED_KEY_CACHE_SIZE = 4096
+_MISSING = object()
+
+
+@functools.lru_cache(maxsize=FOLDED_KEY_CACHE_SIZE)
+def fold_key(key):
+    """Returns the folded (lower case) version of the given key. Folded keys are pooled,
+    and the most recently used ones are cached, so that class names are rarely lowered
+    more than once while keys from user data don't pile up.
+
+    :param str key: Key to fold
+    :rtype: str
     """
 
-    def __getitem__(self, key):
-        return super(MyDict, self).__getitem__(key.lower())
+    return sys.intern(key.lower())
+
 
+class CaseInsensitiveDict(dict):
+    """Ordered dictionary with case-insensitive string keys, always stored folded.
 
-class PODict(_odict, MyDict):
-    """Persistent ordered dictionary
+    Look-ups with keys that are already folded (by far the most common case) go straight
+    to the underlying dict. Other keys are folded through :func:`fold_key` and retried.
     """
 
-    def _dict_impl(self):
-        return MyDict
+    def __init__(self, data=(), **kwargs):
+        super(CaseInsensitiveDict, self).__init__()
+        self.update(data, **kwargs)
+
+    def __missing__(self, key):
+        folded = fold_key(key)
+        if folded is key or folded == key:
+            raise KeyError(key)
+        return dict.__getitem__(self, folded)
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, fold_key(key), value)
+
+    def __delitem__(self, key):
+        dict.__delitem__(self, fold_key(key))
+
+    def __contains__(self, key):
+        return dict.__contains__(self, key) or dict.__contains__(self, fold_key(key))
+
+    def get(self, key, default=None):
+        value = dict.get(self, key, _MISSING)
+        if value is _MISSING:
+            return dict.get(self, fold_key(key), default)
+        return value
+
+    def pop(self, key, *args):
+        return dict.pop(self, fold_key(key), *args)
+
+    def setdefault(self, key, default=None):
+        return dict.setdefault(self, fold_key(key), default)
 
+    def update(self, data=(), **kwargs):
+        items = data.items() if hasattr(data, 'items') else data
+        for key, value in items:
+            self[key] = value
+        for key, value in kwargs.items():
+            self[key] = value
 
-class IDDFile(PODict):
+
+class IDDFile(CaseInsensitiveDict):
     """Primary object representing idd file and container for idd objects.
 
-    Is a :class:`odict.pyodict` of :class:`IDDObject` s with the class type as a
-    key. All keys are lower case. For example:
+    Is an ordered :class:`CaseInsensitiveDict` of :class:`IDDObject` s with the class
+    type as a key. All keys are lower case. For example:
 
     .. code-block:: python
 
@@ -203,7 +279,7 @@ class IDDFile(PODict):
     def __init__(self, data=(), **kwargs):
         """Initializes the idd file
 
-        :param data: Data to be passed to :class:`PODict` constructor
+        :param data: Data to be passed to :class:`CaseInsensitiveDict` constructor
         :param str version: IDD file version
         :param str parser_version: Version of parser that was used to generate this IDD file
         """
@@ -224,15 +300,6 @@ class IDDFile(PODict):
         # Call the parent class' init method
         super(IDDFile, self).__init__(data, **kwargs)
 
-    def __reduce__(self):
-        return super(IDDFile, self).__reduce__()
-
-    def get(self, key, default=None):
-        """Override get to ensure lower case key
-        """
-
-        return super(IDDFile, self).get(key.lower(), default)
-
     # def __setitem__(self, key, value, dict_setitem=dict.__setitem__):
     #     """Override the default __setitem__ to ensure that only certain
     #     object types are allowed."""
@@ -341,11 +408,25 @@ class IDDObject(dict):
 
         # Set various attributes of the IDF object
         self._obj_class_display = kwargs.pop('obj_class_display', None)
+        self._obj_class = fold_key(self._obj_class_display) if self._obj_class_display else None
         self._group = kwargs.pop('group', None)
         self._ordered_fields = list()
         self._idd = outer
         self._extensible = None
+        self._field_count = 0
+        self._extensible_start = None
+        self._key_index = dict()
         self.tags = dict()  #: Tags belonging to this :class:`IDDObject`
+        self.field_keys = tuple()  #: Key of each field, by position
+        self.field_tags = tuple()  #: Tags of each field, by position
+        self.field_names = tuple()  #: Name ('field' tag) of each field, by position
+        self.field_ref_types = tuple()  #: Reference type of each field, by position
+        self.field_units = tuple()  #: SI units of each field, by position
+        self.field_ip_units = tuple()  #: IP units override of each field, by position
+        self.field_defaults = tuple()  #: Default value of each field, by position
+        self.field_bounds = tuple()  #: Tuple of (tag, value) numeric bounds, by position
+        self.field_choices = tuple()  #: Tuple of allowed keys of each field, by position
+        self.field_object_lists = tuple()  #: Tuple of object-list names, by position
         self.comments = kwargs.pop('comments', None)  #: Comments for this :class:`IDDObject`
         self.comments_special = kwargs.pop('comments_special', None)  #: Special comments for this :class:`IDDObject`
 
@@ -360,7 +441,17 @@ class IDDObject(dict):
         :rtype: str
         """
 
-        return self._obj_class_display.lower()
+        return self._obj_class
+
+    @property
+    def extensible(self):
+        """Read-only property containing the number of fields in the object's extensible
+        group, if it has one
+
+        :rtype: int
+        """
+
+        return self._extensible if self._extensible and self._extensible > 0 else None
 
     @property
     def obj_class_display(self):
@@ -372,15 +463,6 @@ class IDDObject(dict):
 
         return self._obj_class_display
 
-    # def index(self, key):
-    #     """Read-only property that returns the index of this field
-    #
-    #     :rtype: int
-    #     :return: The index of this field in its outer class
-    #     """
-    #
-    #     return self._ordered_fields.index(key)
-
     @property
     def group(self):
         """Read-only property containing idd object's group.
@@ -390,6 +472,55 @@ class IDDObject(dict):
 
         return self._group
 
+    def compile(self):
+        """Precomputes the lookup tables used to convert between field indexes and keys,
+        as well as the per-field metadata arrays (field_names, field_units, etc).
+
+        Must be called once all fields have been added (the IDD parser does this). The
+        tables are saved along with the processed IDD file.
+        """
+
+        self._field_count = len(self._ordered_fields)
+        self._key_index = {key: i for i, key in enumerate(self._ordered_fields)}
+
+        # Metadata arrays in field order, so that hot paths need no tag look-ups
+        bound_tags = ('minimum>', 'minimum', 'maximum<', 'maximum')
+        tags = [self[key].tags for key in self._ordered_fields]
+        self.field_keys = tuple(self._ordered_fields)
+        self.field_tags = tuple(tags)
+        self.field_names = tuple(tag.get('field', '') for tag in tags)
+        self.field_ref_types = tuple(_ref_type(tag) for tag in tags)
+        self.field_units = tuple(tag.get('units') for tag in tags)
+        self.field_ip_units = tuple(tag.get('ip-units') for tag in tags)
+        self.field_defaults = tuple(tag.get('default') for tag in tags)
+        self.field_bounds = tuple(tuple((bound, tag[bound]) for bound in bound_tags
+                                        if bound in tag) for tag in tags)
+        self.field_choices = tuple(_tag_values(tag.get('key')) for tag in tags)
+        self.field_object_lists = tuple(_tag_values(tag.get('object-list')) for tag in tags)
+
+        # Fields beyond the end of the object cycle through the extensible group
+        if self._extensible and self._extensible > 0:
+            self._extensible_start = self._field_count - self._extensible - 1
+        else:
+            self._extensible_start = None
+
+    def position(self, index):
+        """Finds the position in this object of the field describing the given index.
+
+        Indexes beyond the end of an extensible object map onto its extensible group.
+
+        :param int index: The index of the field in an IDF object
+        :return: The position of the corresponding field in :meth:`ordered_fields`
+        :rtype: int
+        :raises IndexError: If the index is out of range and the object is not extensible
+        """
+
+        if -self._field_count <= index < self._field_count:
+            return index
+        if self._extensible_start is None:
+            raise IndexError('Field index out of range: {}'.format(index))
+        return self._extensible_start + index % self._extensible
+
     def key(self, index):
         """Finds the key from the given index.
 
@@ -398,19 +529,17 @@ class IDDObject(dict):
         :rtype: str
         """
 
-        try:
-            result = self._ordered_fields[index]
-        except IndexError:
-            # Test for extensible field set:
-            if self._extensible > 0:
-                field_count = len(self._ordered_fields)
-                extensible_start = field_count - self._extensible - 1
-                extensible_index = extensible_start + (index % self._extensible)
-                result = self._ordered_fields[extensible_index]
-            else:
-                raise IndexError
+        return self._ordered_fields[self.position(index)]
+
+    def index(self, key):
+        """Finds the index from the given key.
+
+        :param str key: The key of the field for which the index is to be returned
+        :return: The index of the field in this object
+        :rtype: int
+        """
 
-        return result
+        return self._key_index[key]
 
     def ordered_fields(self):
         """Read-only version of the list of field keys.
@@ -538,12 +667,22 @@ class IDDField(object):
 
     @property
     def index(self):
-        """Returns object's index
+        """Returns the position of this field in its :class:`IDDObject`, which is also its
+        position in the object's metadata arrays
 
-        :rtype: str
+        :rtype: int
+        """
+
+        return self._outer.index(self._key)
+
+    @property
+    def idd_object(self):
+        """Returns the :class:`IDDObject` to which this field belongs
+
+        :rtype: IDDObject
         """
 
-        return self._outer._ordered_fields.index(self._key)
+        return self._outer
 
     @property
     def obj_class(self):
@@ -0,0 +1,395 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""The IDD store shares identical definitions between all loaded IDD files.
+
+Most classes, field tags and memo strings are identical from one EnergyPlus version to the
+next. Each :class:`IDDFile` passed through :func:`share` has its tag dictionaries, comments,
+strings and per-field metadata arrays replaced by a single shared copy, so that several
+versions loaded side by side only cost the memory of their differences. Because the
+shared objects are also identical within one file, pickling a shared IDD file stores each
+of them only once, which keeps the on-disk cache small and quick to load.
+
+Shared definitions must be treated as read-only.
+
+The module also holds the registry of loaded IDD files (see :class:`IDDRegistry`), so that
+each version is only loaded once no matter how many models and parsers use it. Evicting a
+version from the registry trims the store down to the definitions of the versions left,
+the next time a version is acquired.
+
+:copyright: (c) 2019 by Matt Doiron.
+:license: GPL v3, see LICENSE for more details.
+"""
+
+# System imports
+import sys
+import logging
+import weakref
+import threading
+from collections import OrderedDict
+
+# Setup logging
+log = logging.getLogger(__name__)
+
+# Number of loaded IDD versions kept in memory once nothing uses them any more
+MAX_UNUSED_IDDS = 2
+
+# Per-field metadata arrays of IDDObjects which can be pooled directly
+_ARRAYS = ('field_keys', 'field_names', 'field_ref_types', 'field_units', 'field_ip_units',
+           'field_defaults', 'field_bounds', 'field_choices', 'field_object_lists')
+
+
+class IDDStore(object):
+    """Pool of definitions shared between all IDD files passed through it.
+    """
+
+    def __init__(self):
+        self._tags = dict()
+        self._tuples = dict()
+        self._lists = dict()
+        self._field_tags = dict()
+        self._ordered_fields = dict()
+        self._key_indexes = dict()
+
+        # IDD files can be shared from several threads, and the pools are swapped when
+        # trimmed, so share, trim and clear one at a time
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._tags)
+
+    def clear(self):
+        """Forgets all shared definitions. IDD files which were already shared keep theirs.
+        """
+
+        with self._lock:
+            self._tags.clear()
+            self._tuples.clear()
+            self._lists.clear()
+            self._field_tags.clear()
+            self._ordered_fields.clear()
+            self._key_indexes.clear()
+
+    def trim(self, idds):
+        """Forgets the shared definitions which none of the given IDD files use, releasing
+        those of the IDD files which are gone. The given files must already be shared.
+
+        :param idds: IDD files whose definitions should be kept
+        """
+
+        with self._lock:
+            kept = IDDStore()
+            for idd in idds:
+                kept._keep(idd)
+            tag_count = len(self._tags)
+            self._tags = kept._tags
+            self._tuples = kept._tuples
+            self._lists = kept._lists
+            self._field_tags = kept._field_tags
+            self._ordered_fields = kept._ordered_fields
+            self._key_indexes = kept._key_indexes
+        log.debug('Trimmed IDD store: {} definitions released, {} in store'.format(
+            tag_count - len(self._tags), len(self._tags)))
+
+    def _keep(self, idd):
+        """Adds the (already shared) definitions of the given IDD file to the store as they
+        are, like :meth:`share` would have.
+        """
+
+        def keep_strings(values):
+            if values is not None:
+                self._lists.setdefault(tuple(values), values)
+
+        def keep_tags(tags):
+            self._tags.setdefault(self._tags_key(tags), tags)
+            for value in tags.values():
+                if isinstance(value, list):
+                    keep_strings(value)
+
+        for idd_object in idd.values():
+            keep_tags(idd_object.tags)
+            keep_strings(idd_object.comments)
+            keep_strings(idd_object.comments_special)
+            field_tags = idd_object.field_tags
+            for tags in field_tags:
+                keep_tags(tags)
+            self._field_tags.setdefault(tuple(id(tags) for tags in field_tags), field_tags)
+            for name in _ARRAYS:
+                self.array(getattr(idd_object, name))
+            field_keys = idd_object.field_keys
+            self._ordered_fields.setdefault(field_keys, idd_object._ordered_fields)
+            self._key_indexes.setdefault(field_keys, idd_object._key_index)
+
+    @staticmethod
+    def _tags_key(tags):
+        """Returns the (hashable) key under which the given tags dictionary is stored
+        """
+
+        return tuple((tag, tuple(value) if isinstance(value, list) else value)
+                     for tag, value in tags.items())
+
+    def _value(self, value):
+        """Returns the shared version of a tag value (string, list of strings or flag).
+        """
+
+        if isinstance(value, str):
+            return sys.intern(value)
+        elif isinstance(value, list):
+            return self.strings(value)
+        return value
+
+    def strings(self, values):
+        """Returns the shared version of the given list of strings.
+
+        :param list values: List to share
+        :rtype: list
+        """
+
+        if values is None:
+            return None
+        key = tuple(values)
+        try:
+            return self._lists[key]
+        except KeyError:
+            shared = self._lists[key] = [self._value(value) for value in values]
+            return shared
+
+    def array(self, values):
+        """Returns the shared version of the given (hashable) tuple.
+
+        :param tuple values: Tuple to share
+        :rtype: tuple
+        """
+
+        return self._tuples.setdefault(values, values)
+
+    def tags(self, tags):
+        """Returns the shared version of the given tags dictionary. Tag order is preserved.
+
+        :param dict tags: Tags to share
+        :rtype: dict
+        """
+
+        key = self._tags_key(tags)
+        try:
+            return self._tags[key]
+        except KeyError:
+            shared = self._tags[key] = {sys.intern(tag): self._value(value)
+                                        for tag, value in tags.items()}
+            return shared
+
+    def share(self, idd, compile=False):
+        """Replaces the definitions in the given IDD file with shared ones.
+
+        :param IDDFile idd: IDD file whose definitions should be shared
+        :param bool compile: Rebuild the metadata arrays from the shared tags (for freshly
+                             parsed files, so that the arrays and tags share their strings)
+        :rtype: IDDFile
+        """
+
+        with self._lock:
+            return self._share(idd, compile)
+
+    def _share(self, idd, compile):
+        """Replaces the definitions in the given IDD file with shared ones, the store being
+        locked (see :meth:`share`).
+        """
+
+        tag_count = len(self._tags)
+
+        # Tags dicts are often already shared within the file (by the parser or pickle), so
+        # only look each one up once. Keep the originals alive so that their ids stay valid.
+        seen = dict()
+
+        def share_tags(tags):
+            try:
+                return seen[id(tags)][1]
+            except KeyError:
+                shared = self.tags(tags)
+                seen[id(tags)] = (tags, shared)
+                return shared
+
+        for idd_object in idd.values():
+            idd_object.tags = self.tags(idd_object.tags)
+            idd_object.comments = self.strings(idd_object.comments)
+            idd_object.comments_special = self.strings(idd_object.comments_special)
+            for field in idd_object.values():
+                field.tags = share_tags(field.tags)
+            if compile:
+                idd_object.compile()
+
+            # Point the metadata arrays at the shared tags, then pool the arrays themselves
+            # (most classes are unchanged from one version to the next)
+            field_tags = tuple(share_tags(tags) for tags in idd_object.field_tags)
+            idd_object.field_tags = self._field_tags.setdefault(
+                tuple(id(tags) for tags in field_tags), field_tags)
+            for name in _ARRAYS:
+                setattr(idd_object, name, self.array(getattr(idd_object, name)))
+            field_keys = idd_object.field_keys
+            idd_object._ordered_fields = self._ordered_fields.setdefault(
+                field_keys, idd_object._ordered_fields)
+            idd_object._key_index = self._key_indexes.setdefault(
+                field_keys, idd_object._key_index)
+
+        log.debug('Shared IDD version {}: {} new definitions, {} in store'.format(
+            idd.version, len(self._tags) - tag_count, len(self._tags)))
+        return idd
+
+
+class IDDRegistry(object):
+    """Process-wide registry of loaded IDD files, by version.
+
+    Each IDD file is loaded once and handed to every model that needs it. Users are
+    counted until they are garbage collected; versions which are no longer used are kept
+    in memory, least recently used first, up to :attr:`max_unused` of them. When a
+    version is evicted, the given :class:`IDDStore` is trimmed to the versions left. Users
+    are released by the garbage collector, possibly while the store is in use, so the
+    trim waits for the next call to :meth:`acquire`.
+    """
+
+    def __init__(self, max_unused=MAX_UNUSED_IDDS, store=None):
+        self.max_unused = max_unused  #: Number of unused versions kept in memory
+        self._store = store
+        self._trim_store = False
+        self._idds = dict()
+        self._users = dict()
+        self._unused = OrderedDict()
+
+        # Users can be released by the garbage collector at any time, so use a
+        # reentrant lock
+        self._lock = threading.RLock()
+
+    def __contains__(self, version):
+        return version in self._idds
+
+    def users(self, version):
+        """Returns the number of (live) users of the given version
+
+        :param str version: IDD version
+        :rtype: int
+        """
+
+        return self._users.get(version, 0)
+
+    def acquire(self, version, user, load):
+        """Returns the IDD file of the given version, loading it if needed. The IDD file
+        is kept in the registry for as long as the user is alive.
+
+        :param str version: IDD version
+        :param user: Object using the IDD file (such as an IDFFile), which must support
+                     weak references
+        :param load: Callable loading the IDD file of a given version if it's not loaded
+        :rtype: IDDFile
+        """
+
+        # Release the definitions only evicted versions used (without holding the registry
+        # lock, which users being released in the middle of a share would wait for)
+        with self._lock:
+            trim_store = self._trim_store
+            self._trim_store = False
+            idds = list(self._idds.values())
+        if trim_store:
+            self._store.trim(idds)
+
+        with self._lock:
+            idd = self._idds.get(version)
+        if idd is None:
+            loaded = load(version)
+            with self._lock:
+                idd = self._idds.setdefault(version, loaded)
+            log.debug('IDD version {} loaded into the registry'.format(version))
+
+        with self._lock:
+            self._users[version] = self._users.get(version, 0) + 1
+            self._unused.pop(version, None)
+        weakref.finalize(user, self._release, version)
+        return idd
+
+    def _release(self, version):
+        """Called when a user of the given version is garbage collected
+        """
+
+        with self._lock:
+            count = self._users.get(version, 0) - 1
+            if count > 0:
+                self._users[version] = count
+                return
+            self._users.pop(version, None)
+            if version not in self._idds:
+                return
+
+            # Keep the version around in case it's needed again, evicting the oldest ones
+            self._unused[version] = None
+            evicted = False
+            while len(self._unused) > self.max_unused:
+                old_version, _ = self._unused.popitem(last=False)
+                self._idds.pop(old_version, None)
+                evicted = True
+                log.debug('IDD version {} evicted from the registry'.format(old_version))
+
+            # Release the definitions only the evicted versions used, once it's safe
+            if evicted and self._store is not None:
+                self._trim_store = True
+
+    def discard(self, version):
+        """Forgets the given version (when it was reprocessed, for example). Current users
+        keep the IDD file they have.
+
+        :param str version: IDD version
+        """
+
+        with self._lock:
+            self._idds.pop(version, None)
+            self._unused.pop(version, None)
+
+    def clear(self):
+        """Forgets all loaded versions. Current users keep the IDD files they have.
+        """
+
+        with self._lock:
+            self._idds.clear()
+            self._unused.clear()
+
+
+_store = IDDStore()
+_registry = IDDRegistry(store=_store)
+
+
+def share(idd, compile=False):
+    """Shares the definitions in the given IDD file with all other loaded IDD files
+    (see :meth:`IDDStore.share`).
+
+    :param IDDFile idd: IDD file whose definitions should be shared
+    :param bool compile: Rebuild the metadata arrays from the shared tags
+    :rtype: IDDFile
+    """
+
+    return _store.share(idd, compile)
+
+
+def clear():
+    """Forgets all shared definitions (see :meth:`IDDStore.clear`).
+    """
+
+    _store.clear()
+
+
+def acquire(version, user, load):
+    """Returns the loaded IDD file of the given version for the given user, loading it
+    only if needed (see :meth:`IDDRegistry.acquire`).
+
+    :param str version: IDD version
+    :param user: Object using the IDD file, such as an IDFFile
+    :param load: Callable loading the IDD file of a given version
+    :rtype: IDDFile
+    """
+
+    return _registry.acquire(version, user, load)
+
+
+def discard(version):
+    """Forgets the loaded IDD file of the given version (see :meth:`IDDRegistry.discard`).
+
+    :param str version: IDD version
+    """
+
+    _registry.discard(version)
@@ -7,16 +7,37 @@
 """
 
 # System imports
+import sys
 import uuid
 import sqlite3
+from collections import Counter
 
 # Package imports
 from . import config
-from .iddmodel import UNITS_REGISTRY, UNIT_TYPES, ALLOWED_OPTIONS, IDDObject, IDDFile
+from .iddmodel import (UNITS_REGISTRY, UNIT_TYPES, ALLOWED_OPTIONS, IDDObject, IDDFile,
+                       CaseInsensitiveDict)
 
 # Investigate as replacement for large lists
 # https://pypi.python.org/pypi/blist
 
+# Shared, immutable stand-in for the comments of objects that have none
+NO_COMMENTS = tuple()
+
+
+def intern_value(value):
+    """Returns the pooled copy of the given string so that it is stored only once.
+
+    Large models repeat the same values (node names, schedule names, 'Autosize', class
+    names, etc) many times. Anything that is not a string is returned unchanged.
+
+    :param str value: Value to pool
+    :rtype: str
+    """
+
+    if type(value) is str:
+        return sys.intern(value)
+    return value
+
 
 class IDFError(Exception):
     """Base class for IDF exceptions.
@@ -32,10 +53,10 @@ class IDFError(Exception):
         super(IDFError, self).__init__(*args, **kwargs)
 
 
-class IDFFile(dict):
+class IDFFile(CaseInsensitiveDict):
     """Primary object representing IDF file and container for IDF objects.
 
-    This class is an :class:`dict` of lists of
+    This class is a :class:`CaseInsensitiveDict` of lists of
     :class:`IDFObject` with the class type as a key. Class keys are always lower case.
     For example:
 
@@ -59,12 +80,40 @@ class IDFFile(dict):
         self.options = list()  #: List of options that may have been found in IDF file
         self._version = None
         self.si_units = True  #: Boolean representing whether SI units are to be displayed
+        self.source = None  #: SourceFile this file was read from or saved to, if any
         self._uuid = str(uuid.uuid4())
         self._init_db()
         self.field_registry = dict()  #: Dictionary containing a registry of fields
+        self._object_lengths = CaseInsensitiveDict()
+        self._listeners = list()
+
+    def add_listener(self, listener):
+        """Registers a callable to be told when objects are added to or removed from a
+        class. It receives the (lower case) name of the class.
+
+        :param listener: Callable taking the name of a class
+        """
+
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """Stops telling the given callable about added and removed objects
+
+        :param listener: Callable registered with :meth:`add_listener`
+        """
+
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _objects_changed(self, obj_class):
+        """Tells listeners that objects were added to or removed from the given class
 
-    def __getitem__(self, obj_class):
-        return super(IDFFile, self).__getitem__(obj_class.lower())
+        :param str obj_class: Class of the objects
+        """
+
+        for listener in self._listeners:
+            listener(obj_class.lower())
 
     def _init_db(self):
         """Initialize the SQLite database to store field values for search
@@ -89,8 +138,7 @@ class IDFFile(dict):
 
         # Prepare the idd file
         from . import parser
-        idd_parser = parser.IDDParser()
-        self._idd = idd_parser.load_idd(config.DEFAULT_IDD_VERSION)
+        self._idd = parser.IDDParser.acquire_idd(config.DEFAULT_IDD_VERSION, self)
         self.update((k, list()) for k, v in self._idd.items())
 
         # Create the only mandatory object (version)
@@ -128,6 +176,7 @@ class IDFFile(dict):
 
         self._idd = idd
         self._version = idd.version
+        self._object_lengths.clear()
         self._populate_obj_classes()
 
     def reference_tree_data(self, obj_class, index):
@@ -268,11 +317,55 @@ class IDFFile(dict):
 
         return self.get(obj_class, None)
 
-    def get(self, key, default=None):
-        """Override get in order to ensure lower case obj_class names
+    def max_object_length(self, obj_class):
+        """Returns the number of fields of the longest object in the specified class.
+
+        The object lengths of a class are counted the first time they are needed, then kept
+        up to date by :meth:`add_objects`, :meth:`remove_objects` and
+        :meth:`allocate_fields`. Objects added to a class any other way are detected by
+        their count and trigger a recount. Objects which grow or shrink any other way must
+        be passed to :meth:`object_resized`.
+
+        :param str obj_class: Object class of IDF objects to measure
+        :rtype: int
+        """
+
+        objects = self.get(obj_class)
+        if not objects:
+            return 0
+
+        lengths = self._object_lengths.get(obj_class)
+        if lengths is None or sum(lengths.values()) != len(objects):
+            lengths = Counter(len(obj) for obj in objects)
+            self._object_lengths[obj_class] = lengths
+        return max(lengths)
+
+    def object_resized(self, idf_object):
+        """Called when fields were added to or removed from an object other than by
+        :meth:`allocate_fields`. The object lengths of its class are counted again when
+        next needed.
+
+        :param IDFObject idf_object: Object which changed length
+        """
+
+        self._object_lengths.pop(idf_object.obj_class, None)
+
+    def _count_lengths(self, obj_class, objects, increment):
+        """Updates the counted object lengths of a class (if they were counted)
+
+        :param str obj_class: Object class of the objects
+        :param list(IDFObject) objects: Objects being added or removed
+        :param int increment: 1 for added objects, -1 for removed ones
         """
 
-        return super(IDFFile, self).get(key.lower(), default)
+        lengths = self._object_lengths.get(obj_class)
+        if lengths is None:
+            return
+        for obj in objects:
+            length = len(obj)
+            lengths[length] += increment
+            if lengths[length] <= 0:
+                del lengths[length]
 
     def get_objects(self, key, index, count=None):
         """Returns the specified range of objects.
@@ -320,6 +413,7 @@ class IDFFile(dict):
 
         # Insert the new object(s)
         self[obj_class][position:position] = new_objects
+        self._count_lengths(obj_class, new_objects, 1)
 
         # Conditionally update the index
         if update is True:
@@ -331,6 +425,8 @@ class IDFFile(dict):
                 if field:
                     self.field_registry[field.uuid] = field
 
+        if self._listeners:
+            self._objects_changed(obj_class)
         return len(new_objects)
 
     def _index_objects(self, new_objects):
@@ -418,7 +514,10 @@ class IDFFile(dict):
         if index_field < max_field_count:
             extra_field_count = index_field - current_field_count + 1
             extra_fields = extra_field_count * [None]
+            self._count_lengths(obj_class, [idf_object], -1)
             idf_object.extend(extra_fields)
+            idf_object.touch()
+            self._count_lengths(obj_class, [idf_object], 1)
 
             # Create a new field object, give it a value and save it
             field = IDFField(idf_object, key=idd_object.key(index_field))
@@ -439,6 +538,8 @@ class IDFFile(dict):
         # Deindex and delete objects
         self._deindex_objects(objects_to_delete)
         del self[obj_class][first_row:last_row]
+        self._count_lengths(obj_class, objects_to_delete, -1)
+        self._objects_changed(obj_class)
 
     def units(self, field):
         """Returns the given field's current display units.
@@ -451,7 +552,9 @@ class IDFFile(dict):
             return None
 
         # Look-up the default units
-        units = field.tags.get('units')
+        idd_object = field.idd_object
+        position = field.position
+        units = idd_object.field_units[position]
 
         # Check for special cases where units are based on another field
         if units:
@@ -474,7 +577,7 @@ class IDFFile(dict):
             return units
         else:
             # Otherwise check for special ip-units exceptions
-            ip_units = field.tags.get('ip-units')
+            ip_units = idd_object.field_ip_units[position]
             if ip_units:
                 return ip_units
             else:
@@ -491,13 +594,13 @@ class IDFFile(dict):
         :rtype: str
         """
 
-        # Get the idd field corresponding to this IDF field
-        idd_object = self.idd.idd_object(field.obj_class)
-        idd_field = idd_object[field.key]
+        # Get the position of this IDF field in its idd object's metadata arrays
+        idd_object = field.idd_object
+        position = field.position
 
         # Look-up the default units and any ip-unit exceptions
-        units = idd_field.tags.get('units')
-        ip_units = idd_field.tags.get('ip-units')
+        units = idd_object.field_units[position]
+        ip_units = idd_object.field_ip_units[position]
 
         # Check for another special case where there is no direct indicator of units
         if field.obj_class == 'schedule:compact' and not units and field.index > 1:
@@ -554,9 +657,8 @@ class IDFFile(dict):
         """
 
         based_on_field_key = units.split()[-1]
-        based_on_field_idd = self.idd.field(field.obj_class, based_on_field_key)
-        index = based_on_field_idd.index
         try:
+            index = field.idd_object.index(based_on_field_key)
             based_on_field = field._outer[index]
             actual_units = UNIT_TYPES.get(based_on_field.value)
         except (IndexError, KeyError):
@@ -668,8 +770,8 @@ class IDFObject(list):
 
     # Using slots simplifies the internal structure of the object and makes
     # it more memory efficiency
-    __slots__ = ['comments', 'comments_special', '_outer', '_obj_class',
-                 '_uuid', '_idd_object']
+    __slots__ = ['_comments', 'comments_special', '_outer', '_obj_class',
+                 '_uuid', '_idd_object', '_span', '_search_text']
 
     def __init__(self, outer, obj_class, **kwargs):
         """Initialize the IDF object
@@ -682,12 +784,14 @@ class IDFObject(list):
         """
 
         # Set various attributes of the IDF object
-        self.comments = list()  #: Comments for this :class:`IDFObject`
-        self.comments_special = list()  #: Special comments for this :class:`IDFObject`
-        self._obj_class = obj_class
+        self._comments = NO_COMMENTS
+        self.comments_special = NO_COMMENTS  #: Special comments for this :class:`IDFObject`
+        self._obj_class = intern_value(obj_class)
         self._outer = outer
         self._uuid = None
         self._idd_object = None
+        self._span = None
+        self._search_text = None
 
         # Call the parent class' init method
         super(IDFObject, self).__init__(**kwargs)
@@ -703,6 +807,64 @@ class IDFObject(list):
         field_str += ';'
         return field_str
 
+    @property
+    def comments(self):
+        """Comments for this :class:`IDFObject`
+
+        :rtype: list
+        """
+
+        return self._comments
+
+    @comments.setter
+    def comments(self, new_comments):
+        """Sets the comments for this :class:`IDFObject`, which then needs to be rewritten
+
+        :param list new_comments: New comments
+        """
+
+        self._comments = new_comments
+        self._span = None
+
+    @property
+    def span(self):
+        """Read-only property containing the (start, end) byte offsets of this object in
+        the file it was last read from or saved to, or None if it was modified since then
+
+        :rtype: tuple
+        """
+
+        return self._span if self._span.__class__ is tuple else None
+
+    def touch(self):
+        """Marks this object as modified, so that it will be rewritten on the next save
+        """
+
+        self._span = None
+        self._search_text = None
+
+    def search_text(self, si_units=True):
+        """Returns the text matched by the class table filter: the object's field values,
+        one per line, as displayed in the given unit system. The text is built when first
+        needed, then kept until a field changes.
+
+        :param bool si_units: Whether values should be in SI (or IP) units
+        :rtype: str
+        """
+
+        texts = self._search_text
+        if texts is None:
+            texts = self._search_text = dict()
+        text = texts.get(si_units)
+        if text is None:
+            if si_units:
+                values = [field._value if field else '' for field in self]
+            else:
+                to_ip = self._outer.to_ip
+                values = [to_ip(field) if field else '' for field in self]
+            text = texts[si_units] = '\n'.join(values)
+        return text
+
     @property
     def obj_class_display(self):
         """Read-only property of class containing display-friendly object class
@@ -751,7 +913,7 @@ class IDFObject(list):
 
         def new_field(field):
             if field:
-                new = IDFField(self, field._value, key=field._key,
+                new = IDFField(self, intern_value(field._value), key=field._key,
                                tags=field._tags, index=field._index)
             else:
                 new = None
@@ -770,8 +932,8 @@ class IDFObject(list):
         """
 
         idd_object = self.idd_object
-        for i, idd_field in enumerate(idd_object.values()):
-            default = idd_field.tags.get('default', None)
+        length = len(self)
+        for i, default in enumerate(idd_object.field_defaults):
             try:
                 # If there is a field present, set its value
                 self[i].value = default
@@ -780,7 +942,9 @@ class IDFObject(list):
                 if default is None:
                     self.append(default)
                 else:
-                    self.append(IDFField(self, default, key=idd_field.key))
+                    self.append(IDFField(self, default, key=idd_object.field_keys[i]))
+        if len(self) != length:
+            self._outer.object_resized(self)
 
 
 class IDFField(object):
@@ -851,8 +1015,10 @@ class IDFField(object):
         :param str new_value: Value to become new vaule of this field
         """
 
-        # Update the value and then the IDFFile's index
-        self._value = new_value
+        # Update the (pooled) value and then the IDFFile's index
+        self._value = intern_value(new_value)
+        self._outer._span = None
+        self._outer._search_text = None
         self._outer._outer._upsert_field_index([self])
 
     @property
@@ -863,7 +1029,7 @@ class IDFField(object):
         """
 
         if not self._tags:
-            self._tags = self.idd_object[self.key].tags
+            self._tags = self.idd_object.field_tags[self.position]
         return self._tags
 
     @property
@@ -873,7 +1039,7 @@ class IDFField(object):
         :rtype: str
         """
 
-        return self.tags.get('field', str())
+        return self.idd_object.field_names[self.position]
 
     @property
     def obj_class(self):
@@ -904,6 +1070,16 @@ class IDFField(object):
             self._index = self._outer.index(self)
         return self._index
 
+    @property
+    def position(self):
+        """Read-only property that returns the position of this field's definition in its
+        :class:`IDDObject`'s metadata arrays (extensible fields share their group's position)
+
+        :rtype: int
+        """
+
+        return self.idd_object.index(self.key)
+
     @property
     def field_id(self):
         """Read-only property that returns the id of this field
@@ -929,13 +1105,7 @@ class IDFField(object):
         """
 
         if not self._ref_type:
-            ref_type_set = set(self.tags.keys()) & {'reference', 'object-list'}
-            type_tag = self.tags.get('type', None)
-
-            if type_tag == 'node':
-                self._ref_type = 'node'
-            else:
-                self._ref_type = str(list(ref_type_set)[0]) if ref_type_set else None
+            self._ref_type = self.idd_object.field_ref_types[self.position]
         return self._ref_type
 
     @property
@@ -7,16 +7,32 @@
 """
 
 # System imports
+import io
 import os
+import gc
+import errno
+import stat
 import codecs
 import math
+import mmap
 import logging
 import pickle
+import shutil
+import tempfile
+import gzip
+import lzma
+import bz2
+import itertools
+import multiprocessing
 from io import StringIO
+from contextlib import contextmanager
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
 
 # Package imports
 from . import idfmodel
 from . import iddmodel
+from . import iddstore
 from . import config
 from . import __version__
 from .iddmodel import IDDError
@@ -24,6 +40,19 @@ from .iddmodel import IDDError
 # Setup logging
 log = logging.getLogger(__name__)
 
+#: File from which the objects of an IDF file were read (or to which they were saved).
+#: Includes what is needed to check that the file is unchanged and can be reused.
+SourceFile = namedtuple('SourceFile', ['path', 'size', 'mtime', 'eol_char', 'options'])
+
+#: Compressed file formats, by extension, and how to open them given a binary file object
+#: and a mode
+COMPRESSED_FORMATS = {'.gz': lambda file_obj, mode: gzip.GzipFile(fileobj=file_obj, mode=mode),
+                      '.xz': lzma.LZMAFile,
+                      '.bz2': bz2.BZ2File}
+
+#: Minimum number of objects for which formatting is spread over worker processes
+PARALLEL_WRITE_THRESHOLD = 5000
+
 OPTIONS_LIST = ['OriginalOrderTop', 'UseSpecialFormat', 'HideGroups',
                 'ViewInIPunits', 'SortedOrder', 'HideEmptyClasses']
 COMMENT_DELIMITER_GENERAL = '!'
@@ -58,6 +87,26 @@ TAG_LIST = ['\\field',
             '\\format',
             '\\group']
 
+# Tags by their first letter (after the backslash), in the same order as in TAG_LIST
+_TAG_DISPATCH = dict()
+for _tag in TAG_LIST:
+    _TAG_DISPATCH.setdefault(_tag[1], list()).append(_tag)
+
+
+@contextmanager
+def _gc_paused():
+    """Pauses the cyclic garbage collector while building large object graphs (such as
+    loading an IDD file), which would otherwise trigger many pointless full collections.
+    """
+
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
 
 class InvalidIDFObject(Exception):
     """Exception called when an invalid/unknown idf object is encountered.
@@ -72,106 +121,667 @@ class InvalidIDFObject(Exception):
         self.message = message
 
 
+def compression(file_path):
+    """Returns the compression extension ('.gz', '.xz' or '.bz2') of the given file path,
+    or None if the file is not compressed.
+
+    :param str file_path: File path to check
+    :rtype: str
+    """
+
+    extension = os.path.splitext(file_path or '')[1].lower()
+    return extension if extension in COMPRESSED_FORMATS else None
+
+
+class CompressedTextFile(io.TextIOWrapper):
+    """Text stream reading a compressed file. Also keeps track of the position in the
+    compressed file itself, so that progress can be reported accurately.
+    """
+
+    def __init__(self, file_path, **kwargs):
+        """Opens the given compressed file for reading
+
+        :param str file_path: Path of the compressed file
+        :param kwargs: Keyword arguments for :class:`io.TextIOWrapper`
+        """
+
+        self.raw_file = open(file_path, 'rb')  #: Underlying (compressed) binary file
+        try:
+            compressed_file = COMPRESSED_FORMATS[compression(file_path)](self.raw_file, 'rb')
+            super(CompressedTextFile, self).__init__(compressed_file, **kwargs)
+        except BaseException:
+            self.raw_file.close()
+            raise
+
+    def source_position(self):
+        """Returns the number of compressed bytes read so far
+
+        :rtype: int
+        """
+
+        return self.raw_file.tell()
+
+    def close(self):
+        try:
+            super(CompressedTextFile, self).close()
+        finally:
+            self.raw_file.close()
+
+
+class SourceText(object):
+    """Text of a whole file, decoded in one step (through a memory map) and read back one
+    line at a time. Much quicker than reading the file through :func:`codecs.open`, which
+    it otherwise behaves like, and keeps track of the position in the file in bytes.
+    """
+
+    def __init__(self, file_path, encoding=None, errors='backslashreplace'):
+        """Reads and decodes the given file
+
+        :param str file_path: Path of the file to read
+        :param str encoding: Encoding of the file (defaults to config.FILE_ENCODING)
+        :param str errors: How to handle decoding errors
+        """
+
+        self.encoding = encoding or config.FILE_ENCODING
+        self.errors = errors
+        with open(file_path, 'rb') as raw_file:
+            self.size = os.fstat(raw_file.fileno()).st_size  #: Size of the file in bytes
+            if self.size:
+                with mmap.mmap(raw_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    text = codecs.decode(data, self.encoding, self.errors)
+            else:
+                text = ''
+
+        # Split lines the same way as codecs' readline. If there is one byte per character,
+        # positions in the text are also positions in the file.
+        self._single_byte = len(text) == self.size
+        self._lines = text.splitlines(True)
+        self._index = 0
+        self._position = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __iter__(self):
+        return iter(self.readline, '')
+
+    def readline(self):
+        """Returns the next line (including end of line characters), or '' at the end
+
+        :rtype: str
+        """
+
+        try:
+            line = self._lines[self._index]
+        except IndexError:
+            return ''
+        self._index += 1
+        if self._single_byte:
+            self._position += len(line)
+        else:
+            self._position += len(line.encode(self.encoding, self.errors))
+        return line
+
+    def source_position(self):
+        """Returns the number of bytes of the file read so far
+
+        :rtype: int
+        """
+
+        return self._position
+
+    def close(self):
+        self._lines = list()
+
+
+def open_idf(file_path):
+    """Opens the given IDF file for reading, decompressing it on the fly if its extension
+    is one of :data:`COMPRESSED_FORMATS`.
+
+    :param str file_path: Path of the IDF file to open
+    :returns: Text stream to pass to :meth:`IDFParser.parse_idf`
+    """
+
+    if compression(file_path):
+        # Keep the end of line characters as they are, like codecs.open does
+        return CompressedTextFile(file_path,
+                                  encoding=config.FILE_ENCODING,
+                                  errors='backslashreplace',
+                                  newline='')
+    return SourceText(file_path)
+
+
+def serialize_objects(jobs):
+    """Formats the modified objects of one or more classes as IDF text. This is a plain
+    function of plain data so that it can also run in a worker process.
+
+    :param list jobs: List of (class line, {field count: line suffixes}, entries, end of
+                      line) tuples, one per class, where entries are the snapshot's
+                      (comments, field values, span) tuples. Entries with a span are skipped.
+    :returns: List of object texts (without the blank line after them), one list per job
+    :rtype: list
+    """
+
+    results = list()
+    for obj_class_line, suffixes, entries, eol_char in jobs:
+        bodies = list()
+        for comments, values, span in entries:
+            if span is not None:
+                continue
+
+            # Write comments if there are any. Don't use '.format' here due
+            # to potential incorrect encodings introduced by user
+            lines = ["!" + comment.rstrip() + eol_char for comment in comments]
+
+            # Write the object name
+            lines.append(obj_class_line)
+
+            # Write the fields, using a ';' after the last one
+            obj_suffixes = suffixes[len(values)]
+            last = len(values) - 1
+            for i, value in enumerate(values):
+                value += ';' if i == last else ','
+                lines.append('    ' + value.ljust(23) + obj_suffixes[i])
+            bodies.append(''.join(lines))
+        results.append(bodies)
+    return results
+
+
+class IDFSnapshot(object):
+    """Plain-data copy of the contents of an :class:`IDFFile`, as needed to write it.
+
+    Taking a snapshot is much quicker than writing the file, and the snapshot can then be
+    written from another thread while the original file continues to be edited.
+
+    Incremental snapshots only copy the contents of objects which were modified since the
+    file was read or last saved. The others are copied from the source file when written.
+    Full snapshots are taken instead if the source file changed, if the options changed or
+    if the objects are no longer in the same order as in the source file.
+    """
+
+    def __init__(self, idf, incremental=False):
+        """Copies the contents of the given IDF file
+
+        :param IDFFile idf: IDF file to copy
+        :param bool incremental: Whether to only copy modified objects, if possible
+        """
+
+        self.file_path = idf.file_path  #: Path to which the snapshot will be written
+        self.version = idf.version  #: Version of the IDF file
+        self.options = list(idf.options)  #: Options of the IDF file
+        self.object_count = 0  #: Total number of objects in the snapshot
+
+        #: :class:`SourceFile` from which unmodified objects are copied, if incremental
+        self.source = self._usable_source(idf) if incremental else None
+
+        #: List of (IDDObject, list of (comments, field values, source span)) tuples, one
+        #: per non-empty class. Objects copied from the source only have a span.
+        self.classes = list()
+
+        #: Span of each object in the written file, set by the writer
+        self.spans = None
+
+        self._idf = idf
+        self._objects = list()
+        self._states = list()
+        self._token = object()
+        if not self._copy(idf, self.source):
+            log.debug('Objects were re-ordered, taking a full snapshot.')
+            self.source = None
+            self._copy(idf, None)
+
+    @staticmethod
+    def _usable_source(idf):
+        """Returns the given IDF file's source file if it can be used for incremental saves
+
+        :param IDFFile idf: IDF file whose source file should be checked
+        :rtype: SourceFile
+        """
+
+        source = idf.source
+        if source is None or source.eol_char != os.linesep or compression(idf.file_path):
+            return None
+        if source.options != tuple(idf.options):
+            return None
+        try:
+            stat_result = os.stat(source.path)
+        except OSError:
+            return None
+        if (stat_result.st_size, stat_result.st_mtime_ns) != (source.size, source.mtime):
+            log.debug('Source file changed since it was read: {}'.format(source.path))
+            return None
+        return source
+
+    def _copy(self, idf, source):
+        """Copies the IDF file's objects, or only their spans if they can be copied from
+        the given source file.
+
+        :param IDFFile idf: IDF file to copy
+        :param SourceFile source: Source file, if any
+        :returns: False if the objects are not in the same order as in the source file
+        :rtype: bool
+        """
+
+        token = self._token
+        last_end = 0
+        self.classes = list()
+        self._objects = list()
+        self._states = list()
+        self.object_count = 0
+        for obj_class, obj_list in idf.items():
+            if not obj_list:
+                continue
+            entries = list()
+            for obj in obj_list:
+                # Objects modified since the last save are marked with this snapshot's token,
+                # so that their spans are only updated if they are not modified again.
+                state = obj._span
+                if state.__class__ is not tuple:
+                    state = obj._span = token
+                elif source is not None:
+                    if state[0] < last_end:
+                        return False
+                    last_end = state[1]
+                    entries.append((None, None, state))
+                    self._objects.append(obj)
+                    self._states.append(state)
+                    continue
+                entries.append((tuple(obj.comments),
+                                [(field._value or '') if field is not None else ''
+                                 for field in obj],
+                                None))
+                self._objects.append(obj)
+                self._states.append(state)
+            self.classes.append((idf._idd[obj_class], entries))
+            self.object_count += len(entries)
+        return True
+
+    def update_source(self):
+        """Records the written file as the new source file of the snapshot's IDF file, along
+        with the new span of each object not modified since the snapshot was taken. Must
+        be called from the thread which owns the IDF file, once the snapshot is written.
+        """
+
+        idf = self._idf
+        if self.spans is None:
+            idf.source = None
+            return
+        for obj, state, span in zip(self._objects, self._states, self.spans):
+            if obj._span is state:
+                obj._span = span
+        stat_result = os.stat(self.file_path)
+        idf.source = SourceFile(self.file_path, stat_result.st_size, stat_result.st_mtime_ns,
+                                os.linesep, tuple(self.options))
+
+
 class Writer(object):
     """Class to take care of writing IDF files.
     """
 
     @staticmethod
-    def write_idf(idf):
+    def write_idf(idf, progress=None, incremental=False, processes=None):
         """Write an IDF from the specified idfObject
 
         :param IDFObject idf: IDFObject to write
+        :param progress: Optional callable which will receive the progress (0 to 100)
+        :param bool incremental: Whether to copy unmodified objects from the source file
+        :param int processes: Number of worker processes used to format objects (see
+                              :meth:`write_snapshot`)
         """
 
-        idd = idf._idd
-        options = ' '.join(idf.options)
+        snapshot = IDFSnapshot(idf, incremental)
+        result = Writer.write_snapshot(snapshot, progress, processes)
+        if result:
+            snapshot.update_source()
+        return result
+
+    @staticmethod
+    def write_snapshot(snapshot, progress=None, processes=None):
+        """Write an IDF from the specified snapshot. The file is written to a temporary
+        file in the same directory, which then replaces the target file, so that the
+        target is never left partially written.
+
+        Objects can be formatted in a pool of worker processes, in batches of classes
+        which are then written in order. The output is identical either way. Small
+        snapshots are always formatted in this process.
+
+        :param IDFSnapshot snapshot: Snapshot of the IDF file to write
+        :param progress: Optional callable which will receive the progress (0 to 100)
+        :param int processes: Number of worker processes used to format objects, or None
+                              to format them in this process
+        """
+
+        options = ' '.join(snapshot.options)
         eol_char = os.linesep
-        file_path = idf.file_path
+        eol_length = len(eol_char)
+        file_path = snapshot.file_path
+        encoding = config.FILE_ENCODING
 
-        log.info('Saving file: {}'.format(file_path))
+        log.info('Saving file: {}{}'.format(file_path,
+                                             ' (incremental)' if snapshot.source else ''))
 
         # Check for special options
         use_special_format = False
-        if 'UseSpecialFormat' in idf.options:
+        if 'UseSpecialFormat' in snapshot.options:
             use_special_format = True
             log.debug('Special formatting requested, but not yet implemented.')
 
-        # Open file and write
+        # Field notes are built once per class, then expanded into per-line suffixes once
+        # per class and number of fields
+        class_notes = dict()
+        suffixes = dict()
+
+        def line_suffixes(idd_object, field_count):
+            key = (idd_object.obj_class, field_count)
+            try:
+                return suffixes[key]
+            except KeyError:
+                pass
+
+            notes = class_notes.get(idd_object.obj_class)
+            if notes is None:
+                notes = list()
+                for field_note, _units in zip(idd_object.field_names, idd_object.field_units):
+                    _units = _units or ''
+                    units = _units if not _units.startswith('BasedOnField') else None
+                    units_note = ' {{{}}}'.format(units) if units else ''
+                    if field_note:
+                        notes.append('  !- {}{}{}'.format(field_note, units_note, eol_char))
+                    else:
+                        notes.append(eol_char)
+                class_notes[idd_object.obj_class] = notes
+
+            line_notes = list()
+            for i in range(field_count):
+                try:
+                    line_notes.append(notes[idd_object.position(i)])
+                except IndexError:
+                    # More fields than the IDD allows, write them without notes
+                    line_notes.append(eol_char)
+            suffixes[key] = tuple(line_notes)
+            return suffixes[key]
+
+        # Some objects are on one line and some fields are grouped!
+        # If enabled, check IDD file for special formatting instructions
+        if use_special_format:
+            pass
+
+        # One formatting job per class, with the line suffixes for each number of fields
+        jobs = list()
+        for idd_object, objects in snapshot.classes:
+            obj_suffixes = dict()
+            for comments, values, span in objects:
+                if span is None and len(values) not in obj_suffixes:
+                    obj_suffixes[len(values)] = line_suffixes(idd_object, len(values))
+            obj_class_line = "  {},{}".format(idd_object.obj_class_display, eol_char)
+            jobs.append((obj_class_line, obj_suffixes, objects, eol_char))
+
+        # Create the temporary file next to the target, so that it can be renamed over it.
+        # Symbolic links are followed, so that the link itself isn't replaced.
         try:
-            with codecs.open(file_path, 'w',
-                             encoding=config.FILE_ENCODING,
-                             errors='backslashreplace') as idf_file:
-
-                idf_file.write("!-Generator IDF+ v{}{}".format(__version__, eol_char))
-                idf_file.write("!-Option {}{}".format(options, eol_char))
-                idf_file.write("!-NOTE: All comments with '!-' are ignored by the "
-                               "IDFEditor and are generated "
-                               "automatically.{}".format(eol_char))
-                idf_file.write("!-      Use '!' comments if they need to be retained "
-                               "when using the IDFEditor.{}".format(eol_char))
-
-                if 'OriginalOrderTop' in idf.options or 'OriginalOrderBottom' in idf.options:
-                    idf_items = idf.items()
-                else:
-                    idf_items = idf.items()  # idf.iter_ordered() (not implemented)
-
-                for obj_class, obj_list in idf_items:
-
-                    for obj in obj_list:
-                        # Write special comments if there are any
-                        # if obj['comments_special'] is not None:
-                        # for comment in obj.tags.get('comments_special', []):
-                        #     file.write("!-{}{}".format(comment, eol_char))
-
-                        # Write comments if there are any
-                        for comment in obj.comments:
-
-                            # Don't use '.format' here due to potential incorrect
-                            # encodings introduced by user
-                            idf_file.write("!"+comment.rstrip()+"{}".format(eol_char))
-
-                        # Some objects are on one line and some fields are grouped!
-                        # If enabled, check IDD file for special formatting instructions
-                        if use_special_format:
-                            pass
-
-                        # Write the object name
-                        idf_file.write("  {},{}".format(obj.obj_class_display, eol_char))
-
-                        # Write the fields
-                        field_count = len(obj)
-                        for i, field in enumerate(obj):
-                            idd_field = idd.field(obj_class, i)
-                            _units = idd_field.units or ''
-                            units = _units if not _units.startswith('BasedOnField') else None
-                            units_note = ' {{{}}}'.format(units) if units else ''
-                            field_note = idd_field.tags.get('field', None)
-                            if field_note:
-                                note = '  !- {}{}'.format(field_note, units_note)
-                            else:
-                                note = ''
+            target_path = os.path.realpath(file_path)
+            handle, temp_path = tempfile.mkstemp(
+                prefix='.{}.'.format(os.path.basename(target_path)), suffix='.tmp',
+                dir=os.path.dirname(target_path))
+        except IOError as e:
+            log.debug('File not written! Exception!' + str(e.strerror))
+            return False
 
-                            if i == field_count - 1:
-                                sep = ';'
-                            else:
-                                sep = ','
+        # Open the source file (if incremental) and check that it is still as expected
+        source_file = None
+        try:
+            if snapshot.source:
+                source_file = open(snapshot.source.path, 'rb')
+                stat_result = os.fstat(source_file.fileno())
+                if (stat_result.st_size, stat_result.st_mtime_ns) != \
+                        (snapshot.source.size, snapshot.source.mtime):
+                    raise IOError(errno.ESTALE, 'Source file changed since the snapshot')
+        except IOError as e:
+            log.debug('File not written! Exception!' + str(e.strerror))
+            Writer._remove(temp_path)
+            if source_file:
+                source_file.close()
+            return False
 
-                            if field:
-                                value = (field.value or '') + sep
+        # Open file and write. Lines are assembled in memory and written in large chunks,
+        # while runs of unmodified objects are copied straight from the source file.
+        try:
+            with open(handle, 'wb') as raw_file:
+                compressed_file = COMPRESSED_FORMATS.get(compression(file_path))
+                idf_file = compressed_file(raw_file, 'wb') if compressed_file else raw_file
+
+                chunk = list()
+                chunk.append("!-Generator IDF+ v{}{}".format(__version__, eol_char))
+                chunk.append("!-Option {}{}".format(options, eol_char))
+                chunk.append("!-NOTE: All comments with '!-' are ignored by the "
+                             "IDFEditor and are generated "
+                             "automatically.{}".format(eol_char))
+                chunk.append("!-      Use '!' comments if they need to be retained "
+                             "when using the IDFEditor.{}".format(eol_char))
+                position = sum(len(line) for line in chunk)
+
+                # New span of each object and the run of source bytes waiting to be copied
+                spans = list()
+                run = None
+                run_position = 0
+                spans_valid = True
+
+                def flush():
+                    # Write the chunk, checking that it has one byte per character
+                    text = ''.join(chunk)
+                    data = text.encode(encoding, 'backslashreplace')
+                    idf_file.write(data)
+                    del chunk[:]
+                    return len(data) == len(text)
+
+                # The snapshot is always in the current order (iter_ordered() for the
+                # OriginalOrderTop/Bottom options is not implemented)
+                written = 0
+                for (idd_object, objects), bodies in zip(snapshot.classes,
+                                                         Writer._format(jobs, processes)):
+                    bodies = iter(bodies)
+
+                    for comments, values, span in objects:
+                        if span is not None:
+                            # Unmodified object, extend the current run if it is contiguous
+                            if run is not None and span[0] == run[1] + eol_length:
+                                run[1] = span[1]
                             else:
-                                value = sep
-                            line = "    {!s:23}{}{}".format(value, note, eol_char)
-                            idf_file.write(line)
+                                if run is not None:
+                                    spans_valid &= flush()
+                                    Writer._copy_range(source_file, idf_file, *run)
+                                    chunk.append(eol_char)
+                                    position += run[1] - run[0] + eol_length
+                                run = [span[0], span[1]]
+                                run_position = position
+                            spans.append((run_position + span[0] - run[0],
+                                          run_position + span[1] - run[0]))
+                            continue
+
+                        if run is not None:
+                            spans_valid &= flush()
+                            Writer._copy_range(source_file, idf_file, *run)
+                            chunk.append(eol_char)
+                            position += run[1] - run[0] + eol_length
+                            run = None
 
                         # Add newline at the end of the object
-                        idf_file.write(eol_char)
-
+                        body = next(bodies)
+                        spans.append((position, position + len(body)))
+                        chunk.append(body)
+                        chunk.append(eol_char)
+                        position += len(body) + eol_length
+
+                    # Flush the chunk once it's large enough
+                    if len(chunk) > 8192:
+                        spans_valid &= flush()
+
+                    written += len(objects)
+                    if progress:
+                        progress(math.floor(100 * written / snapshot.object_count))
+
+                if run is not None:
+                    spans_valid &= flush()
+                    Writer._copy_range(source_file, idf_file, *run)
+                    chunk.append(eol_char)
+                spans_valid &= flush()
+
+                # Spans can only be reused from uncompressed files
+                snapshot.spans = spans if spans_valid and idf_file is raw_file else None
+
+                # Make sure everything is on disk before replacing the target
+                if idf_file is not raw_file:
+                    idf_file.close()
+                raw_file.flush()
+                os.fsync(raw_file.fileno())
+
+            # The source may be the target, which can't be replaced while open on Windows
+            if source_file:
+                source_file.close()
+                source_file = None
+
+            Writer._copy_mode(target_path, temp_path)
+            Writer._replace(temp_path, target_path)
             log.info('File written!')
             return True
 
         except IOError as e:
             log.debug('File not written! Exception!' + str(e.strerror))
+            Writer._remove(temp_path)
             return False
+        except BaseException:
+            Writer._remove(temp_path)
+            raise
+        finally:
+            if source_file:
+                source_file.close()
+
+    @staticmethod
+    def _format(jobs, processes=None):
+        """Formats the given jobs (see :func:`serialize_objects`), in a pool of worker
+        processes if requested and worthwhile.
+
+        :param list jobs: Formatting jobs, one per class
+        :param int processes: Number of worker processes, or None
+        :returns: Iterator over the object texts of each job, in order
+        """
+
+        object_count = sum(len(job[2]) for job in jobs)
+        if not processes or processes < 2 or object_count < PARALLEL_WRITE_THRESHOLD:
+            return (serialize_objects([job])[0] for job in jobs)
+
+        # Group classes into a few batches per process, to limit the number of round trips
+        batches = [[]]
+        batch_size = object_count / (processes * 4)
+        count = 0
+        for job in jobs:
+            if count >= batch_size:
+                batches.append([])
+                count = 0
+            batches[-1].append(job)
+            count += len(job[2])
+
+        # Spawn the workers, forking a multi-threaded (GUI) process isn't safe
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=processes, mp_context=context) as executor:
+            results = list(executor.map(serialize_objects, batches))
+        return itertools.chain.from_iterable(results)
+
+    @staticmethod
+    def _copy_range(source_file, target_file, start, end):
+        """Copies the given range of bytes from the source file to the end of the target
+        file, using os.sendfile where available.
+
+        :param source_file: Source file object (binary)
+        :param target_file: Target file object (binary), positioned at its end
+        :param int start: Offset of the first byte to copy
+        :param int end: Offset after the last byte to copy
+        """
+
+        count = end - start
+        target_file.flush()
+        if hasattr(os, 'sendfile'):
+            try:
+                while count > 0:
+                    sent = os.sendfile(target_file.fileno(), source_file.fileno(),
+                                       start, count)
+                    if not sent:
+                        break
+                    start += sent
+                    count -= sent
+            except OSError:
+                pass
+            if count <= 0:
+                return
+
+        # Fall back to copying blocks
+        source_file.seek(start)
+        while count > 0:
+            block = source_file.read(min(count, 1 << 20))
+            if not block:
+                raise IOError(errno.EIO, 'Source file is shorter than expected')
+            target_file.write(block)
+            count -= len(block)
+
+    @staticmethod
+    def _copy_mode(file_path, temp_path):
+        """Gives the temporary file the permissions of the file it replaces, if any,
+        otherwise those of a new file. These are found by creating a probe file next to
+        it, which applies the current umask without having to change it.
+
+        :param str file_path: Path of the file being written
+        :param str temp_path: Path of the temporary file that will replace it
+        """
+
+        try:
+            shutil.copymode(file_path, temp_path)
+            return
+        except FileNotFoundError:
+            pass
+
+        probe_path = temp_path + '.mode'
+        handle = os.open(probe_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        try:
+            mode = stat.S_IMODE(os.fstat(handle).st_mode)
+        finally:
+            os.close(handle)
+            Writer._remove(probe_path)
+        os.chmod(temp_path, mode)
+
+    @staticmethod
+    def _replace(temp_path, target_path):
+        """Replaces the target with the temporary file, in one step. A target with other
+        hard links is overwritten with the temporary file's contents instead, so that the
+        links still share them.
+
+        :param str temp_path: Path of the temporary file
+        :param str target_path: Path of the file being written (not a symbolic link)
+        """
+
+        try:
+            links = os.stat(target_path).st_nlink
+        except FileNotFoundError:
+            links = 1
+        if links > 1:
+            shutil.copyfile(temp_path, target_path)
+            Writer._remove(temp_path)
+        else:
+            os.replace(temp_path, target_path)
+
+    @staticmethod
+    def _remove(temp_path):
+        """Removes the given temporary file, if it still exists.
+
+        :param str temp_path: Path of the temporary file
+        """
+
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
 
 
 class Parser(object):
@@ -378,7 +988,10 @@ class IDDParser(Parser):
     :param IDDFile idd: IDD file to populate while parsing
     """
 
-    __parser_version__ = '0.1.2'
+    __parser_version__ = '0.1.5'
+
+    # Lines which can't be scanned quickly are handed to parse_line
+    _SLOW_CHARS = frozenset('!\t')
 
     def __init__(self, idd=None):
         """Initialize the parser
@@ -398,6 +1011,69 @@ class IDDParser(Parser):
             self.idd = iddmodel.IDDFile(parser_version=self.__parser_version__)
             log.debug('Parser reports as being version: {}'.format(self.idd.parser_version))
 
+    @staticmethod
+    def match_tag(line_lower, position):
+        """Finds the tag starting at the given position (the line's only backslash), giving
+        the same result as searching the whole line for each of :data:`TAG_LIST` in turn.
+
+        :param str line_lower: Line in lower case
+        :param int position: Position of the backslash
+        :returns: The tag (with its backslash), or None
+        :rtype: str
+        """
+
+        for tag in _TAG_DISPATCH.get(line_lower[position + 1:position + 2], ()):
+            if line_lower.startswith(tag, position):
+                return tag
+        return None
+
+    def scan_line(self, line_in):
+        """Parses a line from an IDD file, like :meth:`parse_line` but in one pass for the
+        vast majority of lines (tags, fields and blank lines). Lines with comments, tabs or
+        several backslashes are handed to :meth:`parse_line`.
+
+        :param str line_in: Raw string input (line from IDD file)
+        :returns: Tuple of fields, comments, special comments, options, tag, tag value,
+                  end of object and empty line, as in the results of :meth:`parse_line`
+        :rtype: tuple
+        """
+
+        stripped = line_in.strip()
+        backslashes = stripped.count('\\')
+        if backslashes > 1 or not self._SLOW_CHARS.isdisjoint(stripped):
+            parsed = self.parse_line(line_in)
+            tags = parsed['tags']
+            return (parsed['fields'], parsed['comments'], parsed['comments_special'],
+                    parsed['options'], tags.get('tag'), tags.get('value'),
+                    parsed['end_object'], parsed['empty_line'])
+
+        # Find the tag, if any. Its value is only found if the tag's case matches.
+        tag = value = None
+        if backslashes:
+            line_lower = stripped.lower()
+            tag = self.match_tag(line_lower, line_lower.index('\\'))
+            if tag is not None:
+                position = stripped.find(tag)
+                value = (position != -1 and stripped[position + len(tag):].lstrip()) or True
+                tag = tag[1:]
+
+        # Tag lines and blank lines have no fields
+        if not stripped or stripped[0] == '\\':
+            return [], None, '', [], tag, value, False, tag is None
+
+        # Split the line into fields at the commas, removing tags and the semicolon
+        fields = stripped.split(',')
+        if not fields[-1] and len(fields) > 1:
+            fields.pop(-1)
+        fields = [field.strip() for field in fields]
+        if backslashes:
+            fields = [field for field in fields if not field.startswith('\\')]
+        end_object = False
+        if fields and fields[-1].find(';') != -1:
+            fields[-1] = fields[-1].partition(';')[0].strip()
+            end_object = True
+        return fields, None, '', [], tag, value, end_object, not (fields or tag)
+
     def parse_idd(self, file_path, write=True):
         """Parse the provided idd file
 
@@ -417,10 +1093,8 @@ class IDDParser(Parser):
         log.info('Parsing IDD file: {} ({} bytes)'.format(file_path,
                                                           total_size))
 
-        # Open the specified file in a safe way
-        with codecs.open(file_path, 'r',
-                         encoding=config.FILE_ENCODING,
-                         errors='backslashreplace') as idd_file:
+        # Read and decode the whole file in one go
+        with SourceText(file_path) as idd_file:
 
             # Prepare some variables to store the results
             field_list = list()
@@ -437,56 +1111,52 @@ class IDDParser(Parser):
             end_object = False
             object_list_length = 0
             idd_object = iddmodel.IDDObject(idd)
+            scan_line = self.scan_line
+            last_progress = None
 
             # Cycle through each line in the file (yes, use while!)
             while True:
 
                 # Parse this line using readline (so last one is a blank)
                 line = idd_file.readline()
-                total_read += len(line)
-                line_parsed = self.parse_line(line)
+                (fields, comments, comments_special, options, tag, value,
+                 line_end_object, empty_line) = scan_line(line)
 
                 # If previous line was not the end of an object check this one
                 if end_object is False:
-                    end_object = line_parsed['end_object']
-                empty_line = line_parsed['empty_line']
+                    end_object = line_end_object
 
                 # Check for special options
-                if line_parsed['options']:
-                    idd.options.extend(line_parsed['options'])
+                if options:
+                    idd.options.extend(options)
 
                 # If there are any comments save them
-                if line_parsed['comments']:
-                    comment_list.append(line_parsed['comments'].rstrip() + eol_char)
+                if comments:
+                    comment_list.append(comments.rstrip() + eol_char)
 
                     # Detect file version
-                    if 'IDD_Version' in line_parsed['comments']:
-                        version_raw = line_parsed['comments'].split()[1].strip()
+                    if 'IDD_Version' in comments:
+                        version_raw = comments.split()[1].strip()
                         version = '.'.join(version_raw.split('.')[0:2])
                         idd._version = version
                         log.debug('Found idd version in idd file: {}'.format(version))
 
                 # Check for special comments and options
-                if line_parsed['comments_special']:
-                    comment_list_special.append(line_parsed['comments_special'].rstrip()
-                                                + eol_char)
+                if comments_special:
+                    comment_list_special.append(comments_special.rstrip() + eol_char)
 
                 # If there are any fields save them
-                if line_parsed['fields']:
-                    field_list.extend(line_parsed['fields'])
+                if fields:
+                    field_list.extend(fields)
 
                 # Check for the end of an object before checking for new tags
-                if (end_object and empty_line) or line_parsed['fields']:
+                if (end_object and empty_line) or fields:
                     if tag_dict:
                         tag_list.append(tag_dict)
                         tag_dict = dict()
-                    if obj_tag_dict:
-                        obj_tag_dict.update(obj_tag_dict)
 
                 # If there are any field tags for this object save them
-                if line_parsed['tags']:
-                    tag = line_parsed['tags']['tag']
-                    value = line_parsed['tags']['value']
+                if tag is not None:
 
                     # If there are tags, but no fields then these are object-level tags
                     if len(field_list) <= 1:
@@ -512,8 +1182,8 @@ class IDDParser(Parser):
                             tag_dict[tag] = value
 
                     # Check for the special group tag
-                    if line_parsed['tags']['tag'] == 'group':
-                        group = line_parsed['tags']['value']
+                    if tag == 'group':
+                        group = value
                         if group not in group_list:
                             group_list.append(group)
 
@@ -522,7 +1192,7 @@ class IDDParser(Parser):
 
                     # The first field is the object class name
                     obj_class_display = field_list.pop(0)
-                    obj_class = obj_class_display.lower()
+                    obj_class = iddmodel.fold_key(obj_class_display)
 
                     # Create IDDField objects for all fields
                     for i, field_key in enumerate(field_list):
@@ -560,6 +1230,7 @@ class IDDParser(Parser):
 
                     # Save the parsed variables in the idd_object
                     idd_object._obj_class_display = obj_class_display
+                    idd_object._obj_class = obj_class
                     idd_object._group = group
                     idd_object._ordered_fields = ordered_fields
                     idd_object.comments_special = comment_list_special
@@ -594,14 +1265,22 @@ class IDDParser(Parser):
                 if not line:
                     break
 
-                # Yield the current progress for progress bars
-                yield math.ceil(100 * total_read / total_size)
+                # Yield the current progress for progress bars, when it changes
+                total_read = idd_file.source_position()
+                progress = math.ceil(100 * total_read / total_size)
+                if progress != last_progress:
+                    last_progress = progress
+                    yield progress
 
             idd._conversions = conversions
             idd._groups = group_list
             idd._tree_model = None
             idd._object_list_length = object_list_length
 
+        # Share definitions with other loaded versions (also dedupes them within the file).
+        # This also compiles the per-field metadata arrays of every object.
+        iddstore.share(idd, compile=True)
+
         # Save changes
         if write:
             self.write_idd(idd)
@@ -619,8 +1298,34 @@ class IDDParser(Parser):
 
         file_name = config.IDD_FILE_NAME_ROOT.format(idd.version)
         idd_path = os.path.join(config.DATA_DIR, file_name)
-        with open(idd_path, 'wb') as fp:
-            pickle.dump(idd, fp, 2)
+
+        # Write to a temporary file first, so that a cache being read (or written by
+        # another process) is never seen partially written
+        handle, temp_path = tempfile.mkstemp(prefix='.{}.'.format(file_name), suffix='.tmp',
+                                             dir=config.DATA_DIR)
+        try:
+            with open(handle, 'wb') as fp:
+                pickle.dump(idd, fp, 2)
+            os.replace(temp_path, idd_path)
+        except BaseException:
+            Writer._remove(temp_path)
+            raise
+
+        # Models opened from now on should use the new version
+        iddstore.discard(idd.version)
+
+    @staticmethod
+    def acquire_idd(version, user):
+        """Returns the IDD file of the given version from the process-wide registry, loading
+        it only if no other model already did, for as long as the user is alive.
+
+        :param str version: IDD version
+        :param user: Object using the IDD file, such as an IDFFile
+        :rtype: IDDFile
+        :raise IDDError:
+        """
+
+        return iddstore.acquire(version, user, lambda v: IDDParser().load_idd(v))
 
     def load_idd(self, version):
         """Loads an idd file into the object instance variable.
@@ -641,8 +1346,15 @@ class IDDParser(Parser):
         # Check if the file name is a file and then open the idd file
         if os.path.isfile(idd_path):
             log.debug('IDD found, loading...')
-            with open(idd_path, 'rb') as fp:
-                idd = pickle.load(fp)
+            try:
+                with open(idd_path, 'rb') as fp, _gc_paused():
+                    idd = pickle.load(fp)
+            except Exception:
+                message = "This IDD file could not be loaded. It was probably " \
+                          "processed by an old and/or incompatible version of IDF+ " \
+                          "parser and must be reprocessed."
+                log.debug(message)
+                raise IDDError(message, version)
             try:
                 log.debug('Testing loaded IDD file for appropriate '
                           'version/format...')
@@ -661,6 +1373,8 @@ class IDDParser(Parser):
                     log.debug(message)
                     raise IDDError(message, version)
                 log.debug(message)
+                with _gc_paused():
+                    iddstore.share(idd)
             except AttributeError:
                 message = "Can't find required IDD file attribute " \
                           "(IDD Version or parser version)."
@@ -720,11 +1434,24 @@ class IDFParser(Parser):
         total_read = 0.0
         log.info('Parsing IDF: {} ({} bytes)'.format(file_path or 'pasted text', total_size))
 
+        # Files opened with open_idf report progress from their position in the file (in the
+        # compressed data for compressed files)
+        source_position = getattr(raw_idf, 'source_position', None)
+
         # Prepare some variables to store the results
         fields = StringIO()
         field_objects = list()
         comment_list = list()
         comment_list_special = list()
+        intern_value = idfmodel.intern_value
+
+        # Track the span of each object in the file, for incremental saves. The file encoding
+        # has one byte per character, so character offsets are also byte offsets. An object's
+        # span starts at its first line (including comments), excluding blank lines and
+        # special comments such as the header, and ends with the line containing its ';'.
+        offset = 0
+        span_start = None
+        eol_char = None
 
         # Cycle through each line in the file (yes, use while!)
         while True:
@@ -732,6 +1459,18 @@ class IDFParser(Parser):
             # Parse this line using readline (so last one is a blank)
             line = raw_idf.readline()
             total_read += len(line)
+            line_start = offset
+            offset += len(line)
+
+            # Spans can only be used if all lines have the same end of line characters
+            if eol_char is None:
+                eol_char = '\r\n' if line.endswith('\r\n') else '\n'
+            if eol_char and line and not line.endswith(eol_char):
+                eol_char = ''
+            if span_start is None:
+                stripped = line.strip()
+                if stripped and not stripped.startswith(COMMENT_DELIMITER_SPECIAL):
+                    span_start = line_start
 
             # Split out any comments and save them
             part, sep, comment = line.partition(COMMENT_DELIMITER_GENERAL)
@@ -741,7 +1480,7 @@ class IDFParser(Parser):
                     options = [x for x in OPTIONS_LIST if x in comment_cleaned]
                     self.idf.options.extend(options)
                 else:
-                    comment_list_special.append(comment_cleaned)
+                    comment_list_special.append(intern_value(comment_cleaned))
             elif sep:
                 comment_list.append(comment)
 
@@ -764,7 +1503,7 @@ class IDFParser(Parser):
             fields[-1] = fields[-1].replace(OBJECT_END_DELIMITER, '')
 
             # The first field is the object class name
-            obj_class = fields.pop(0).lower()
+            obj_class = intern_value(fields.pop(0).lower())
 
             # Detect idf file version and use it to select idd file
             if obj_class == 'version':
@@ -773,14 +1512,16 @@ class IDFParser(Parser):
             # Create a new IDF Object to contain the fields
             idf_object = idfmodel.IDFObject(self.idf, obj_class)
 
-            # Save the comment variables to the idf_object
-            idf_object.comments_special = comment_list_special
-            idf_object.comments = comment_list
-
             # Strip white spaces, end of line chars from last comment
-            if idf_object.comments:
-                last_comment = idf_object.comments[-1]
-                idf_object.comments[-1] = last_comment.rstrip()
+            if comment_list:
+                comment_list[-1] = comment_list[-1].rstrip()
+
+            # Save the comment variables to the idf_object. Most objects have no comments
+            # so share a single empty container between them instead of one per object.
+            if comment_list_special:
+                idf_object.comments_special = comment_list_special
+            if comment_list:
+                idf_object.comments = [intern_value(comment) for comment in comment_list]
 
             # Create local copies of some methods to speed lookups
             append_idf_object = idf_object.append
@@ -790,6 +1531,7 @@ class IDFParser(Parser):
             try:
                 # Create IDFField objects for all fields and add them to the IDFObject
                 for index, value in enumerate(fields):
+                    value = intern_value(value)
                     new_field = create_field(idf_object, value, index=index)
                     append_idf_object(new_field)
 
@@ -803,17 +1545,31 @@ class IDFParser(Parser):
             except IDDError:
                 self.assign_idd()
 
-            # Save the new object to the IDF
+            # Save the new object to the IDF (objects parsed from text have no source)
+            if file_path:
+                idf_object._span = (span_start, offset)
             self.idf.add_objects(obj_class, idf_object, update=False)
 
             # Reset variables for next object
             fields = StringIO()
             comment_list = list()
             comment_list_special = list()
+            span_start = None
 
             # Yield the current progress for progress bars
+            if source_position:
+                total_read = source_position()
             yield math.ceil(100.0 * total_read / total_size)
 
+        # Remember the source file so that its spans can be reused by incremental saves
+        self.idf.source = None
+        if file_path and eol_char and not compression(file_path):
+            stat_result = os.stat(file_path)
+            if stat_result.st_size == offset:
+                self.idf.source = SourceFile(file_path, stat_result.st_size,
+                                             stat_result.st_mtime_ns, eol_char,
+                                             tuple(self.idf.options))
+
         # Be sure we're finished at this point (bytes read is not always accurate!)
         yield 100.0
 
@@ -842,10 +1598,9 @@ class IDFParser(Parser):
             log.debug('Using default IDF version: {}'.format(self.default_version))
             version = self.default_version
 
-        # Attempt to load the idd file
+        # Attempt to load the idd file (or reuse it if it's already loaded)
         try:
-            idd_parser = IDDParser()
-            idd = idd_parser.load_idd(version)
+            idd = IDDParser.acquire_idd(version, self.idf)
         except IDDError as e:
             raise IDDError(e.message, e.version)
         self.idf.set_idd(idd)
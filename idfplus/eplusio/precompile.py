@@ -0,0 +1,210 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""Processes installed IDD files ahead of time, so that IDF files of any installed
+EnergyPlus version open without a trip through the IDD setup wizard.
+
+IDD files are found in the standard EnergyPlus install directories and in any given
+directories, then parsed in a pool of worker processes which each write the cache of one
+version. Versions which are already cached are skipped unless forced. Example:
+
+    python -m idfplus.eplusio.precompile
+    python -m idfplus.eplusio.precompile --force /path/to/EnergyPlus-9-0-1
+
+:copyright: (c) 2019 by Matt Doiron.
+:license: GPL v3, see LICENSE for more details.
+"""
+
+# System imports
+import os
+import sys
+import glob
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Package imports
+from . import config
+from .parser import IDDParser
+
+# Setup logging
+log = logging.getLogger(__name__)
+
+# Number of lines at the top of IDD files in which to look for the version
+VERSION_SEARCH_LINES = 50
+
+
+def find_idd_files(directories=None, standard=True):
+    """Finds IDD files in the standard EnergyPlus install directories and/or in the given
+    directories. Given directories are searched for any '.idd' file, along with their
+    immediate sub-directories for installed IDD files ('Energy+.idd'). File paths can
+    also be given directly.
+
+    :param list directories: Additional directories (or IDD files) to search
+    :param bool standard: Whether to search the standard install directories
+    :returns: Paths of the IDD files found, without duplicates
+    :rtype: list
+    """
+
+    candidates = list()
+    if standard:
+        for pattern in config.INSTALL_DIR_PATTERNS:
+            candidates.extend(sorted(glob.glob(os.path.join(pattern,
+                                                            config.INSTALLED_IDD_NAME))))
+    for directory in directories or list():
+        if os.path.isfile(directory):
+            candidates.append(directory)
+            continue
+        directory = glob.escape(directory)
+        candidates.extend(sorted(glob.glob(os.path.join(directory, '*.idd'))))
+        candidates.extend(sorted(glob.glob(os.path.join(directory, '*',
+                                                        config.INSTALLED_IDD_NAME))))
+
+    # Remove duplicates, keeping the original order
+    found = list()
+    seen = set()
+    for file_path in candidates:
+        real_path = os.path.realpath(file_path)
+        if real_path not in seen:
+            seen.add(real_path)
+            found.append(file_path)
+    return found
+
+
+def idd_version(file_path):
+    """Returns the version of the given IDD file, read from its header like the IDD parser
+    does (only major and minor version numbers), without parsing the whole file.
+
+    :param str file_path: Path of the IDD file
+    :returns: The version, or None if it can't be found
+    :rtype: str
+    """
+
+    try:
+        with open(file_path, encoding=config.FILE_ENCODING, errors='backslashreplace') as f:
+            for _, line in zip(range(VERSION_SEARCH_LINES), f):
+                if 'IDD_Version' in line:
+                    version_raw = line.partition('IDD_Version')[-1].split()
+                    if version_raw:
+                        return '.'.join(version_raw[0].split('.')[0:2])
+    except (IOError, OSError) as e:
+        log.debug('Could not read IDD file {}: {}'.format(file_path, e))
+    return None
+
+
+def cache_path(version):
+    """Returns the path of the cache of the given IDD version
+
+    :param str version: IDD version
+    :rtype: str
+    """
+
+    return os.path.join(config.DATA_DIR, config.IDD_FILE_NAME_ROOT.format(version))
+
+
+def process_idd(file_path, data_dir=None):
+    """Parses the given IDD file and writes its cache. Runs in a worker process. Any error
+    is returned rather than raised, so that one bad file doesn't stop the others.
+
+    :param str file_path: Path of the IDD file to process
+    :param str data_dir: Directory in which to write the cache (defaults to config.DATA_DIR)
+    :returns: Tuple of the file path, the version and an error message (or None)
+    :rtype: tuple
+    """
+
+    if data_dir:
+        config.DATA_DIR = data_dir
+    idd_parser = IDDParser()
+    try:
+        for _ in idd_parser.parse_idd(file_path):
+            pass
+    except Exception as e:
+        log.debug('Could not process IDD file {}'.format(file_path), exc_info=True)
+        return file_path, None, '{}: {}'.format(type(e).__name__, e)
+    return file_path, idd_parser.idd.version, None
+
+
+def precompile(file_paths, processes=None, force=False, callback=None):
+    """Processes the given IDD files in a pool of worker processes. Only one file per
+    version is processed, and versions which are already cached are skipped.
+
+    :param list file_paths: Paths of the IDD files to process
+    :param int processes: Number of worker processes (defaults to the number of CPUs)
+    :param bool force: Whether to process versions which are already cached
+    :param callback: Optional callable which will receive each result as it completes
+    :returns: List of (file path, version, error message) tuples, one per file processed
+    :rtype: list
+    """
+
+    results = list()
+    jobs = dict()
+    for file_path in file_paths:
+        version = idd_version(file_path)
+        if version is None:
+            results.append((file_path, None, 'No IDD version found'))
+        elif version in jobs:
+            log.debug('IDD version {} already found, skipping {}'.format(version, file_path))
+        elif not force and os.path.isfile(cache_path(version)):
+            log.info('IDD version {} already processed, skipping {}'.format(version,
+                                                                           file_path))
+        else:
+            jobs[version] = file_path
+
+    if not jobs:
+        return results
+
+    log.info('Processing {} IDD file(s)...'.format(len(jobs)))
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = {executor.submit(process_idd, file_path, config.DATA_DIR): file_path
+                   for file_path in jobs.values()}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                # The worker itself failed, eg. it was killed
+                result = futures[future], None, '{}: {}'.format(type(e).__name__, e)
+            if result[2]:
+                log.warning('Could not process IDD file {}: {}'.format(result[0], result[2]))
+            else:
+                log.info('Processed IDD version {}: {}'.format(result[1], result[0]))
+            results.append(result)
+            if callback:
+                callback(result)
+    return results
+
+
+def main(argv=None):
+    """Processes the IDD files of all installed EnergyPlus versions (and any given ones).
+
+    :param list argv: Command-line arguments (defaults to sys.argv)
+    :returns: Exit code (1 if any IDD file could not be processed)
+    :rtype: int
+    """
+
+    arg_parser = argparse.ArgumentParser(description=main.__doc__.splitlines()[0])
+    arg_parser.add_argument('directories', nargs='*', metavar='DIR',
+                            help='additional directories (or IDD files) to search')
+    arg_parser.add_argument('--force', action='store_true',
+                            help='process versions which are already processed')
+    arg_parser.add_argument('--processes', type=int, default=None,
+                            help='number of worker processes')
+    arg_parser.add_argument('--no-standard', action='store_true',
+                            help="don't search the standard install directories")
+    args = arg_parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    file_paths = find_idd_files(args.directories, standard=not args.no_standard)
+    if not file_paths:
+        log.info('No IDD files found.')
+        return 0
+    results = precompile(file_paths, processes=args.processes, force=args.force)
+
+    # Summarize, listing the files which failed
+    failed = [(file_path, error) for file_path, _, error in results if error]
+    log.info('Processed {} IDD file(s), {} failed.'.format(len(results), len(failed)))
+    for file_path, error in failed:
+        log.info('  {}: {}'.format(file_path, error))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -14,7 +14,6 @@ import platform
 import subprocess
 import sys
 import errno
-import codecs
 from io import StringIO
 
 # PySide2 imports
@@ -29,13 +28,16 @@ from . import delegates
 from . import commands
 from . import config
 from . import logger
+from . import workers
 from . import __version__
 from . import icons_rc
+from .models import classtable
 from .models import classtree
 from .models import reftree
 from .eplusio import idfmodel
 from .eplusio import iddmodel
 from .eplusio import parser
+from .eplusio import epjson
 from .widgets import setupwiz, main, help
 
 # Setup logging
@@ -63,6 +65,13 @@ class IDFPlus(QMainWindow, main.UIMainWindow):
         self.idf = None
         self.groups = None
         self.file_dirty = False
+        self.edit_generation = 0
+        self.save_thread = None
+        self.table_filter_thread = None
+        self.tree_filter_thread = None
+        self.filter_threads = set()
+        self.table_filter_timer = self.create_filter_timer(self.filter_table)
+        self.tree_filter_timer = self.create_filter_timer(self.filter_tree)
         self.obj_orientation = Qt.Vertical
         self.current_obj_class = None
         self.obj_clipboard = []
@@ -134,6 +143,11 @@ class IDFPlus(QMainWindow, main.UIMainWindow):
         if self.ok_to_continue():
             self.prefs.write_settings()
             self.prefs.save_state(self)
+            # Superseded filters may still be running too
+            for thread in list(self.filter_threads):
+                thread.requestInterruption()
+            for thread in list(self.filter_threads):
+                thread.wait()
             log.info('Shutting down IDF+')
             event.accept()
         else:
@@ -155,7 +169,7 @@ class IDFPlus(QMainWindow, main.UIMainWindow):
         if self.ok_to_continue():
             home_dir = os.path.expanduser('~')
             directory = os.path.dirname(self.file_path) if self.file_path else home_dir
-            formats = "EnergyPlus Files (*.idf)"
+            formats = "EnergyPlus Files (*.idf *.idf.gz *.idf.xz *.idf.bz2 *.epJSON)"
             dialog_name = 'Open file'
             file_dialog = QFileDialog()
             file_dialog.setFileMode(QFileDialog.ExistingFile)
@@ -177,17 +191,22 @@ class IDFPlus(QMainWindow, main.UIMainWindow):
         # self.files.update({0:idf})
 
         # Open the specified file in a safe way
-        with codecs.open(file_path, 'r',
-                         encoding=config.FILE_ENCODING,
-                         errors='backslashreplace') as raw_idf:
-            if file_path:
-                idf_parser = parser.IDFParser(idf,
-                                              default_version=self.prefs['default_idd_version'])
-                for progress in idf_parser.parse_idf(raw_idf, file_path):
+        if epjson.is_epjson(file_path):
+            with open(file_path, encoding=epjson.EPJSON_ENCODING) as raw_json:
+                json_parser = epjson.EPJSONParser(
+                    idf, default_version=self.prefs['default_idd_version'])
+                for progress in json_parser.parse_epjson(raw_json, file_path):
                     self.progressBarIDF.setValue(progress)
-            else:
-                log.info('Loading blank IDF file...')
-                idf.init_blank()
+        else:
+            with parser.open_idf(file_path) as raw_idf:
+                if file_path:
+                    idf_parser = parser.IDFParser(
+                        idf, default_version=self.prefs['default_idd_version'])
+                    for progress in idf_parser.parse_idf(raw_idf, file_path):
+                        self.progressBarIDF.setValue(progress)
+                else:
+                    log.info('Loading blank IDF file...')
+                    idf.init_blank()
 
         self.idf = idf
         self.idd = idf._idd
@@ -302,42 +321,106 @@ class IDFPlus(QMainWindow, main.UIMainWindow):
 
         home_dir = os.path.expanduser('~')
         directory = self.file_path if self.file_path else home_dir
-        formats = 'EnergyPlus Files (*.idf)'
+        formats = ('EnergyPlus Files (*.idf);;'
+                   'Compressed EnergyPlus Files (*.idf.gz *.idf.xz *.idf.bz2);;'
+                   'EnergyPlus JSON Files (*.epJSON)')
         file_name, filtr = QFileDialog.getSaveFileName(self, 'Save As',
                                                              directory, formats)
         if file_name:
-            if not (file_name.endswith('.idf') or file_name.endswith('.imf')):
+            if not (file_name.endswith('.idf') or file_name.endswith('.imf') or
+                    parser.compression(file_name) or epjson.is_epjson(file_name)):
                 file_name += '.idf'
             self.file_path = file_name
             self.idf.file_path = file_name
             return self.save_file()
         return False
 
-    def save_file(self):
+    def save_file(self, wait=False, incremental=True):
         """Called by action to save the current file to disk.
+
+        A snapshot of the file is written in the background so that editing can continue
+        during the save. Incremental saves copy unmodified objects from the source file.
+
+        :param bool wait: Whether to block until the save is complete
+        :param bool incremental: Whether to copy unmodified objects from the source file
         """
 
         if not self.file_path or not self.idf:
             return False
-        file_name = self.file_path
-        writer = parser.Writer()
-        if writer.write_idf(self.idf):
+
+        # Only one save at a time
+        self.wait_for_save()
+
+        # Take the snapshot now, along with the edit generation it corresponds to
+        incremental = incremental and not epjson.is_epjson(self.file_path)
+        snapshot = parser.IDFSnapshot(self.idf, incremental)
+        self.save_thread = workers.SaveThread(snapshot, self.edit_generation,
+                                              self.prefs['save_processes'], self)
+        self.save_thread.progress.connect(self.progressBarIDF.setValue)
+        self.save_thread.saved.connect(self.save_finished)
+
+        # Our own write should not be detected as an external change to the file
+        self.check_file_changed = False
+        self.statusBar().showMessage("Saving {}...".format(snapshot.file_path))
+        self.progressBarIDF.setValue(0)
+        self.progressBarIDF.show()
+        self.save_thread.start()
+
+        if wait:
+            return self.wait_for_save()
+        return True
+
+    def wait_for_save(self):
+        """Blocks until the background save, if any, is complete.
+
+        :returns: The result of the save, or None if there was no save in progress
+        """
+
+        thread = self.save_thread
+        if thread is None:
+            return None
+        thread.wait()
+        return self.save_finished(thread)
+
+    def save_finished(self, thread=None):
+        """Called when a background save is complete.
+
+        :param SaveThread thread: The thread which completed (defaults to the sender)
+        :returns: The result of the save, or None if it was already handled
+        """
+
+        # The result may already have been handled (by wait_for_save)
+        thread = thread or self.sender()
+        if thread is None or thread is not self.save_thread:
+            return None
+        self.save_thread = None
+        thread.deleteLater()
+        self.reset_progress_bar()
+
+        if thread.result:
+            thread.snapshot.update_source()
+            file_name = thread.snapshot.file_path
             self.set_current_file(file_name)
             self.add_recent_file(file_name)
             self.statusBar().showMessage("File saved", 2000)
-            self.set_dirty(False)
-            self.file_time_last_modified = os.path.getmtime(self.file_path)
-            self.check_file_changed = True
-            return True
+
+            # Edits made during the save are not part of the saved file
+            self.set_dirty(self.edit_generation != thread.generation)
+            self.file_time_last_modified = os.path.getmtime(file_name)
         else:
-            return False
+            self.statusBar().showMessage("File not saved! See log for details.", 5000)
+        self.check_file_changed = True
+        return thread.result
 
     def format_save(self):
         """Manually set the dirty flag and save the file. Convenience function for reformatting
         """
 
         self.set_dirty(True)
-        self.save()
+        if self.file_path:
+            self.save_file(incremental=False)
+        else:
+            self.save_as()
 
     def idfplus_help(self):
         """"""
@@ -485,7 +568,7 @@ class IDFPlus(QMainWindow, main.UIMainWindow):
         self.idf.set_options({'save_units': save_units})
 
         # Refresh the view
-        self.load_table_view(self.current_obj_class)
+        self.refresh_table_view()
 
     def update_file_menu(self):
         """Called to update the recent files portion of the file menu
@@ -541,8 +624,7 @@ class IDFPlus(QMainWindow, main.UIMainWindow):
             return
 
         # Map index to source model
-        partially_mapped = self.classTable.model().mapToSource(_index)
-        index = self.classTable.model().sourceModel().mapToSource(partially_mapped)
+        index = self.classTable.model().mapToSource(_index)
 
         # Get reference data
         if not self.idf or not index:
@@ -596,8 +678,7 @@ class IDFPlus(QMainWindow, main.UIMainWindow):
             return
 
         # Map index to source model
-        partially_mapped = self.classTable.model().mapToSource(_index)
-        index = self.classTable.model().sourceModel().mapToSource(partially_mapped)
+        index = self.classTable.model().mapToSource(_index)
 
         # Update various views and labels
         self.update_reference_view(index)
@@ -606,7 +687,7 @@ class IDFPlus(QMainWindow, main.UIMainWindow):
         self.update_comments(index)
 
     def scroll_changed(self, position):
-        self.classTable.resize_visible_rows()
+        self.classTable.schedule_resize_rows()
 
     def update_units_label(self, index):
         """Updates the units label
@@ -695,14 +776,12 @@ class IDFPlus(QMainWindow, main.UIMainWindow):
         self.select_tree_class(obj_class_display)
 
         # After the table is loaded, get its model and selection model
-        table_source_model = self.classTable.model().sourceModel()
         table_model = self.classTable.model()
+        table_model.show_object(obj_index)
 
         # Create an index for the target field with the table's model
-        table_index_source = table_source_model.sourceModel().index(obj_index,
-                                                                    field_index)
-        table_index_partial = table_source_model.mapFromSource(table_index_source)
-        table_index = table_model.mapFromSource(table_index_partial)
+        table_index_source = table_model.sourceModel().index(obj_index, field_index)
+        table_index = table_model.mapFromSource(table_index_source)
 
         # Give focus to the class table and select the target index
         self.classTable.setFocus()
@@ -722,6 +801,8 @@ class IDFPlus(QMainWindow, main.UIMainWindow):
         match_flags = Qt.MatchRecursive | Qt.MatchExactly | Qt.MatchWrap
         matches = tree_model.match(tree_model.index(0, 0), Qt.DisplayRole, obj_class, hits=1,
                                    flags=match_flags)
+        if not matches:
+            return
 
         # Select the resulting found item (this also triggers a load of the table view)
         selection_flags = QItemSelectionModel.SelectCurrent | QItemSelectionModel.Rows
@@ -741,35 +822,137 @@ class IDFPlus(QMainWindow, main.UIMainWindow):
             if action is not None:
                 target.addAction(action)
 
+    def create_filter_timer(self, slot):
+        """Creates a timer which calls the given slot once typing in a filter box pauses
+
+        :param slot: Callable applying the filter
+        :rtype: QTimer
+        """
+
+        timer = QTimer(self)
+        timer.setSingleShot(True)
+        timer.setInterval(config.FILTER_DELAY)
+        timer.timeout.connect(slot)
+        return timer
+
+    def start_filter(self, pattern, case_sensitive, items, text, slot):
+        """Starts matching the given items against a filter in the background
+
+        :param str pattern: Wildcard pattern
+        :param bool case_sensitive: Whether the filter is case sensitive
+        :param list items: Snapshot of the items to match
+        :param text: Callable returning the text of an item, or None
+        :param slot: Callable to connect to the thread's filtered signal
+        :rtype: workers.FilterThread
+        """
+
+        matcher = classtable.wildcard_regex(pattern, case_sensitive)
+        thread = workers.FilterThread(pattern, case_sensitive, matcher, items, text, self)
+        thread.filtered.connect(slot)
+        thread.finished.connect(lambda: self.filter_threads.discard(thread))
+        thread.finished.connect(thread.deleteLater)
+        self.filter_threads.add(thread)
+        thread.start()
+        return thread
+
     def tableFilterRegExpChanged(self):
+        """Triggered when the object filter changes. The filter is applied once typing
+        pauses.
         """
 
-        :return: :rtype:
+        self.table_filter_timer.start()
+
+    def filter_table(self):
+        """Filters the objects of the current class. Objects are matched in the background,
+        against a snapshot of the class, and a filter still running is cancelled.
         """
 
+        self.table_filter_timer.stop()
+        if self.table_filter_thread is not None:
+            self.table_filter_thread.requestInterruption()
+            self.table_filter_thread = None
+
+        model = self.classTable.model()
+        if not model:
+            return
         pattern = self.filterBox.text()
         if len(pattern) < 3:
             pattern = None
-        if not self.classTable.model():
+        case_sensitive = self.caseSensitivity.isChecked()
+        source_model = model.sourceModel()
+
+        # Nothing to match in the background
+        if not pattern or not source_model.idf_objects:
+            model.apply_filter(pattern, case_sensitive)
+            self.classTable.selectionModel().reset()
             return
-        self.classTable.model().setFilterRegExp(pattern)
-        self.classTable.model().invalidateFilter()
+
+        si_units = source_model.idf.si_units
+        self.table_filter_thread = self.start_filter(
+            pattern, case_sensitive, list(source_model.idf_objects),
+            lambda idf_object: idf_object.search_text(si_units), self.table_filtered)
+
+    def table_filtered(self):
+        """Called when the objects of the current class were matched in the background
+        """
+
+        thread = self.sender()
+        if thread is None or thread is not self.table_filter_thread:
+            return
+        self.table_filter_thread = None
+        accepted = {id(idf_object): match
+                    for idf_object, match in zip(thread.items, thread.matches)}
+        self.classTable.model().apply_filter(thread.pattern, thread.case_sensitive, accepted)
         self.classTable.selectionModel().reset()
 
     def treeFilterRegExpChanged(self):
+        """Triggered when the class filter changes. The filter is applied once typing
+        pauses.
         """
 
-        :return: :rtype:
+        self.tree_filter_timer.start()
+
+    def filter_tree(self):
+        """Filters the class tree. Class names are matched in the background, and a filter
+        still running is cancelled.
         """
 
+        self.tree_filter_timer.stop()
+        if self.tree_filter_thread is not None:
+            self.tree_filter_thread.requestInterruption()
+            self.tree_filter_thread = None
+
+        model = self.classTree.model()
+        if not model:
+            return
         pattern = self.filterTreeBox.text()
         if len(pattern) < 3:
-            pattern = None
+            self.apply_tree_filter(None)
+            return
+        self.tree_filter_thread = self.start_filter(pattern, False, model.class_names(),
+                                                    None, self.tree_filtered)
+
+    def tree_filtered(self):
+        """Called when the class names were matched in the background
+        """
+
+        thread = self.sender()
+        if thread is None or thread is not self.tree_filter_thread:
+            return
+        self.tree_filter_thread = None
+        self.apply_tree_filter(thread.pattern, dict(zip(thread.items, thread.matches)))
+
+    def apply_tree_filter(self, pattern, accepted=None):
+        """Applies a filter to the class tree, keeping the current class in view
+
+        :param str pattern: Wildcard pattern, or None to clear the filter
+        :param dict accepted: Whether each class name matches the filter
+        """
+
         if not self.classTree.model():
             return
         current_class = QPersistentModelIndex(self.classTree.currentIndex())
-        self.classTree.model().setFilterRegExp(pattern)
-        self.classTree.model().invalidateFilter()
+        self.classTree.model().apply_filter(pattern, False, accepted)
         self.classTree.expandAll()
         self.classTree.scrollTo(current_class, QAbstractItemView.PositionAtCenter)
 
@@ -782,28 +965,20 @@ class IDFPlus(QMainWindow, main.UIMainWindow):
         """
 
         self.filterBox.clear()
-        self.tableFilterRegExpChanged()
+        self.filter_table()
 
     def clearTreeFilterClicked(self):
         """Triggered when tree filter is cleared
         """
 
         self.filterTreeBox.clear()
-        self.treeFilterRegExpChanged()
+        self.filter_tree()
 
     def caseSensitivityChanged(self):
         """Triggered when case sensitivity is changed
         """
 
-        if not self.classTable.model():
-            return
-
-        if self.caseSensitivity.isChecked():
-            sensitivity = Qt.CaseSensitive
-        else:
-            sensitivity = Qt.CaseInsensitive
-        self.classTable.model().setFilterCaseSensitivity(sensitivity)
-        self.tableFilterRegExpChanged()
+        self.filter_table()
 
     def set_current_file(self, file_name):
         """Sets the current file globally and updates title, statusbar, etc.
@@ -829,6 +1004,7 @@ class IDFPlus(QMainWindow, main.UIMainWindow):
         """Checks if there are unsaved changes and prompts for action.
         """
 
+        self.wait_for_save()
         if self.file_dirty:
             reply = QMessageBox.warning(self,
                                               "Application",
@@ -839,7 +1015,7 @@ class IDFPlus(QMainWindow, main.UIMainWindow):
             if reply == QMessageBox.Cancel:
                 return False
             elif reply == QMessageBox.Save:
-                self.save_file()
+                self.save_file(wait=True)
         return True
 
     def add_recent_file(self, file_name):
@@ -1005,8 +1181,7 @@ class IDFPlus(QMainWindow, main.UIMainWindow):
             return False
 
         # Convert indexes to source indexes for storage
-        indexes_part = [model.mapToSource(ind) for ind in indexes]
-        indexes_source = [model.sourceModel().mapToSource(ind) for ind in indexes_part]
+        indexes_source = [model.mapToSource(ind) for ind in indexes]
 
         # Get list of contiguous indexes and objects
         groups, obj_lists = model.contiguous(indexes_source, False, duplicates=True)
@@ -1069,7 +1244,15 @@ class IDFPlus(QMainWindow, main.UIMainWindow):
         else:
             hide_groups = ''
         self.idf.set_options({'save_hide_groups': hide_groups})
-        self.load_tree_view()
+
+        # Move the class items of the existing tree under (or out of) group headers
+        tree_model = self.classTree.model()
+        if tree_model:
+            tree_model.show_groups = not self.hide_groups
+            tree_model.sourceModel().set_show_groups(not self.hide_groups)
+            self.classTree.expandAll()
+            if self.current_obj_class:
+                self.select_tree_class(self.current_obj_class)
 
     def toggle_full_tree(self):
         """Called to toggle the full class tree or a partial tree.
@@ -1091,8 +1274,8 @@ class IDFPlus(QMainWindow, main.UIMainWindow):
 
         tree_model = self.classTree.model()
         if tree_model:
-            tree_model.hide_empty_classes = not self.classTree.model().hide_empty_classes
-            self.treeFilterRegExpChanged()
+            tree_model.set_hide_empty_classes(self.hide_empty_classes)
+            self.classTree.expandAll()
 
         # TODO need to find a way to handle what happens when 'currentIndex' disappears
         #     during the filtering.
@@ -1119,8 +1302,9 @@ class IDFPlus(QMainWindow, main.UIMainWindow):
         if selection_model and previous_model:
             if previous_model.obj_class == obj_class:
                 sel = selection_model.selection()
-                partial = previous_model.mapSelectionToSource(sel)
-                source_sel = previous_model.sourceModel().mapSelectionToSource(partial)
+                source_sel = previous_model.mapSelectionToSource(sel)
+            else:
+                self.save_table_state()
 
         # Filter out group headers
         if obj_class not in self.idd:
@@ -1132,19 +1316,23 @@ class IDFPlus(QMainWindow, main.UIMainWindow):
         self.clearFilterClicked()
 
         # Tell the model about the new object class and idf file. This also resets the model.
-        self.classTable.model().setObjectClass(obj_class, self.idf)
+        state = self.classTable.model().setObjectClass(obj_class, self.idf)
 
-        # Create generic delegates for table cells and assign them
-        item_delegates = delegates.GenericDelegate(self, self.idd[obj_class], self.obj_orientation)
-        self.classTable.setItemDelegate(item_delegates)
+        # Reuse the delegates of the class if it was shown recently, otherwise create them
+        if state.delegate is None:
+            state.delegate = delegates.GenericDelegate(self, self.idd[obj_class],
+                                                       self.obj_orientation)
+        else:
+            state.delegate.obj_orientation = self.obj_orientation
+            state.delegate.reset_choices()
+        self.classTable.setItemDelegate(state.delegate)
 
         # Restore previous selection after converting to current model's indexes
         if source_sel:
-            partial = self.classTable.model().mapSelectionFromSource(source_sel)
-            previous_sel = self.classTable.model().mapSelectionFromSource(partial)
+            previous_sel = self.classTable.model().mapSelectionFromSource(source_sel)
             selection_model.select(previous_sel, QItemSelectionModel.SelectCurrent)
         else:
-            self.classTable.setCurrentIndex(self.classTable.model().index(0, 0))
+            self.restore_table_state(state)
             # self.classTable.setFocus()
 
         # Resize rows for text wrap
@@ -1157,9 +1345,14 @@ class IDFPlus(QMainWindow, main.UIMainWindow):
         self.unitsLabel.setText(None)
 
     def load_tree_view(self):
-        """Loads the tree of class type names.
+        """Loads the tree of class type names. The tree is kept up to date as objects are
+        added and removed, and when groups or empty classes are shown or hidden.
         """
 
+        # Stop updating the tree of the previous file, if any
+        if self.classTree.model():
+            self.classTree.model().sourceModel().detach()
+
         # Define the source model
         source_model = classtree.ObjectClassTreeModel(self.idf, self.classTree,
                                                       hide_groups=self.hide_groups)
@@ -1187,6 +1380,82 @@ class IDFPlus(QMainWindow, main.UIMainWindow):
         selection_model = self.classTree.selectionModel()
         selection_model.selectionChanged.connect(self.class_selected)
 
+    def save_table_state(self):
+        """Saves how the current class is viewed (column sizes, scroll position and current
+        cell) in its prepared table, to be restored when the class is shown again
+        """
+
+        state = self.classTableModel.state
+        if state is None:
+            return
+        table = self.classTable
+        current = table.model().mapToSource(table.currentIndex())
+        state.orientation = self.obj_orientation
+        state.header_state = table.horizontalHeader().saveState()
+        state.scroll = (table.horizontalScrollBar().value(), table.verticalScrollBar().value())
+        state.current = (current.row(), current.column()) if current.isValid() else None
+
+    def restore_table_state(self, state):
+        """Restores how a class was last viewed, if it was, otherwise selects its first cell
+
+        :param ClassTableState state: Prepared table of the class
+        """
+
+        table = self.classTable
+        model = table.model()
+        if state.header_state is not None and state.orientation == self.obj_orientation:
+            table.horizontalHeader().restoreState(state.header_state)
+        current = QModelIndex()
+        if state.current is not None and model.show_object(state.current[0]):
+            current = model.mapFromSource(model.sourceModel().index(*state.current))
+        table.setCurrentIndex(current if current.isValid() else model.index(0, 0))
+        if state.scroll is not None:
+            table.horizontalScrollBar().setValue(state.scroll[0])
+            table.verticalScrollBar().setValue(state.scroll[1])
+
+    def jump_to_object(self, number):
+        """Selects the object with the given number (starting at 1) in the class table
+
+        :param int number: Number of the object in its class
+        """
+
+        model = self.classTable.model()
+        if not model or not model.show_object(number - 1):
+            return
+        index = model.mapFromSource(model.sourceModel().index(number - 1, 0))
+        self.classTable.setCurrentIndex(index)
+        self.classTable.scrollTo(index, QAbstractItemView.PositionAtCenter)
+
+    def update_jump_box(self):
+        """Updates the range of the jump-to-object box for the objects of the current class
+        """
+
+        count = self.classTable.model().sourceModel().rowCount()
+        self.jumpToObjectBox.blockSignals(True)
+        self.jumpToObjectBox.setMaximum(max(count, 1))
+        self.jumpToObjectBox.setSuffix(' of {}'.format(count))
+        self.jumpToObjectBox.blockSignals(False)
+        self.jumpToObjectBox.setEnabled(count > 0)
+
+    def refresh_table_view(self, obj_classes=None):
+        """Refreshes the class table after values were changed outside of it (or the units
+        were toggled), without reloading it
+
+        :param obj_classes: Names of the classes whose values changed (all by default)
+        """
+
+        if not self.idf:
+            return
+        self.classTableModel.refresh(obj_classes)
+        delegate = self.classTable.itemDelegate()
+        if isinstance(delegate, delegates.GenericDelegate):
+            delegate.reset_choices()
+
+        # The filter matches values as displayed, so it must match them again
+        if self.filterBox.text():
+            self.filter_table()
+        self.classTable.resize_visible_rows()
+
     def transpose_table(self):
         """Transposes the table
         """
@@ -1204,7 +1473,11 @@ class IDFPlus(QMainWindow, main.UIMainWindow):
             # self.classTable.verticalHeader().setMovable(True)
             # print('Setting object orientation to: Horizontal')
 
-        self.load_table_view(self.current_obj_class)
+        # Transposing is a layout change of the proxy model, only the delegate needs to know
+        delegate = self.classTable.itemDelegate()
+        if isinstance(delegate, delegates.GenericDelegate):
+            delegate.obj_orientation = self.obj_orientation
+        self.classTable.resize_visible_rows()
 
     def class_selected(self, current):
         """Loads the table view when a new class is selected
@@ -1307,6 +1580,8 @@ class IDFPlus(QMainWindow, main.UIMainWindow):
         :param dirty_state:
         """
 
+        if dirty_state:
+            self.edit_generation += 1
         self.file_dirty = dirty_state
         self.setWindowFilePath(self.file_path)
         self.setWindowModified(dirty_state)
@@ -18,10 +18,17 @@ class BaseTreeItem(object):
         self.parentItem = parent
         self.itemData = data
         self.childItems = []
+        self.itemRow = 0
 
     def appendChild(self, item):
+        # Items know their row, Qt asks for it (through parent()) very often
+        item.parentItem = self
+        item.itemRow = len(self.childItems)
         self.childItems.append(item)
 
+    def clearChildren(self):
+        self.childItems = []
+
     def child(self, row):
         return self.childItems[row]
 
@@ -39,9 +46,7 @@ class BaseTreeItem(object):
         return self.parentItem
 
     def row(self):
-        if self.parentItem:
-            return self.parentItem.childItems.index(self)
-        return 0
+        return self.itemRow
 
     def item(self):
         return self.itemData
@@ -7,13 +7,15 @@
 """
 
 # System imports
+import re
 import logging
 from itertools import groupby
+from collections import OrderedDict
 
 # PySide2 imports
 from PySide2.QtCore import (Qt, QAbstractTableModel, QItemSelection, QItemSelectionRange,
-                            QAbstractProxyModel, QRegExp, QItemSelectionModel, QModelIndex,
-                            QSortFilterProxyModel, QRect, QPoint)
+                            QAbstractProxyModel, QItemSelectionModel, QModelIndex,
+                            QPersistentModelIndex, QTimer, Signal)
 from PySide2.QtGui import QColor
 from PySide2.QtWidgets import QTableView, QAbstractItemView
 
@@ -23,6 +25,74 @@ from ..eplusio.idfmodel import IDFError
 # Setup logging
 log = logging.getLogger(__name__)
 
+# Number of objects (rows) whose rendered cells are kept by the class table
+DISPLAY_CACHE_ROWS = 2000
+
+# Delay (ms) after the last scroll event before visible rows are resized
+ROW_RESIZE_DELAY = 50
+
+# Number of classes whose prepared table (labels, delegates, view) is kept
+TABLE_STATE_CACHE_SIZE = 10
+
+# Classes with more objects than this are shown one page (of objects) at a time
+PAGED_OBJECT_COUNT = 5000
+TABLE_PAGE_SIZE = 1000
+
+
+def wildcard_regex(pattern, case_sensitive=False):
+    """Compiles a wildcard pattern, like those of the table filter box, into a regular
+    expression: '*' matches any text, '?' any character and '[...]' any of a set of
+    characters. Everything else is literal, including sets which aren't valid (like
+    '[z-a]'). Like the filter, the pattern can match anywhere within a field (a line of
+    :meth:`IDFObject.search_text`).
+
+    :param str pattern: Wildcard pattern
+    :param bool case_sensitive: Whether matching should be case sensitive
+    :rtype: re.Pattern
+    """
+
+    parts = []
+    position = 0
+    while position < len(pattern):
+        char = pattern[position]
+        position += 1
+        if char == '*':
+            parts.append('.*')
+        elif char == '?':
+            parts.append('.')
+        elif char == '[' and ']' in pattern[position + 1:]:
+            end = pattern.index(']', position + 1)
+            chars = pattern[position:end]
+            if chars.startswith('!'):
+                chars = '^' + chars[1:]
+            char_set = '[{}]'.format(chars.replace('\\', '\\\\'))
+            try:
+                re.compile(char_set)
+            except re.error:
+                char_set = re.escape(pattern[position - 1:end + 1])
+            parts.append(char_set)
+            position = end + 1
+        else:
+            parts.append(re.escape(char))
+    return re.compile(''.join(parts), 0 if case_sensitive else re.IGNORECASE)
+
+
+class ClassTableState(object):
+    """Prepared table of one class, kept so that switching back to the class is quick:
+    its header labels and rendered cells, along with the delegate and view settings
+    (column sizes, scroll position and current cell) of the table showing it.
+    """
+
+    def __init__(self, obj_class):
+        self.obj_class = obj_class  #: Class of the objects in the table
+        self.field_labels = dict()  #: Header labels of the fields, per unit mode
+        self.display_cache = OrderedDict()  #: Rendered cells, per object
+        self.delegate = None  #: Delegate of the table, once created
+        self.header_state = None  #: Saved state of the horizontal header
+        self.orientation = None  #: Object orientation of the saved header and cell
+        self.scroll = None  #: Horizontal and vertical scroll bar values
+        self.current = None  #: Object (row) and field (column) of the current cell
+
 
 class IDFObjectTableModel(QAbstractTableModel):
     """Qt table model object that links the table widget and its underlying data structure.
@@ -43,22 +113,87 @@ class IDFObjectTableModel(QAbstractTableModel):
         self.obj_orientation = obj_orientation or Qt.Vertical
         self.prefs = parent.prefs
         self.parent = parent
+        self._display_cache = OrderedDict()
+        self._states = OrderedDict()
+        self.state = None
         super(IDFObjectTableModel, self).__init__(parent)
 
     def setObjectClass(self, obj_class, idf):
-        self.modelAboutToBeReset.emit()
+        """Shows the objects of the given class. The prepared tables of recently shown
+        classes are kept (see :class:`ClassTableState`) and reused when still valid.
+
+        :param str obj_class: Class of the objects to show
+        :param IDFFile idf: IDF file containing the objects
+        :returns: Prepared table of the class
+        :rtype: ClassTableState
+        """
+
+        if idf is not self.idf or idf.idd is not self.idd:
+            self._states.clear()
         self.beginResetModel()
         self.obj_class = obj_class
         self.idf = idf
         self.idd = idf.idd
         self.idf_objects = idf.idf_objects(obj_class)
         self.idd_object = idf.idd.idd_object(obj_class)
+
+        key = obj_class.lower()
+        state = self._states.get(key)
+        if state is None:
+            state = self._states[key] = ClassTableState(obj_class)
+            if len(self._states) > TABLE_STATE_CACHE_SIZE:
+                self._states.popitem(last=False)
+        else:
+            self._states.move_to_end(key)
+        self.state = state
+        self._display_cache = state.display_cache
         self._refresh_labels()
         self.endResetModel()
+        return state
+
+    def forget_states(self, obj_classes=None):
+        """Drops the prepared tables of the given classes (all by default), except the
+        current one, for example after their objects were added or removed elsewhere
+
+        :param obj_classes: Names of the classes to forget
+        """
+
+        if obj_classes is None:
+            keys = list(self._states)
+        else:
+            keys = [obj_class.lower() for obj_class in obj_classes]
+        for key in keys:
+            if self._states.get(key) is not self.state:
+                self._states.pop(key, None)
+
+    def refresh(self, obj_classes=None):
+        """Refreshes the table after changes made outside of it (values edited elsewhere,
+        units or header preferences changed). The rendered cells of the given classes (all
+        by default) are dropped. If the current class is one of them, views are told that
+        its cells and headers changed, rather than being reset.
+
+        :param obj_classes: Names of the classes whose values changed
+        """
+
+        keys = None if obj_classes is None else set(c.lower() for c in obj_classes)
+        for key, state in self._states.items():
+            if keys is None or key in keys:
+                state.display_cache.clear()
+        if self.state is None or (keys is not None and self.obj_class.lower() not in keys):
+            return
+
+        self._refresh_labels()
+        row_count = self.rowCount()
+        column_count = self.columnCount()
+        self.headerDataChanged.emit(Qt.Horizontal, 0, max(column_count - 1, 0))
+        self.headerDataChanged.emit(Qt.Vertical, 0, max(row_count - 1, 0))
+        if row_count and column_count:
+            self.dataChanged.emit(self.index(0, 0),
+                                  self.index(row_count - 1, column_count - 1))
 
     def reset_model(self):
-        self.modelAboutToBeReset.emit()
         self.beginResetModel()
+        self._display_cache.clear()
         self.endResetModel()
 
     def flags(self, index):
@@ -93,34 +228,20 @@ class IDFObjectTableModel(QAbstractTableModel):
         data = None
         field = None
 
+        # Cell text is rendered once, then served from the cache
+        if role == Qt.DisplayRole or role == Qt.EditRole:
+            show_units = role != Qt.EditRole and bool(self.prefs['show_units_in_cells'])
+            return self._display_text(index_obj, index_field, show_units)
+
         # If the role will require a field, get it now
-        if role in [Qt.DisplayRole, Qt.EditRole,
-                    Qt.ToolTipRole, Qt.BackgroundRole,
-                    Qt.StatusTipRole]:
+        if role in [Qt.ToolTipRole, Qt.BackgroundRole, Qt.StatusTipRole]:
             try:
                 field = self.idf.field(self.obj_class, index_obj, index_field)
             except IDFError:
                 return None
 
         # Detect the role being request and return the correct data
-        if role == Qt.DisplayRole or role == Qt.EditRole:
-            if not field:
-                data = None
-            else:
-                if role != Qt.EditRole and self.prefs['show_units_in_cells']:
-                    text_units = self.idf.units(field) or ''
-                    spacing = ' ' if text_units else ''
-                else:
-                    text_units = ''
-                    spacing = ''
-                if not field.value:
-                    text_units = ''
-                    spacing = ''
-                if self.idf.si_units is True:
-                    data = '{}{}{}'.format(field.value, spacing, text_units)
-                else:
-                    data = '{}{}{}'.format(self.idf.to_ip(field), spacing, text_units)
-        elif role == Qt.ToolTipRole:
+        if role == Qt.ToolTipRole:
             data = self.idf.units(field)
         elif role == Qt.DecorationRole:
             pass
@@ -141,6 +262,67 @@ class IDFObjectTableModel(QAbstractTableModel):
                 data = None
         return data
 
+    def _display_text(self, index_obj, index_field, show_units):
+        """Returns the text of a cell, with or without units, in the current unit system.
+        Rendered text is cached per object, for the most recently displayed objects.
+
+        :param int index_obj: Position of the object (row)
+        :param int index_field: Position of the field (column)
+        :param bool show_units: Whether to append the field's units
+        :rtype: str
+        """
+
+        cache = self._display_cache
+        key = (index_field, self.idf.si_units, show_units)
+        row_cache = cache.get(index_obj)
+        if row_cache is None:
+            row_cache = cache[index_obj] = dict()
+            if len(cache) > DISPLAY_CACHE_ROWS:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(index_obj)
+            try:
+                return row_cache[key]
+            except KeyError:
+                pass
+
+        try:
+            field = self.idf.field(self.obj_class, index_obj, index_field)
+        except IDFError:
+            return None
+
+        if not field:
+            data = None
+        else:
+            if show_units and field.value:
+                text_units = self.idf.units(field) or ''
+                spacing = ' ' if text_units else ''
+            else:
+                text_units = ''
+                spacing = ''
+            if self.idf.si_units is True:
+                data = '{}{}{}'.format(field.value, spacing, text_units)
+            else:
+                data = '{}{}{}'.format(self.idf.to_ip(field), spacing, text_units)
+        row_cache[key] = data
+        return data
+
+    def _invalidate_display(self, first_row, last_row=None):
+        """Forgets the rendered text of the given objects (rows)
+
+        :param int first_row: Position of the first object
+        :param int last_row: Position of the last object, or None for all following
+                             objects (when objects were inserted or removed before them)
+        """
+
+        cache = self._display_cache
+        if last_row is None:
+            for row in [row for row in cache if row >= first_row]:
+                del cache[row]
+        else:
+            for row in range(first_row, last_row + 1):
+                cache.pop(row, None)
+
     def headerData(self, section, orientation, role):
         """Overrides Qt method to provide header text for table model.
 
@@ -162,10 +344,9 @@ class IDFObjectTableModel(QAbstractTableModel):
                 except IndexError:
                     return None
             elif orientation == Qt.Vertical:
-                try:
-                    return self.object_labels[section]
-                except IndexError:
-                    return None
+                if 0 <= section < len(self.idf_objects or []):
+                    return 'Obj{}'.format(section + 1)
+                return None
         elif role == Qt.BackgroundRole:
             return QColor(244, 244, 244)
         elif role == Qt.FontRole:
@@ -187,7 +368,7 @@ class IDFObjectTableModel(QAbstractTableModel):
         """
 
         if self.idf_objects:
-            idf_max_length = max([len(obj) for obj in self.idf_objects])
+            idf_max_length = self.idf.max_object_length(self.obj_class)
             return max(idf_max_length, len(self.idd_object))
         else:
             return len(self.idd_object or [])
@@ -225,9 +406,11 @@ class IDFObjectTableModel(QAbstractTableModel):
             else:
                 converted_value = self.idf.to_si(field, override_value=value)
 
-            # Don't overwrite unless the value is new
+            # Don't overwrite unless the value is new. The units of other fields in the
+            # object can depend on this one, so forget the whole object's text.
             if field.value != converted_value:
                 field.value = converted_value
+                self._invalidate_display(index_obj, index_obj)
                 return True
 
         return False
@@ -273,13 +456,26 @@ class IDFObjectTableModel(QAbstractTableModel):
                 last_row = group[-1] + offset + delete_count
                 self.beginRemoveRows(QModelIndex(), first_row, last_row - 1)
 
-            # Delete the objects, update labels and inform that we're done inserting
+            # Delete the objects and inform that we're done
             self.idf.remove_objects(self.obj_class, first_row, last_row)
-            self._refresh_labels()
+            self._invalidate_display(first_row)
             self.endRemoveRows()
 
         return True
 
+    def remove_rows(self, first_row, last_row):
+        """Removes the given objects (rows) of the current class, such as those deleted
+        from outside of the table, telling views which rows went away
+
+        :param int first_row: Position of the first object to remove
+        :param int last_row: Position after the last object to remove
+        """
+
+        self.beginRemoveRows(QModelIndex(), first_row, last_row - 1)
+        self.idf.remove_objects(self.obj_class, first_row, last_row)
+        self._invalidate_display(first_row)
+        self.endRemoveRows()
+
     def insertObjects(self, indexes, objects=None, offset=None):
         """Overrides Qt method to insert new objects into the table
 
@@ -314,9 +510,7 @@ class IDFObjectTableModel(QAbstractTableModel):
             # Warn the model that we're about to add rows, then do it
             self.beginInsertRows(QModelIndex(), first_row, last_row)
             self.idf.add_objects(self.obj_class, obj_list, first_row)
-
-            # Update labels and inform that we're done inserting
-            self._refresh_labels()
+            self._invalidate_display(first_row)
             self.endInsertRows()
 
         return True
@@ -363,35 +557,62 @@ class IDFObjectTableModel(QAbstractTableModel):
         return groups, obj_list
 
     def _refresh_labels(self):
-        """Refreshes header labels after changes to table structure
+        """Refreshes the field header labels for the current unit mode. Labels are made
+        once per class and unit mode, then kept with the class's prepared table. Object
+        labels are not stored, they are made from the object's position when needed.
         """
 
-        field_labels = []
-        obj_count = len(self.idf_objects)
-        obj_id_labels = ['Obj{}'.format(i) for i in range(1, obj_count + 1)]
+        label_key = (self.prefs['show_units_in_headers'], self.idf.si_units)
+        labels = self.state.field_labels if self.state is not None else dict()
+        field_labels = labels.get(label_key)
+        if field_labels is not None:
+            self.field_labels = field_labels
+            return
 
-        for key in self.idd_object._ordered_fields:
-            field = self.idd_object[key]
-            field_desc = field.tags.get('field', '')
+        field_labels = []
+        idd_object = self.idd_object
+        for key, field_desc in zip(idd_object.field_keys, idd_object.field_names):
             if self.prefs['show_units_in_headers']:
-                units = self.idf.units(field)
+                units = self.idf.units(idd_object[key])
                 unit_tag = ' ({})'.format(units) if units else ''
                 label = field_desc + unit_tag
             else:
                 label = field_desc
             field_labels.append(label)
 
-        self.object_labels = obj_id_labels
-        self.field_labels = field_labels
+        self.field_labels = labels[label_key] = field_labels
 
 
-class TransposeProxyModel(QAbstractProxyModel):
-    """Translates columns to rows or vice versa
+class TableProxyModel(QAbstractProxyModel):
+    """Proxy layer that transposes, filters and sorts the class table in one step.
+
+    Objects are shown as columns (Qt.Vertical) or as rows (Qt.Horizontal). The objects
+    in view are kept as a list of source rows, along with the position in view of each
+    source row, so indexes are mapped in either direction with a look-up. Without a
+    filter or a sort order, objects map directly to source rows. Transposing, filtering
+    and sorting are layout changes rather than model resets.
+
+    When there are more than PAGED_OBJECT_COUNT objects in view, only a sliding page of
+    TABLE_PAGE_SIZE objects is shown, so that views never deal with more sections than
+    that. Indexes of objects outside the page map to invalid indexes; use
+    :meth:`show_object` to bring an object into the page first.
     """
 
-    def __init__(self, parent, **kwargs):
-        self._obj_orientation = kwargs.pop('obj_orientation', Qt.Vertical)
-        super(TransposeProxyModel, self).__init__(parent, **kwargs)
+    page_changed = Signal()  #: Emitted when the page or the number of objects in view changes
+
+    def __init__(self, parent, obj_orientation=None):
+        super(TableProxyModel, self).__init__(parent)
+        self._obj_orientation = obj_orientation or Qt.Vertical
+        self._objects = None  # Source row of each object in view, or None if direct
+        self._positions = None  # Position in view of each source row (-1 if hidden)
+        self._page_start = 0  # Position in view of the first object of the page
+        self._page_size = None  # Number of objects per page, or None if not paged
+        self._matcher = None
+        self._accepted = dict()
+        self._sort_field = -1
+        self._sort_order = Qt.AscendingOrder
+        self._saved_indexes = None
+        self._relayout = False
 
     @property
     def obj_orientation(self):
@@ -399,300 +620,486 @@ class TransposeProxyModel(QAbstractProxyModel):
 
     @obj_orientation.setter
     def obj_orientation(self, value):
+        if value == self._obj_orientation:
+            return
+        self._begin_layout()
         self._obj_orientation = value
         self.sourceModel().obj_orientation = value
+        self._end_layout()
 
-    def setObjectClass(self, *args, **kwargs):
-        self.modelAboutToBeReset.emit()
-        self.beginResetModel()
-        self.sourceModel().setObjectClass(*args, **kwargs)
-        self.endResetModel()
+    @property
+    def obj_class(self):
+        return self.sourceModel().obj_class
 
-    def reset_model(self):
-        self.modelAboutToBeReset.emit()
-        self.beginResetModel()
-        self.sourceModel().reset_model()
-        self.endResetModel()
+    @property
+    def paged(self):
+        """Whether only a page of the objects in view is shown
+        """
 
-    def setSourceModel(self, source):
-        """Defines the source model to use and connects some signals.
+        return self._page_size is not None
 
-        :param source: QAbstractModel to use
+    @property
+    def page_start(self):
+        """Position in view of the first object of the page
         """
 
-        super(TransposeProxyModel, self).setSourceModel(source)
-
-        # Connect signals in a transposed way as well
-        if self.obj_orientation == Qt.Vertical:
-            self.sourceModel().rowsAboutToBeInserted.connect(self.columnsAboutToBeInserted.emit)
-            self.sourceModel().rowsInserted.connect(self.columnsInserted.emit)
-            self.sourceModel().rowsAboutToBeRemoved.connect(self.columnsAboutToBeRemoved.emit)
-            self.sourceModel().rowsRemoved.connect(self.columnsRemoved.emit)
-        else:
-            self.sourceModel().rowsAboutToBeInserted.connect(self.rowsAboutToBeInserted.emit)
-            self.sourceModel().rowsInserted.connect(self.rowsInserted.emit)
-            self.sourceModel().rowsAboutToBeRemoved.connect(self.rowsAboutToBeRemoved.emit)
-            self.sourceModel().rowsRemoved.connect(self.rowsRemoved.emit)
+        return self._page_start
 
-        self.sourceModel().dataChanged.connect(self.data_changed)
-        self.sourceModel().headerDataChanged.connect(self.header_data_changed)
+    def view_count(self):
+        """Returns the number of objects in view (filtered), on all pages
 
-    def mapFromSource(self, source_index):
+        :rtype: int
         """
 
-        :param source_index:
+        if self._objects is None:
+            return self.sourceModel().rowCount()
+        return len(self._objects)
+
+    def show_page(self, start):
+        """Shows the page starting at the given position in view, in one layout change
+
+        :param int start: Position in view of the first object to show
         """
 
-        if not source_index.isValid():
-            return QModelIndex()
+        if not self.paged:
+            return
+        start = max(0, min(start, self.view_count() - self._page_size))
+        if start == self._page_start:
+            return
+        self._begin_layout()
+        self._page_start = start
+        self._end_layout()
+        self.page_changed.emit()
 
-        if self.obj_orientation == Qt.Vertical:
-            return self.index(source_index.column(), source_index.row())
-        else:
-            return self.index(source_index.row(), source_index.column())
+    def show_object(self, source_row):
+        """Makes sure the given object is in the page, sliding the page so that the object
+        is in its middle if needed
 
-    def mapToSource(self, proxy_index):
+        :param int source_row: Position of the object in the source model
+        :returns: Whether the object is in view (False if it is filtered out)
+        :rtype: bool
         """
 
-        :param proxy_index:
+        position = source_row
+        if self._positions is not None:
+            if not 0 <= source_row < len(self._positions):
+                return False
+            position = self._positions[source_row]
+            if position < 0:
+                return False
+        if not self.paged:
+            return True
+        if not self._page_start <= position < self._page_start + self._page_size:
+            self.show_page(position - self._page_size // 2)
+        return True
+
+    def setSourceModel(self, source):
+        """Defines the source model to use and connects its signals
+
+        :param IDFObjectTableModel source: Source model to use
         """
 
-        if not proxy_index.isValid():
-            return QModelIndex()
+        super(TableProxyModel, self).setSourceModel(source)
+        source.modelAboutToBeReset.connect(self.beginResetModel)
+        source.modelReset.connect(self._source_reset)
+        source.rowsAboutToBeInserted.connect(self._source_rows_about_to_be_inserted)
+        source.rowsInserted.connect(self._source_rows_inserted)
+        source.rowsAboutToBeRemoved.connect(self._source_rows_about_to_be_removed)
+        source.rowsRemoved.connect(self._source_rows_removed)
+        source.dataChanged.connect(self._source_data_changed)
+        source.headerDataChanged.connect(self._source_header_data_changed)
 
-        if self.obj_orientation == Qt.Vertical:
-            return self.sourceModel().index(proxy_index.column(), proxy_index.row())
-        else:
-            return self.sourceModel().index(proxy_index.row(), proxy_index.column())
+    def setObjectClass(self, *args, **kwargs):
+        return self.sourceModel().setObjectClass(*args, **kwargs)
 
-    def mapSelectionFromSource(self, selection):
-        """
+    def reset_model(self):
+        self.sourceModel().reset_model()
+
+    def apply_filter(self, pattern, case_sensitive=False, accepted=None):
+        """Applies the given filter in one layout change, using the objects found to match
+        it ahead of time (by a :class:`FilterThread`, for example). Objects which were not
+        matched ahead of time (new ones) are matched as needed.
 
-        :param selection:
+        :param str pattern: Wildcard pattern, or None to clear the filter
+        :param bool case_sensitive: Whether the filter is case sensitive
+        :param dict accepted: Whether each object (by id) matches the filter
         """
 
-        return_selection = QItemSelection()
-        for sel in selection:
-            top_left = self.mapFromSource(sel.topLeft())
-            bottom_right = self.mapFromSource(sel.bottomRight())
-            sel_range = QItemSelectionRange(top_left, bottom_right)
-            return_selection.append(sel_range)
-        return return_selection
+        self._begin_layout()
+        self._matcher = wildcard_regex(pattern, case_sensitive) if pattern else None
+        self._accepted = accepted or dict()
+        self._page_start = 0
+        self._build_mapping()
+        self._end_layout()
+        self.page_changed.emit()
 
-    def mapSelectionToSource(self, selection):
-        """
+    def sort(self, column, order=Qt.AscendingOrder):
+        """Overrides Qt method to sort the objects by the value of a field (numbers first,
+        then text). Objects can only be sorted when they are shown as rows.
 
-        :param selection:
+        :param int column: Field to sort by, or -1 to restore the order of the file
+        :param int order: Qt.AscendingOrder or Qt.DescendingOrder
         """
 
-        return_selection = QItemSelection()
-        for sel in selection:
-            top_left = self.mapToSource(sel.topLeft())
-            bottom_right = self.mapToSource(sel.bottomRight())
-            sel_range = QItemSelectionRange(top_left, bottom_right)
-            return_selection.append(sel_range)
-        return return_selection
+        if column >= 0 and self._obj_orientation == Qt.Vertical:
+            return
+        self._begin_layout()
+        self._sort_field = column
+        self._sort_order = order
+        self._build_mapping()
+        self._end_layout()
+        self.page_changed.emit()
 
-    def index(self, row, col, parent=None):
-        """
+    def _accepts(self, idf_object):
+        """Returns whether the given object matches the filter, remembering the result
 
-        :param int row:
-        :param int col:
+        :param IDFObject idf_object: Object to match
+        :rtype: bool
         """
 
-        return self.createIndex(row, col)
+        accepted = self._accepted.get(id(idf_object))
+        if accepted is None:
+            si_units = self.sourceModel().idf.si_units
+            accepted = self._matcher.search(idf_object.search_text(si_units)) is not None
+            self._accepted[id(idf_object)] = accepted
+        return accepted
 
-    def parent(self, index):
-        """
+    def _sort_key(self, idf_object):
+        """Returns the key by which the given object is sorted
 
-        :param index:
+        :param IDFObject idf_object: Object to sort
+        :rtype: tuple
         """
 
-        return QModelIndex()
-
-    def rowCount(self, parent=None):
+        try:
+            field = idf_object[self._sort_field]
+        except IndexError:
+            field = None
+        value = field.value if field else ''
+        try:
+            return 0, float(value), ''
+        except ValueError:
+            return 1, 0.0, value.lower()
+
+    def _build_mapping(self):
+        """Finds the objects in view, in order, and the position in view of each object.
+        Also decides whether objects are paged, keeping the page within the objects.
         """
 
-        :param parent:
+        idf_objects = self.sourceModel().idf_objects or []
+        if self._matcher is None and self._sort_field < 0:
+            self._objects = None
+            self._positions = None
+            self._update_page()
+            return
+
+        rows = range(len(idf_objects))
+        if self._matcher is not None:
+            rows = [row for row in rows if self._accepts(idf_objects[row])]
+        if self._sort_field >= 0:
+            rows = sorted(rows, key=lambda row: self._sort_key(idf_objects[row]),
+                          reverse=self._sort_order == Qt.DescendingOrder)
+
+        positions = [-1] * len(idf_objects)
+        for position, row in enumerate(rows):
+            positions[row] = position
+        self._objects = list(rows)
+        self._positions = positions
+        self._update_page()
+
+    def _update_page(self):
+        """Pages the objects in view if there are too many, keeping the page within them
         """
 
-        if self.obj_orientation == Qt.Vertical:
-            return self.sourceModel().columnCount(parent)
+        count = self.view_count()
+        if count > PAGED_OBJECT_COUNT:
+            self._page_size = TABLE_PAGE_SIZE
+            self._page_start = max(0, min(self._page_start, count - TABLE_PAGE_SIZE))
         else:
-            return self.sourceModel().rowCount(parent)
+            self._page_size = None
+            self._page_start = 0
 
-    def columnCount(self, parent=None):
+    def _begin_layout(self):
+        """Starts a layout change, remembering the source of all persistent indexes
         """
 
-        :param parent:
+        self.layoutAboutToBeChanged.emit()
+        indexes = self.persistentIndexList()
+        self._saved_indexes = (indexes, [QPersistentModelIndex(self.mapToSource(index))
+                                         for index in indexes])
+
+    def _end_layout(self):
+        """Ends a layout change, moving persistent indexes to their new location
         """
 
-        if self.obj_orientation == Qt.Vertical:
-            return self.sourceModel().rowCount(parent)
-        else:
-            return self.sourceModel().columnCount(parent)
+        indexes, source_indexes = self._saved_indexes
+        self._saved_indexes = None
+        self.changePersistentIndexList(indexes, [self.mapFromSource(index)
+                                                 for index in source_indexes])
+        self.layoutChanged.emit()
 
-    def data(self, index, role):
-        """
+    def _object_count(self):
+        if self.paged:
+            return min(self._page_size, self.view_count() - self._page_start)
+        return self.view_count()
 
-        :param index:
-        :param int role:
+    def _direct(self):
+        """Returns whether objects map directly to source rows (not filtered, sorted or
+        paged), in which case inserted and removed objects are forwarded as such
         """
 
-        return self.sourceModel().data(self.mapToSource(index), role)
+        return self._objects is None and not self.paged
 
-    def headerData(self, section, orientation, role):
-        """Gets header data
+    def _source_row(self, position):
+        """Returns the source row of the object at the given position in the page
 
-        :param int section:
-        :param int orientation:
-        :param int role:
+        :param int position: Position of the object in the page
+        :returns: The source row, or None if there is no object at that position
         """
 
-        new_orientation = orientation
-        if role == Qt.DisplayRole or role == Qt.ToolTipRole:
-            transposed = True if self.obj_orientation == Qt.Vertical else False
-            if orientation == Qt.Horizontal:
-                new_orientation = Qt.Vertical if transposed else orientation
-            else:
-                new_orientation = Qt.Horizontal if transposed else orientation
-        return self.sourceModel().headerData(section, new_orientation, role)
+        if not 0 <= position < self._object_count():
+            return None
+        position += self._page_start
+        return position if self._objects is None else self._objects[position]
 
-    def removeObjects(self, *args, **kwargs):
-        """Calls source model's removeObjects
+    def _page_position(self, source_row):
+        """Returns the position in the page of the object at the given source row
+
+        :param int source_row: Position of the object in the source model
+        :returns: The position, or None if the object is hidden or not in the page
         """
 
-        # Do NOT map to source. Pass through only.
-        return self.sourceModel().removeObjects(*args, **kwargs)
+        position = source_row
+        if self._positions is not None:
+            if not 0 <= source_row < len(self._positions):
+                return None
+            position = self._positions[source_row]
+        position -= self._page_start
+        if not 0 <= position < self._object_count():
+            return None
+        return position
 
-    def insertObjects(self, *args, **kwargs):
-        """Calls source model's insertObjects
+    def _proxy_index(self, position, field):
+        """Returns the index of the given field of the object at the given position
+
+        :param int position: Position of the object in view
+        :param int field: Position of the field
+        :rtype: QModelIndex
         """
 
-        # Do NOT map to source. Pass through only.
-        return self.sourceModel().insertObjects(*args, **kwargs)
+        if self._obj_orientation == Qt.Vertical:
+            return self.index(field, position)
+        return self.index(position, field)
 
-    def contiguous(self, *args, **kwargs):
-        """Calls source model's contiguous function
-        """
+    def _source_reset(self):
+        self._page_start = 0
+        self._build_mapping()
+        self.endResetModel()
+        self.page_changed.emit()
+
+    def _source_rows_about_to_be_inserted(self, parent, first, last):
+        self._relayout = not self._direct()
+        if self._relayout:
+            self._begin_layout()
+        elif self._obj_orientation == Qt.Vertical:
+            self.beginInsertColumns(QModelIndex(), first, last)
+        else:
+            self.beginInsertRows(QModelIndex(), first, last)
 
-        # Do NOT map to source. Pass through only.
-        return self.sourceModel().contiguous(*args, **kwargs)
+    def _source_rows_inserted(self, parent, first, last):
+        if self._relayout:
+            self._build_mapping()
+            self._end_layout()
+            self.page_changed.emit()
+            return
+        if self._obj_orientation == Qt.Vertical:
+            self.endInsertColumns()
+        else:
+            self.endInsertRows()
 
-    def setData(self, index, value, role):
-        """Calls source model's setData function
-        """
+        # Start paging if there are now too many objects
+        if self.view_count() > PAGED_OBJECT_COUNT:
+            self._begin_layout()
+            self._update_page()
+            self._end_layout()
+        self.page_changed.emit()
+
+    def _source_rows_about_to_be_removed(self, parent, first, last):
+        self._relayout = not self._direct()
+        if self._relayout:
+            self._begin_layout()
+        elif self._obj_orientation == Qt.Vertical:
+            self.beginRemoveColumns(QModelIndex(), first, last)
+        else:
+            self.beginRemoveRows(QModelIndex(), first, last)
+
+    def _source_rows_removed(self, parent, first, last):
+        if self._relayout:
+            self._build_mapping()
+            self._end_layout()
+        elif self._obj_orientation == Qt.Vertical:
+            self.endRemoveColumns()
+        else:
+            self.endRemoveRows()
+        self.page_changed.emit()
 
-        return self.sourceModel().setData(self.mapToSource(index), value, role)
+    def _source_data_changed(self, top_left, bottom_right, roles=None):
+        positions = [self._page_position(row)
+                     for row in range(top_left.row(), bottom_right.row() + 1)]
+        positions = [position for position in positions if position is not None]
+        if not positions:
+            return
+        first = self._proxy_index(min(positions), top_left.column())
+        last = self._proxy_index(max(positions), bottom_right.column())
+        self.dataChanged.emit(first, last)
 
-    def data_changed(self, top_left, bottom_right):
-        """Emits signals in source model
+    def _source_header_data_changed(self, orientation, first, last):
+        if self._obj_orientation == Qt.Vertical:
+            orientation = Qt.Vertical if orientation == Qt.Horizontal else Qt.Horizontal
+        self.headerDataChanged.emit(orientation, first, last)
 
-        :param int top_left:
-        :param int bottom_right:
-        """
+    def mapToSource(self, proxy_index):
+        """Overrides Qt method to map an index of this model to the source model
 
-        self.dataChanged.emit(self.mapFromSource(top_left),
-                              self.mapFromSource(bottom_right))
+        :param QModelIndex proxy_index: Index to map
+        :rtype: QModelIndex
+        """
 
-    def header_data_changed(self, orientation, first, last):
-        transposed = True if self.obj_orientation == Qt.Vertical else False
-        if orientation == Qt.Horizontal:
-            new_orientation = Qt.Vertical if transposed else orientation
+        if not proxy_index.isValid():
+            return QModelIndex()
+        if self._obj_orientation == Qt.Vertical:
+            position, field = proxy_index.column(), proxy_index.row()
         else:
-            new_orientation = Qt.Horizontal if transposed else orientation
-        self.headerDataChanged.emit(new_orientation, first, last)
+            position, field = proxy_index.row(), proxy_index.column()
+        row = self._source_row(position)
+        if row is None:
+            return QModelIndex()
+        return self.sourceModel().index(row, field)
 
-    @property
-    def obj_class(self):
-        """Calls source model obj_class
+    def mapFromSource(self, source_index):
+        """Overrides Qt method to map an index of the source model to this model
+
+        :param QModelIndex source_index: Index to map
+        :rtype: QModelIndex
         """
 
-        return self.sourceModel().obj_class
+        if not source_index.isValid():
+            return QModelIndex()
+        position = self._page_position(source_index.row())
+        if position is None:
+            return QModelIndex()
+        return self._proxy_index(position, source_index.column())
 
+    @staticmethod
+    def _runs(values):
+        """Groups the given integers into runs of consecutive values
 
-class SortFilterProxyModel(QSortFilterProxyModel):
-    """Proxy layer to sort and filter
-    """
+        :param values: Integers to group
+        :returns: List of (first, last) tuples
+        :rtype: list
+        """
 
-    def __init__(self, parent, obj_orientation=None):
-        super(SortFilterProxyModel, self).__init__(parent)
+        runs = []
+        for value in sorted(values):
+            if runs and runs[-1][1] == value - 1:
+                runs[-1][1] = value
+            else:
+                runs.append([value, value])
+        return [tuple(run) for run in runs]
 
-        self._obj_orientation = obj_orientation or Qt.Vertical
-        syntax = QRegExp.PatternSyntax(QRegExp.Wildcard)
-        case_sensitivity = Qt.CaseInsensitive
+    def mapSelectionToSource(self, selection):
+        """Overrides Qt method to map a selection of this model to the source model.
+        Objects which are not consecutive in the source become separate ranges.
 
-        self.setFilterRegExp(QRegExp('', case_sensitivity, syntax))
-        self.setFilterCaseSensitivity(case_sensitivity)
+        :param QItemSelection selection: Selection to map
+        :rtype: QItemSelection
+        """
 
-    @property
-    def obj_orientation(self):
-        return self._obj_orientation
+        source = self.sourceModel()
+        return_selection = QItemSelection()
+        for sel in selection:
+            if self._obj_orientation == Qt.Vertical:
+                positions = range(sel.left(), sel.right() + 1)
+                first_field, last_field = sel.top(), sel.bottom()
+            else:
+                positions = range(sel.top(), sel.bottom() + 1)
+                first_field, last_field = sel.left(), sel.right()
+            rows = [self._source_row(position) for position in positions]
+            rows = [row for row in rows if row is not None]
+            for first, last in self._runs(rows):
+                return_selection.append(QItemSelectionRange(source.index(first, first_field),
+                                                            source.index(last, last_field)))
+        return return_selection
 
-    @obj_orientation.setter
-    def obj_orientation(self, value):
-        self._obj_orientation = value
-        self.sourceModel().obj_orientation = value
+    def mapSelectionFromSource(self, selection):
+        """Overrides Qt method to map a selection of the source model to this model.
+        Hidden objects, and those outside of the page, are left out.
 
-    def setObjectClass(self, *args, **kwargs):
-        self.modelAboutToBeReset.emit()
-        self.beginResetModel()
-        self.sourceModel().setObjectClass(*args, **kwargs)
-        self.endResetModel()
+        :param QItemSelection selection: Selection to map
+        :rtype: QItemSelection
+        """
 
-    def reset_model(self):
-        self.modelAboutToBeReset.emit()
-        self.beginResetModel()
-        self.sourceModel().reset_model()
-        self.endResetModel()
+        return_selection = QItemSelection()
+        for sel in selection:
+            positions = [self._page_position(row) for row in range(sel.top(), sel.bottom() + 1)]
+            positions = [position for position in positions if position is not None]
+            for first, last in self._runs(positions):
+                top_left = self._proxy_index(first, sel.left())
+                bottom_right = self._proxy_index(last, sel.right())
+                return_selection.append(QItemSelectionRange(top_left, bottom_right))
+        return return_selection
 
-    def filterAcceptsColumn(self, col, parent):
-        if self.obj_orientation == Qt.Horizontal:
-            return True
+    def index(self, row, col, parent=None):
+        """Overrides Qt method to create indexes within the bounds of the table
 
-        model = self.sourceModel()
-        row_count = model.rowCount(col)
-        reg_exp = self.filterRegExp()
+        :param int row: Row of the index
+        :param int col: Column of the index
+        :rtype: QModelIndex
+        """
 
-        for row in range(row_count):
-            data = model.index(row, col, parent).data()
-            if reg_exp.indexIn(data) != -1:
-                return True
+        if row < 0 or col < 0 or row >= self.rowCount() or col >= self.columnCount():
+            return QModelIndex()
+        return self.createIndex(row, col)
 
-        return False
+    def parent(self, index=None):
+        return QModelIndex()
 
-    def filterAcceptsRow(self, row, parent):
-        if self.obj_orientation == Qt.Vertical:
-            return True
+    def rowCount(self, parent=None):
+        if self._obj_orientation == Qt.Vertical:
+            return self.sourceModel().columnCount()
+        return self._object_count()
 
-        model = self.sourceModel()
-        column_count = model.columnCount(row)
-        reg_exp = self.filterRegExp()
+    def columnCount(self, parent=None):
+        if self._obj_orientation == Qt.Vertical:
+            return self._object_count()
+        return self.sourceModel().columnCount()
 
-        for col in range(column_count):
-            data = model.index(row, col, parent).data()
-            if reg_exp.indexIn(data) != -1:
-                return True
+    def data(self, index, role=Qt.DisplayRole):
+        return self.sourceModel().data(self.mapToSource(index), role)
 
-        return False
+    def setData(self, index, value, role=Qt.EditRole):
+        return self.sourceModel().setData(self.mapToSource(index), value, role)
 
-    def mapSelectionFromSource(self, selection):
-        return_selection = QItemSelection()
-        for sel in selection:
-            top_left = self.mapFromSource(sel.topLeft())
-            bottom_right = self.mapFromSource(sel.bottomRight())
-            sel_range = QItemSelectionRange(top_left, bottom_right)
-            return_selection.append(sel_range)
-        return return_selection
+    def flags(self, index):
+        return self.sourceModel().flags(self.mapToSource(index))
 
-    def mapSelectionToSource(self, selection):
-        return_selection = QItemSelection()
-        for sel in selection:
-            top_left = self.mapToSource(sel.topLeft())
-            bottom_right = self.mapToSource(sel.bottomRight())
-            sel_range = QItemSelectionRange(top_left, bottom_right)
-            return_selection.append(sel_range)
-        return return_selection
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        """Overrides Qt method to provide header text, transposed and for the objects in
+        view (objects keep their number in the file)
+
+        :param int section: Index of header being requested
+        :param int orientation: Vertical or Horizontal header requested
+        :param int role: Qt.Role
+        """
+
+        if role == Qt.DisplayRole or role == Qt.ToolTipRole:
+            if self._obj_orientation == Qt.Vertical:
+                orientation = Qt.Vertical if orientation == Qt.Horizontal else Qt.Horizontal
+            if orientation == Qt.Vertical:
+                section = self._source_row(section)
+                if section is None:
+                    return None
+        return self.sourceModel().headerData(section, orientation, role)
 
     def removeObjects(self, *args, **kwargs):
         # Do NOT map to source. Pass through only.
@@ -706,10 +1113,6 @@ class SortFilterProxyModel(QSortFilterProxyModel):
         # Do NOT map to source. Pass through only.
         return self.sourceModel().contiguous(*args, **kwargs)
 
-    @property
-    def obj_class(self):
-        return self.sourceModel().obj_class
-
 
 class TableView(QTableView):
     """Subclass of QTableView to allow custom editing behaviour.
@@ -719,6 +1122,42 @@ class TableView(QTableView):
         super(TableView, self).__init__(parent, **kwargs)
         self.prefs = parent.prefs
 
+        # Rows already resized to their contents, forgotten when their contents change
+        self._sized_rows = set()
+        self._resize_timer = QTimer(self)
+        self._resize_timer.setSingleShot(True)
+        self._resize_timer.setInterval(ROW_RESIZE_DELAY)
+        self._resize_timer.timeout.connect(self.resize_visible_rows)
+        self.horizontalHeader().sectionResized.connect(self.forget_row_sizes)
+
+    def setModel(self, model):
+        """Overrides Qt method to forget row sizes when the model's contents change
+
+        :param model: Model to display
+        """
+
+        super(TableView, self).setModel(model)
+        model.dataChanged.connect(self.rows_changed)
+        for signal in (model.modelReset, model.layoutChanged, model.rowsInserted,
+                       model.rowsRemoved, model.columnsInserted, model.columnsRemoved):
+            signal.connect(self.forget_row_sizes)
+
+    def rows_changed(self, top_left, bottom_right, roles=None):
+        """Forgets the size of the rows whose contents changed
+
+        :param QModelIndex top_left: Top left index of the changed range
+        :param QModelIndex bottom_right: Bottom right index of the changed range
+        :param list roles: Roles that changed
+        """
+
+        self._sized_rows.difference_update(range(top_left.row(), bottom_right.row() + 1))
+
+    def forget_row_sizes(self, *args):
+        """Forgets the size of all rows (after structural or column width changes)
+        """
+
+        self._sized_rows.clear()
+
     def keyPressEvent(self, event):
         if event.key() == Qt.Key_Return or event.key() == Qt.Key_Enter:
             if self.state() != QAbstractItemView.EditingState:
@@ -803,10 +1242,36 @@ class TableView(QTableView):
 
         self.setCurrentIndex(to_select)
 
+    def schedule_resize_rows(self):
+        """Resizes the visible rows once scrolling pauses for :data:`ROW_RESIZE_DELAY` ms
+        """
+
+        self._resize_timer.start()
+
     def resize_visible_rows(self):
-        viewport_rect = QRect(QPoint(0, 0), self.viewport().size())
-        for row in range(self.model().rowCount()):
-            rect = self.visualRect(self.model().index(row, 0))
-            is_visible = viewport_rect.contains(rect)
-            if is_visible:
+        """Resizes the rows in view to their contents (for text wrap). Rows which were
+        already resized and didn't change since are skipped.
+        """
+
+        self._resize_timer.stop()
+        model = self.model()
+        if not model:
+            return
+        first_row = self.rowAt(0)
+        if first_row < 0:
+            return
+        last_row = self.rowAt(self.viewport().height() - 1)
+        if last_row < 0:
+            last_row = model.rowCount() - 1
+
+        # Resizing rows can bring more of them into view, so check the edge again
+        row = first_row
+        while row <= last_row:
+            if row not in self._sized_rows:
                 self.resizeRowToContents(row)
+                self._sized_rows.add(row)
+            row += 1
+            if row > last_row:
+                last_row = self.rowAt(self.viewport().height() - 1)
+                if last_row < 0:
+                    last_row = model.rowCount() - 1
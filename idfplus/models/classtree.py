@@ -7,7 +7,7 @@
 """
 
 # PySide2 imports
-from PySide2.QtCore import Qt, QSortFilterProxyModel, QRegExp
+from PySide2.QtCore import Qt, QSortFilterProxyModel, QRegExp, QModelIndex
 from PySide2.QtGui import QColor
 
 # Package imports
@@ -24,7 +24,42 @@ class ObjectClassTreeModel(CustomTreeModel):
         super(ObjectClassTreeModel, self).__init__(parent)
         self.rootItem = TreeItem(("Object Class", "#"))
         self.show_groups = not hide_groups
+        self.idf = idf
+        self._class_items = dict()
         self.setupModelData(idf, self.rootItem)
+        idf.add_listener(self.objects_changed)
+
+    def detach(self):
+        """Stops following the objects added to and removed from the IDF file
+        """
+
+        self.idf.remove_listener(self.objects_changed)
+
+    def objects_changed(self, obj_class):
+        """Called by the IDF file when objects are added to or removed from a class, to
+        tell views that its object count changed
+
+        :param str obj_class: Class of the objects (lower case)
+        """
+
+        item = self._class_items.get(obj_class)
+        if item is not None:
+            index = self.createIndex(item.row(), 1, item)
+            self.dataChanged.emit(index, index)
+
+    def set_show_groups(self, show_groups):
+        """Shows or hides the group headers. Class items are kept and moved, not rebuilt.
+
+        :param bool show_groups: Whether to show group headers
+        """
+
+        if show_groups == self.show_groups:
+            return
+        self.beginResetModel()
+        self.show_groups = show_groups
+        self.rootItem.clearChildren()
+        self.setupModelData(self.idf, self.rootItem)
+        self.endResetModel()
 
     def flags(self, index):
         if not index.isValid():
@@ -57,21 +92,21 @@ class ObjectClassTreeModel(CustomTreeModel):
         return data
 
     def setupModelData(self, idf, parent):
-        if self.show_groups:
-            group = ''
-            for obj_class, obj in idf.idd.items():
-                if group != obj.group:
-                    group = obj.group
-                    group_root = TreeItem((group, ''), parent)
-                    parent.appendChild(group_root)
+        group = None
+        group_root = parent
+        for obj_class, obj in idf.idd.items():
+            if self.show_groups and group != obj.group:
+                group = obj.group
+                group_root = TreeItem((group, ''), parent)
+                parent.appendChild(group_root)
+
+            # Class items hold the live list of objects, they are only created once
+            key = obj_class.lower()
+            child = self._class_items.get(key)
+            if child is None:
                 objs = idf.get(obj_class, None)
-                child = TreeItem((obj.obj_class_display, objs), group_root)
-                group_root.appendChild(child)
-        else:
-            for obj_class, obj in idf.idd.items():
-                objs = idf.get(obj.obj_class_display, None)
-                child = TreeItem((obj.obj_class_display, objs), parent)
-                parent.appendChild(child)
+                child = self._class_items[key] = TreeItem((obj.obj_class_display, objs))
+            group_root.appendChild(child)
 
     def setData(self, index, value, role=Qt.EditRole):
         if role != Qt.EditRole:
@@ -95,11 +130,59 @@ class TreeSortFilterProxyModel(QSortFilterProxyModel):
         self.show_groups = not kwargs.pop('hide_groups', True)
         super(TreeSortFilterProxyModel, self).__init__(*args, **kwargs)
 
+        # Parents of matching rows are kept, and rows whose data changed (such as object
+        # counts) are filtered again on their own
+        self.setRecursiveFilteringEnabled(True)
+
         syntax = QRegExp.PatternSyntax(QRegExp.Wildcard)
         case_sensitivity = Qt.CaseInsensitive
 
         self.setFilterRegExp(QRegExp('', case_sensitivity, syntax))
         self.setFilterCaseSensitivity(case_sensitivity)
+        self._accepted_key = None
+        self._accepted = dict()
+
+    def class_names(self):
+        """Returns the names of all classes and groups in the tree, as matched by the filter
+
+        :rtype: list
+        """
+
+        model = self.sourceModel()
+        names = list()
+
+        def add_names(parent):
+            for row in range(model.rowCount(parent)):
+                index = model.index(row, 0, parent)
+                names.append(index.data())
+                add_names(index)
+
+        add_names(QModelIndex())
+        return names
+
+    def set_hide_empty_classes(self, hide_empty_classes):
+        """Hides or shows the classes without objects
+
+        :param bool hide_empty_classes: Whether to hide classes without objects
+        """
+
+        self.hide_empty_classes = hide_empty_classes
+        self.invalidateFilter()
+
+    def apply_filter(self, pattern, case_sensitive=False, accepted=None):
+        """Applies the given filter in one layout change, using the names found to match it
+        ahead of time (by a :class:`FilterThread`, for example).
+
+        :param str pattern: Wildcard pattern, or None to clear the filter
+        :param bool case_sensitive: Whether the filter is case sensitive
+        :param dict accepted: Whether each name matches the filter
+        """
+
+        self._accepted_key = (pattern or '', case_sensitive)
+        self._accepted = accepted or dict()
+        syntax = QRegExp.PatternSyntax(QRegExp.Wildcard)
+        case_sensitivity = Qt.CaseSensitive if case_sensitive else Qt.CaseInsensitive
+        self.setFilterRegExp(QRegExp(pattern or '', case_sensitivity, syntax))
 
     def filterAcceptsRow(self, row, parent):
         """Filters rows
@@ -121,26 +204,15 @@ class TreeSortFilterProxyModel(QSortFilterProxyModel):
                 if data == '':
                     return False
 
-        # Check if the current row matches
-        if self.filter_accepts_row_itself(row, parent):
-            return True
-
-        # Finally, check if any of the children match
-        return self.has_accepted_children(row, parent)
+        # Check if the current row matches (rows with matching children are kept by Qt)
+        return self.filter_accepts_row_itself(row, parent)
 
     def filter_accepts_row_itself(self, row, parent):
+        # Use the result found ahead of time for this filter, if there is one
+        key = (self.filterRegExp().pattern(), self.filterCaseSensitivity() == Qt.CaseSensitive)
+        if self._accepted_key == key:
+            name = self.sourceModel().index(row, 0, parent).data()
+            accepted = self._accepted.get(name)
+            if accepted is not None:
+                return accepted
         return super(TreeSortFilterProxyModel, self).filterAcceptsRow(row, parent)
-
-    def has_accepted_children(self, row, parent):
-        """Starting from the current node as root, traverse all the descendants and test if
-        any of the children match
-        """
-
-        model = self.sourceModel()
-        source_index = model.index(row, 0, parent)
-
-        children_count = model.rowCount(source_index)
-        for i in range(children_count):
-            if self.filterAcceptsRow(i, source_index):
-                return True
-        return False
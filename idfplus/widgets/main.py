@@ -17,7 +17,7 @@ from PySide2.QtWidgets import (QUndoStack, QApplication, QAbstractItemView, QFra
                                QTreeView, QLineEdit, QPushButton, QWidget, QTextEdit, QMenu,
                                QPlainTextEdit, QUndoView, QLabel, QProgressBar, QSystemTrayIcon,
                                QAction, QActionGroup, QCheckBox, QHeaderView, QVBoxLayout,
-                               QHBoxLayout, QDesktopWidget)
+                               QHBoxLayout, QDesktopWidget, QSpinBox)
 
 # Package imports
 from ..models import classtable
@@ -77,16 +77,14 @@ class UIMainWindow(object):
         classTable.setContextMenuPolicy(Qt.CustomContextMenu)
         classTable.customContextMenuRequested.connect(self.custom_table_context_menu)
 
-        # Create table model and proxy layers for transposing and filtering
+        # Create table model and the proxy layer for transposing and filtering
         self.classTableModel = classtable.IDFObjectTableModel(classTable)
-        self.transposeableModel = classtable.TransposeProxyModel(self.classTableModel)
-        self.transposeableModel.setSourceModel(self.classTableModel)
-        self.sortableModel = classtable.SortFilterProxyModel(self.transposeableModel)
-        self.sortableModel.setSourceModel(self.transposeableModel)
+        self.tableProxyModel = classtable.TableProxyModel(self.classTableModel)
+        self.tableProxyModel.setSourceModel(self.classTableModel)
 
         # Assign model to table (enable sorting FIRST)
         # table.setSortingEnabled(True) # Disable for now, CRUD actions won't work!
-        classTable.setModel(self.sortableModel)
+        classTable.setModel(self.tableProxyModel)
 
         # Connect some signals
         selection_model = classTable.selectionModel()
@@ -699,6 +697,18 @@ class UIMainWindow(object):
         self.filterToolBar.addSeparator()
         self.filterToolBar.addAction(self.transposeAct)
 
+        # Jump to an object by number, moving the page of large classes along with it
+        self.filterToolBar.addSeparator()
+        self.jumpToObjectBox = QSpinBox()
+        self.jumpToObjectBox.setPrefix('Obj ')
+        self.jumpToObjectBox.setRange(1, 1)
+        self.jumpToObjectBox.setKeyboardTracking(False)
+        self.jumpToObjectBox.setToolTip('Jump to object')
+        self.jumpToObjectBox.setEnabled(False)
+        self.jumpToObjectBox.valueChanged.connect(self.jump_to_object)
+        self.tableProxyModel.page_changed.connect(self.update_jump_box)
+        self.filterToolBar.addWidget(self.jumpToObjectBox)
+
     def create_shortcuts(self):
         """Creates keyboard shortcuts.
         """
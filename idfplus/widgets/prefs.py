@@ -352,11 +352,23 @@ class SaveTab(QWidget):
         save_additional_box.addStretch(1)
         self.save_additional_group_box.setLayout(save_additional_box)
 
+        # Worker processes code
+        processes_label = QLabel("Worker processes used to save large files (0 for none):")
+        self.processes_edit = QLineEdit(str(self.prefs['save_processes']))
+        self.processes_edit.setMinimumWidth(40)
+        self.processes_edit.setMaximumWidth(100)
+        validator = QIntValidator(0, 64, self)
+        self.processes_edit.setValidator(validator)
+        self.processes_edit.textChanged.connect(self.update)
+
         # Main layout code
         main_layout = QVBoxLayout()
         main_layout.addWidget(self.save_additional_group_box)
         main_layout.addSpacing(10)
         main_layout.addWidget(self.save_group_box)
+        main_layout.addSpacing(10)
+        main_layout.addWidget(processes_label)
+        main_layout.addWidget(self.processes_edit)
         main_layout.addStretch(1)
         self.setLayout(main_layout)
 
@@ -378,6 +390,7 @@ class SaveTab(QWidget):
         self.prefs['save_units'] = 1 if self.save_units_check.checkState() else 0
         self.prefs['save_hidden_classes'] = 1 if self.save_hidden_classes_check.checkState() else 0
         self.prefs['save_hide_groups'] = 1 if self.save_groups_check.checkState() else 0
+        self.prefs['save_processes'] = int(self.processes_edit.text() or 0)
 
 
 class AdvancedTab(QWidget):
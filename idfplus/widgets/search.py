@@ -235,6 +235,9 @@ class SearchReplaceDialog(QDialog):
         if response is not True:
             return
 
+        # Objects of the class in the table are removed through its model, to update it
+        table_model = self.parent.classTableModel
+        changed_classes = set()
         for i in range(result_count):
             item_0 = model.itemFromIndex(model.index(i, 0))
             item_2 = model.itemFromIndex(model.index(i, 2))
@@ -245,13 +248,18 @@ class SearchReplaceDialog(QDialog):
             obj_class = self.parent.idf.idf_objects(obj.obj_class)
             try:
                 index = obj_class.index(obj)
-                self.parent.idf.remove_objects(obj.obj_class, index, index + 1)
             except ValueError:
-                pass  # already deleted
+                continue  # already deleted
+            if obj_class is table_model.idf_objects:
+                table_model.remove_rows(index, index + 1)
+            else:
+                self.parent.idf.remove_objects(obj.obj_class, index, index + 1)
+                changed_classes.add(obj.obj_class)
 
         self.parent.set_dirty(True)
         self.submit_search()
-        self.parent.load_table_view(self.parent.current_obj_class)
+        table_model.forget_states(changed_classes)
+        self.parent.refresh_table_view()
         QMessageBox.information(self, "Delete Action", "Deletion Complete!")
 
     def advanced_search_checked(self):
@@ -283,12 +291,14 @@ class SearchReplaceDialog(QDialog):
         if response is not True:
             return
 
+        changed_classes = set()
         for i in range(result_count):
             item_0 = model.itemFromIndex(model.index(i, 0))
             item_2 = model.itemFromIndex(model.index(i, 2))
             if item_0.checkState() != Qt.Checked:
                 continue
             field = self.parent.idf.field_by_uuid(item_2.text())
+            changed_classes.add(field.obj_class)
             if self.whole_field_checkbox.isChecked() or self.advanced_search_checkbox.isChecked():
                 field.value = replace_with_text
             else:
@@ -297,7 +307,7 @@ class SearchReplaceDialog(QDialog):
 
         self.parent.set_dirty(True)
         self.submit_search()
-        self.parent.load_table_view(self.parent.current_obj_class)
+        self.parent.refresh_table_view(changed_classes)
         QMessageBox.information(self, "Replacement", "Replacement Complete!")
 
     def confirm_action(self, question):
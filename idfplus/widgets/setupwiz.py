@@ -15,7 +15,8 @@ from PySide2.QtWidgets import (QWizardPage, QLabel, QVBoxLayout, QPushButton, QP
                                QFileDialog, QWizard)
 
 # Package imports
-from ..eplusio import parser
+from .. import workers
+from ..eplusio import precompile
 
 # Setup logging
 log = logging.getLogger(__name__)
@@ -76,6 +77,7 @@ class SetupWizLoadPage(QWizardPage):
 
         self.version = version
         self.complete = False
+        self.idd_thread = None
         self.setTitle('Browse for the IDD file')
         self.setSubTitle('Browse for the specified IDD version below.')
         self.setup_page()
@@ -91,27 +93,35 @@ class SetupWizLoadPage(QWizardPage):
         intro_text.setWordWrap(True)
 
         # Create the button to browse for the idd file
-        browse_button = QPushButton("Browse for Energy+.idd v{} in the EnergyPlus "
-                                          "install directory".format(self.version))
-        browse_button.clicked.connect(self.load_idd)
+        self.browse_button = QPushButton("Browse for Energy+.idd v{} in the EnergyPlus "
+                                         "install directory".format(self.version))
+        self.browse_button.clicked.connect(self.load_idd)
 
-        # Create and configure the progress bar
+        # Create and configure the progress bar and status message
         self.progress_bar = QProgressBar(self)
         self.progress_bar.setRange(0, 100)
         self.progress_bar.hide()
+        self.status_text = QLabel()
+        self.status_text.setWordWrap(True)
 
         # Create and assign layout
         layout = QVBoxLayout()
         layout.addWidget(intro_text)
-        layout.addWidget(browse_button)
+        layout.addWidget(self.browse_button)
         layout.addWidget(self.progress_bar)
+        layout.addWidget(self.status_text)
         self.setLayout(layout)
 
     def load_idd(self):
         """Create and open file dialog
         """
 
+        # Start in the install directory of the requested version, if it can be found
         directory = os.path.expanduser('~')
+        for file_path in precompile.find_idd_files():
+            if precompile.idd_version(file_path) == self.version:
+                directory = os.path.dirname(file_path)
+                break
         formats = "EnergyPlus IDD Files (*.idd)"
         dialog_name = 'Select EnergyPlus IDD File (Version: {})'.format(self.version)
         file_dialog = QFileDialog()
@@ -122,17 +132,49 @@ class SetupWizLoadPage(QWizardPage):
             self.complete = False
             return
 
-        # Show progress bar and parse IDD file
-        self.progress_bar.show()
+        # Show progress bar and parse IDD file in the background
         log.debug("Processing IDD file")
-        idd_parser = parser.IDDParser()
-        for progress in idd_parser.parse_idd(dir_name):
-            self.progress_bar.setValue(progress)
+        self.complete = False
+        self.completeChanged.emit()
+        self.browse_button.setEnabled(False)
+        self.status_text.setText('Processing {}...'.format(dir_name))
+        self.progress_bar.setValue(0)
+        self.progress_bar.show()
+        self.idd_thread = workers.IDDThread(dir_name, self)
+        self.idd_thread.progress.connect(self.progress_bar.setValue)
+        self.idd_thread.processed.connect(self.idd_processed)
+        self.idd_thread.start()
 
-        # Upon completion set complete status to true and inform object
-        self.complete = True
+    def idd_processed(self):
+        """Called when the IDD file has been processed in the background
+        """
+
+        thread = self.idd_thread
+        if thread is None:
+            return
+        self.idd_thread = None
+        thread.wait()
+        thread.deleteLater()
+        self.browse_button.setEnabled(True)
+
+        # Upon completion set complete status and inform object
+        if thread.error:
+            self.status_text.setText('This IDD file could not be processed: '
+                                     '{}'.format(thread.error))
+            self.complete = False
+        else:
+            self.status_text.setText('IDD version {} processed.'.format(thread.version))
+            self.complete = True
         self.completeChanged.emit()
 
+    def wait_for_idd(self):
+        """Blocks until the IDD file being processed in the background, if any, is done
+        """
+
+        if self.idd_thread is not None:
+            self.idd_thread.wait()
+            self.idd_processed()
+
     def isComplete(self):
         """
 
@@ -159,8 +201,18 @@ class SetupWizard(QWizard):
         # Add pages to the wizard and set some parameters
         log.debug("Initializing IDD Processing Wizard")
         self.addPage(SetupWizIntroPage(self, version, message))
-        self.addPage(SetupWizLoadPage(self, version))
+        self.load_page = SetupWizLoadPage(self, version)
+        self.addPage(self.load_page)
         self.setWindowTitle("IDD Processing Wizard")
         self.setWizardStyle(QWizard.ModernStyle)
         self.setOptions(QWizard.NoBackButtonOnStartPage |
                         QWizard.NoBackButtonOnLastPage)
+
+    def done(self, result):
+        """Waits for any IDD file being processed before closing the wizard.
+
+        :param int result: Result of the wizard
+        """
+
+        self.load_page.wait_for_idd()
+        super(SetupWizard, self).done(result)
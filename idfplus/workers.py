@@ -0,0 +1,132 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""Worker threads for long-running operations which should not block the user interface
+
+:copyright: (c) 2019 by Matt Doiron.
+:license: GPL v3, see LICENSE for more details.
+"""
+
+# System imports
+import logging
+
+# PySide2 imports
+from PySide2.QtCore import Signal, QThread
+
+# Package imports
+from .eplusio import parser
+from .eplusio import epjson
+
+# Setup logging
+log = logging.getLogger(__name__)
+
+# Number of items matched between checks for a newer filter
+FILTER_CHECK_INTERVAL = 500
+
+
+class SaveThread(QThread):
+    """Writes a snapshot of an IDF file to disk in the background.
+
+    The snapshot must be taken (on the GUI thread) before the thread is started, after which
+    the IDF file itself can continue to be edited.
+    """
+
+    progress = Signal(int)  #: Emitted with the progress of the save (0 to 100)
+    saved = Signal()  #: Emitted once the save is done (see :attr:`result`)
+
+    def __init__(self, snapshot, generation, processes=None, parent=None):
+        """Initializes the thread
+
+        :param IDFSnapshot snapshot: Snapshot of the IDF file to write
+        :param int generation: Edit generation of the IDF file when the snapshot was taken
+        :param int processes: Number of worker processes used to format IDF files, or None
+        :param parent: Parent of this thread
+        """
+
+        super(SaveThread, self).__init__(parent)
+        self.snapshot = snapshot  #: Snapshot being written
+        self.generation = generation  #: Edit generation of the snapshot
+        self.processes = processes  #: Number of worker processes used to format objects
+        self.result = None  #: Result of the save once done (True or False)
+
+    def run(self):
+        try:
+            if epjson.is_epjson(self.snapshot.file_path):
+                self.result = epjson.EPJSONWriter.write_snapshot(self.snapshot,
+                                                                 self.progress.emit)
+            else:
+                self.result = parser.Writer.write_snapshot(self.snapshot, self.progress.emit,
+                                                           self.processes)
+        except Exception:
+            log.exception('File not written! Unexpected exception!')
+            self.result = False
+        self.saved.emit()
+
+
+class FilterThread(QThread):
+    """Matches a snapshot of items (such as the objects of a class) against a filter in the
+    background. Interrupting the thread, when a newer filter arrives, stops it early and
+    without a result.
+    """
+
+    filtered = Signal()  #: Emitted once all items were matched (see :attr:`matches`)
+
+    def __init__(self, pattern, case_sensitive, matcher, items, text=None, parent=None):
+        """Initializes the thread
+
+        :param str pattern: Filter pattern, as typed
+        :param bool case_sensitive: Whether the filter is case sensitive
+        :param matcher: Compiled regular expression to search for in each item's text
+        :param list items: Items to match, which must not change while the thread runs
+        :param text: Callable returning the text of an item (defaults to the item itself)
+        :param parent: Parent of this thread
+        """
+
+        super(FilterThread, self).__init__(parent)
+        self.pattern = pattern  #: Filter pattern
+        self.case_sensitive = case_sensitive  #: Whether the filter is case sensitive
+        self.matcher = matcher  #: Compiled filter
+        self.items = items  #: Items being matched
+        self.text = text  #: Callable returning the text of an item
+        self.matches = None  #: Whether each item matches, once done
+
+    def run(self):
+        search = self.matcher.search
+        text = self.text
+        matches = list()
+        for position, item in enumerate(self.items):
+            if not position % FILTER_CHECK_INTERVAL and self.isInterruptionRequested():
+                return
+            matches.append(search(text(item) if text else item) is not None)
+        self.matches = matches
+        self.filtered.emit()
+
+
+class IDDThread(QThread):
+    """Parses (and caches) an IDD file in the background.
+    """
+
+    progress = Signal(int)  #: Emitted with the progress of the parse (0 to 100)
+    processed = Signal()  #: Emitted once the parse is done (see :attr:`error`)
+
+    def __init__(self, file_path, parent=None):
+        """Initializes the thread
+
+        :param str file_path: Path of the IDD file to parse
+        :param parent: Parent of this thread
+        """
+
+        super(IDDThread, self).__init__(parent)
+        self.file_path = file_path  #: Path of the IDD file being parsed
+        self.version = None  #: Version of the IDD file once parsed
+        self.error = None  #: Error message if the IDD file could not be parsed
+
+    def run(self):
+        idd_parser = parser.IDDParser()
+        try:
+            for progress in idd_parser.parse_idd(self.file_path):
+                self.progress.emit(progress)
+            self.version = idd_parser.idd.version
+        except Exception as e:
+            log.exception('IDD file not processed! Unexpected exception!')
+            self.error = str(e) or e.__class__.__name__
+        self.processed.emit()
@@ -0,0 +1,428 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""Benchmarks for the IDF+ input/output layer, run against the sample files in
+resources/eplus. Example:
+
+    python scripts/benchmark.py memory
+    python scripts/benchmark.py lookup
+    python scripts/benchmark.py idd
+    python scripts/benchmark.py write
+    python scripts/benchmark.py write --processes 4 --copies 10
+    python scripts/benchmark.py epjson
+    python scripts/benchmark.py read
+    python scripts/benchmark.py table --copies 100
+    python scripts/benchmark.py filter --copies 100
+
+:copyright: (c) 2019 by Matt Doiron.
+:license: GPL v3, see LICENSE for more details.
+"""
+
+# System imports
+import os
+import sys
+import gc
+import time
+import re
+import codecs
+import argparse
+import tempfile
+import tracemalloc
+
+# Make the package importable when run from a source checkout
+APP_ROOT = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..')
+sys.path.insert(0, APP_ROOT)
+
+# Package imports
+from idfplus.eplusio import parser, idfmodel, iddstore, epjson, config
+
+# Constants
+SAMPLE_DIR = os.path.join(APP_ROOT, 'resources', 'eplus')
+SAMPLE_IDD = 'EnergyPlus_IDD_v8.1.0.009.idd'
+
+
+def sample_files(extension='.idf'):
+    """Returns the full paths of all sample files with the given extension.
+
+    :param str extension: File extension to look for
+    :rtype: list(str)
+    """
+
+    return [os.path.join(SAMPLE_DIR, name) for name in sorted(os.listdir(SAMPLE_DIR))
+            if name.endswith(extension)]
+
+
+def load_idd(file_name=SAMPLE_IDD):
+    """Parses one of the sample IDD files without writing it to the cache.
+
+    :param str file_name: Name of the IDD file in resources/eplus
+    :rtype: IDDFile
+    """
+
+    idd_parser = parser.IDDParser()
+    for _ in idd_parser.parse_idd(os.path.join(SAMPLE_DIR, file_name), write=False):
+        pass
+    return idd_parser.idd
+
+
+def load_idf(file_path, idd):
+    """Parses the given IDF file using the given (pre-loaded) IDD file.
+
+    :param str file_path: Path of the IDF file to parse
+    :param IDDFile idd: IDD file to use
+    :rtype: IDFFile
+    """
+
+    idf = idfmodel.IDFFile()
+    idf.set_idd(idd)
+    with codecs.open(file_path, 'r',
+                     encoding=config.FILE_ENCODING,
+                     errors='backslashreplace') as raw_idf:
+        for _ in parser.IDFParser(idf, idd=idd).parse_idf(raw_idf, file_path):
+            pass
+    return idf
+
+
+def bench_memory(args):
+    """Reports the memory held by each parsed sample IDF file.
+    """
+
+    idd = load_idd()
+    total = 0
+    print('{:42} {:>12}'.format('File', 'KiB'))
+    for file_path in sample_files():
+        gc.collect()
+        tracemalloc.start()
+        idf = load_idf(file_path, idd)
+        gc.collect()
+        size, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        total += size
+        print('{:42} {:12.0f}'.format(os.path.basename(file_path), size / 1024.0))
+        del idf
+    print('{:42} {:12.0f}'.format('Total', total / 1024.0))
+
+
+def bench_lookup(args):
+    """Times class look-ups in the IDD and IDF containers, as done by the table model for
+    every cell, using both folded (lower case) and display-case class names.
+    """
+
+    idd = load_idd()
+    idf = load_idf(sample_files()[-1], idd)
+    folded = [obj_class for obj_class in idf if idf[obj_class]]
+    display = [idd[obj_class].obj_class_display for obj_class in folded]
+    repeat = max(1, 2000000 // len(folded))
+
+    print('{:32} {:>12}'.format('Look-up', 'ns/call'))
+    for label, container, keys in [('IDDFile[folded]', idd, folded),
+                                   ('IDDFile[display]', idd, display),
+                                   ('IDFFile[folded]', idf, folded),
+                                   ('IDFFile[display]', idf, display)]:
+        for method in ('__getitem__', 'get'):
+            lookup = getattr(container, method)
+            start = time.perf_counter()
+            for _ in range(repeat):
+                for key in keys:
+                    lookup(key)
+            elapsed = time.perf_counter() - start
+            print('{:32} {:12.1f}'.format('{}.{}'.format(label, method),
+                                          elapsed * 1e9 / (repeat * len(keys))))
+
+
+def bench_idd(args):
+    """Reports the cache size of each sample IDD file, then the time and memory taken to
+    load all of them side by side from a (temporary) cache.
+    """
+
+    config.DATA_DIR = tempfile.mkdtemp()
+    versions = []
+    print('{:42} {:>12}'.format('IDD file', 'Cache KiB'))
+    for file_path in sample_files('.idd'):
+        idd_parser = parser.IDDParser()
+        for _ in idd_parser.parse_idd(file_path):
+            pass
+        version = idd_parser.idd.version
+        cache_path = os.path.join(config.DATA_DIR, config.IDD_FILE_NAME_ROOT.format(version))
+        versions.append(version)
+        print('{:42} {:12.0f}'.format(os.path.basename(file_path),
+                                      os.path.getsize(cache_path) / 1024.0))
+
+    iddstore.clear()
+    gc.collect()
+    start = time.perf_counter()
+    idds = [parser.IDDParser().load_idd(version) for version in versions]
+    elapsed = time.perf_counter() - start
+    del idds
+
+    iddstore.clear()
+    gc.collect()
+    tracemalloc.start()
+    idds = [parser.IDDParser().load_idd(version) for version in versions]
+    gc.collect()
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print('\nLoaded {} versions in {:.3f}s, holding {:.0f} KiB'.format(
+        len(idds), elapsed, size / 1024.0))
+
+
+def cpu_time():
+    """Returns the CPU time used by this process and its (finished) child processes.
+
+    :rtype: float
+    """
+
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+def bench_write(args):
+    """Times the IDF writer on each sample IDF file (best of several runs), reporting
+    both wall-clock and CPU time. Objects can be repeated to simulate larger files.
+    """
+
+    idd = load_idd()
+    out_dir = tempfile.mkdtemp()
+    if args.processes:
+        parser.PARALLEL_WRITE_THRESHOLD = 0
+    total_wall = total_cpu = 0
+    print('{:42} {:>10} {:>12} {:>12}'.format('File', 'Objects', 'Wall ms', 'CPU ms'))
+    for file_path in sample_files():
+        idf = load_idf(file_path, idd)
+        for obj_list in idf.values():
+            obj_list.extend(list(obj_list) * (args.copies - 1))
+        idf.file_path = os.path.join(out_dir, os.path.basename(file_path))
+        best_wall = best_cpu = None
+        for _ in range(args.repeat):
+            start, start_cpu = time.perf_counter(), cpu_time()
+            parser.Writer.write_idf(idf, processes=args.processes)
+            wall, cpu = time.perf_counter() - start, cpu_time() - start_cpu
+            best_wall = wall if best_wall is None else min(best_wall, wall)
+            best_cpu = cpu if best_cpu is None else min(best_cpu, cpu)
+        total_wall += best_wall
+        total_cpu += best_cpu
+        print('{:42} {:10d} {:12.1f} {:12.1f}'.format(
+            os.path.basename(file_path), sum(len(objs) for objs in idf.values()),
+            best_wall * 1000, best_cpu * 1000))
+    print('{:42} {:>10} {:12.1f} {:12.1f}'.format('Total', '', total_wall * 1000,
+                                                  total_cpu * 1000))
+
+
+def bench_epjson(args):
+    """Compares reading and writing each sample IDF file as IDF text and as epJSON.
+    """
+
+    idd = load_idd()
+    out_dir = tempfile.mkdtemp()
+    totals = [0, 0, 0, 0]
+    print('{:42} {:>10} {:>10} {:>10} {:>10}'.format('File', 'IDF read', 'IDF write',
+                                                      'JSON read', 'JSON write'))
+    for file_path in sample_files():
+        base_name = os.path.splitext(os.path.basename(file_path))[0]
+        idf_path = os.path.join(out_dir, base_name + '.idf')
+        json_path = os.path.join(out_dir, base_name + '.epJSON')
+
+        def read_idf():
+            load_idf(idf_path, idd)
+
+        def write_idf():
+            parser.Writer.write_idf(idf)
+
+        def read_json():
+            read_back = idfmodel.IDFFile()
+            read_back.set_idd(idd)
+            with open(json_path, encoding=epjson.EPJSON_ENCODING) as raw_json:
+                for _ in epjson.EPJSONParser(read_back, idd=idd).parse_epjson(raw_json,
+                                                                              json_path):
+                    pass
+
+        def write_json():
+            epjson.EPJSONWriter.write_snapshot(snapshot)
+
+        idf = load_idf(file_path, idd)
+        idf.file_path = idf_path
+        snapshot = parser.IDFSnapshot(idf)
+        snapshot.file_path = json_path
+        timings = list()
+        for func in (write_idf, read_idf, write_json, read_json):
+            best = None
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                func()
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            timings.append(best * 1000)
+        timings = [timings[1], timings[0], timings[3], timings[2]]
+        totals = [total + timing for total, timing in zip(totals, timings)]
+        print('{:42} {:10.1f} {:10.1f} {:10.1f} {:10.1f}'.format(os.path.basename(file_path),
+                                                                 *timings))
+    print('{:42} {:10.1f} {:10.1f} {:10.1f} {:10.1f}'.format('Total (ms)', *totals))
+
+
+def bench_read(args):
+    """Compares the read throughput of codecs.open and parser.SourceText on the sample IDD
+    files, then times a full parse of each one.
+    """
+
+    def read_codecs(file_path):
+        with codecs.open(file_path, 'r', encoding=config.FILE_ENCODING,
+                         errors='backslashreplace') as raw_file:
+            while raw_file.readline():
+                pass
+
+    def read_source(file_path):
+        with parser.SourceText(file_path) as raw_file:
+            while raw_file.readline():
+                pass
+
+    def parse(file_path):
+        for _ in parser.IDDParser().parse_idd(file_path, write=False):
+            pass
+
+    print('{:42} {:>8} {:>12} {:>12} {:>10}'.format('IDD file', 'MiB', 'codecs MiB/s',
+                                                     'mmap MiB/s', 'Parse s'))
+    for file_path in sample_files('.idd'):
+        size = os.path.getsize(file_path) / 1024.0 / 1024.0
+        timings = list()
+        for func in (read_codecs, read_source, parse):
+            best = None
+            for _ in range(args.repeat if func is not parse else 1):
+                start = time.perf_counter()
+                func(file_path)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            timings.append(best)
+        print('{:42} {:8.2f} {:12.1f} {:12.1f} {:10.2f}'.format(
+            os.path.basename(file_path), size, size / timings[0], size / timings[1],
+            timings[2]))
+
+
+def bench_table(args):
+    """Times the column count of the class table, which Qt asks for many times on every
+    class switch and scroll step, using a full scan of the objects (as it used to be) and
+    the object lengths maintained by the IDF file. The largest classes of the largest
+    sample file are used, with objects repeated to simulate larger files.
+    """
+
+    idd = load_idd()
+    idf = load_idf(sample_files()[-1], idd)
+    obj_classes = sorted((obj_class for obj_class in idf if idf[obj_class]),
+                         key=lambda obj_class: len(idf[obj_class]), reverse=True)[0:5]
+    for obj_class in obj_classes:
+        idf[obj_class].extend(list(idf[obj_class]) * (args.copies - 1))
+
+    def scan(obj_class):
+        return max([len(obj) for obj in idf[obj_class]])
+
+    def cached(obj_class):
+        return idf.max_object_length(obj_class)
+
+    print('{:32} {:>8} {:>10} {:>10} {:>10} {:>10}'.format(
+        'Class', 'Objects', 'Scan sw', 'Scan step', 'Cache sw', 'Cache step'))
+    for obj_class in obj_classes:
+        timings = list()
+        for count in (scan, cached):
+            # Switching to a class counts its objects, scroll steps then ask again
+            idf._object_lengths.clear()
+            start = time.perf_counter()
+            count(obj_class)
+            timings.append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            for _ in range(args.calls):
+                count(obj_class)
+            timings.append((time.perf_counter() - start) * 1000)
+        print('{:32} {:8d} {:10.2f} {:10.2f} {:10.2f} {:10.2f}'.format(
+            idd[obj_class].obj_class_display[0:32], len(idf[obj_class]), *timings))
+    print('\nTimes in ms: class switch (first count) and one scroll step '
+          '({} counts)'.format(args.calls))
+
+
+def bench_filter(args):
+    """Times the class table filter on the largest class of the largest sample file, with
+    objects repeated to simulate larger files: matching the text of every cell (as it used
+    to be) against matching the search text of each object, first built then reused.
+    """
+
+    idd = load_idd()
+    idf = load_idf(sample_files()[-1], idd)
+    obj_class = max(idf, key=lambda key: len(idf[key]))
+    objects = idf[obj_class]
+    objects.extend([obj.duplicate() for _ in range(args.copies - 1) for obj in list(objects)])
+    patterns = [re.compile(re.escape(text), re.IGNORECASE)
+                for text in args.patterns.split(',')]
+
+    def cells(pattern):
+        for obj in objects:
+            for field in obj:
+                data = '{}{}{}'.format(field.value, '', '') if field else None
+                if data is not None and pattern.search(data):
+                    break
+
+    def search_text(pattern):
+        for obj in objects:
+            pattern.search(obj.search_text())
+
+    print('{} objects of {}\n'.format(len(objects), idd[obj_class].obj_class_display))
+    print('{:24} {:>12} {:>12} {:>12}'.format('Pattern', 'Cells ms', 'First ms',
+                                              'Next ms'))
+    for pattern in patterns:
+        for obj in objects:
+            obj.touch()
+        timings = list()
+        for func in (cells, search_text, search_text):
+            start = time.perf_counter()
+            func(pattern)
+            timings.append((time.perf_counter() - start) * 1000)
+        print('{:24} {:12.1f} {:12.1f} {:12.1f}'.format(pattern.pattern[0:24], *timings))
+
+
+def main():
+    """Runs the requested benchmark.
+    """
+
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = arg_parser.add_subparsers(dest='command')
+    commands.required = True
+    commands.add_parser('memory', help='memory held by parsed models').set_defaults(
+        func=bench_memory)
+    commands.add_parser('lookup', help='class look-ups in IDD/IDF files').set_defaults(
+        func=bench_lookup)
+    commands.add_parser('idd', help='IDD cache size, load time and memory').set_defaults(
+        func=bench_idd)
+    write_parser = commands.add_parser('write', help='IDF writer speed')
+    write_parser.add_argument('--repeat', type=int, default=5, help='runs per file')
+    write_parser.add_argument('--processes', type=int, default=None,
+                              help='worker processes used to format objects')
+    write_parser.add_argument('--copies', type=int, default=1,
+                              help='times each object is repeated')
+    write_parser.set_defaults(func=bench_write)
+
+    epjson_parser = commands.add_parser('epjson', help='IDF versus epJSON input/output')
+    epjson_parser.add_argument('--repeat', type=int, default=3, help='runs per file')
+    epjson_parser.set_defaults(func=bench_epjson)
+
+    read_parser = commands.add_parser('read', help='IDD read throughput and parse time')
+    read_parser.add_argument('--repeat', type=int, default=5, help='runs per file')
+    read_parser.set_defaults(func=bench_read)
+
+    table_parser = commands.add_parser('table', help='class table column counts')
+    table_parser.add_argument('--copies', type=int, default=100,
+                              help='times each object is repeated')
+    table_parser.add_argument('--calls', type=int, default=100,
+                              help='column counts per scroll step')
+    table_parser.set_defaults(func=bench_table)
+
+    filter_parser = commands.add_parser('filter', help='class table filter')
+    filter_parser.add_argument('--copies', type=int, default=100,
+                               help='times each object is repeated')
+    filter_parser.add_argument('--patterns', default='zn001,wall,no match at all',
+                               help='comma-separated texts to filter for')
+    filter_parser.set_defaults(func=bench_filter)
+
+    args = arg_parser.parse_args()
+    start = time.time()
+    args.func(args)
+    print('\nCompleted in {:.2f}s'.format(time.time() - start))
+
+
+if __name__ == '__main__':
+    main()
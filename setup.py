@@ -43,8 +43,6 @@ packages = [
 ]
 requires = [
     "appdirs==1.4.3",
-    "odict==1.7.0",
-    "persistent==4.5.1",
     "PySide2==5.14.1"
 ]
 requires_dev = [
@@ -322,6 +320,9 @@ setup(
         'gui_scripts': [
             'idfplus=idfplus.__main__:main',
         ],
+        'console_scripts': [
+            'idfplus-precompile=idfplus.eplusio.precompile:main',
+        ],
     },
     cmdclass={
         'freeze': Freeze,
@@ -5,3 +5,39 @@
 :copyright: (c) 2019 by Matt Doiron.
 :license: GPL v3, see LICENSE for more details.
 """
+
+# System imports
+import os
+from io import StringIO
+
+# Package imports
+from idfplus.eplusio import parser, idfmodel
+
+# Constants
+APP_ROOT = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', '..')
+SAMPLE_DIR = os.path.join(APP_ROOT, 'resources', 'eplus')
+_IDD_CACHE = dict()
+
+
+def sample_idd(file_name='EnergyPlus_IDD_v8.1.0.009.idd'):
+    """Parses (only once per test session) one of the sample IDD files
+    """
+
+    if file_name not in _IDD_CACHE:
+        idd_parser = parser.IDDParser()
+        for _ in idd_parser.parse_idd(os.path.join(SAMPLE_DIR, file_name), write=False):
+            pass
+        _IDD_CACHE[file_name] = idd_parser.idd
+    return _IDD_CACHE[file_name]
+
+
+def parse_text(text, idd=None):
+    """Parses the given IDF text into a new IDFFile using the sample IDD
+    """
+
+    idd = idd or sample_idd()
+    idf = idfmodel.IDFFile()
+    idf.set_idd(idd)
+    for _ in parser.IDFParser(idf, idd=idd).parse_idf(StringIO(text)):
+        pass
+    return idf
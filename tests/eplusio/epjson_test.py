@@ -0,0 +1,180 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""IDF+ is an enhanced editor for idf files—the text-based, simulation input files for EnergyPlus.
+
+:copyright: (c) 2019 by Matt Doiron.
+:license: GPL v3, see LICENSE for more details.
+"""
+
+# System imports
+import os
+import json
+import pytest
+
+# Package imports
+from idfplus.eplusio import config, epjson, idfmodel, parser
+
+# Test imports
+from . import parse_text, sample_idd, SAMPLE_DIR
+
+
+def values(idf, numbers=False):
+    """Returns the class and field values of each object, without trailing empty fields,
+    optionally with numeric fields formatted as they read back from epJSON
+    """
+
+    result = list()
+    for obj_class, obj_list in idf.items():
+        numeric = epjson.ClassFields(idf.idd[obj_class]).numeric
+        for obj in obj_list:
+            obj_values = [field.value if field is not None else '' for field in obj]
+            if numbers:
+                obj_values = [str(epjson.json_value(value, numeric[index])) if value else value
+                              for index, value in enumerate(obj_values)]
+            while obj_values and not obj_values[-1]:
+                obj_values.pop()
+            result.append((obj_class, obj_values))
+    return result
+
+
+def install_schema(directory, monkeypatch, group_keys=None):
+    """Installs an epJSON schema of the sample IDD in the given directory, naming the
+    extensible groups as given (or like EnergyPlus does by default), and makes it the
+    only install directory
+    """
+
+    group_keys = group_keys or dict()
+    classes = dict()
+    for idd_object in sample_idd().values():
+        if idd_object.extensible:
+            display = idd_object.obj_class_display
+            legacy_idd = {'extension': group_keys.get(display, 'extensions')}
+            classes[display] = {'legacy_idd': legacy_idd}
+    install_dir = directory / 'EnergyPlus-8-1-0'
+    install_dir.mkdir()
+    schema = {'properties': classes, 'epJSON_schema_version': '8.1.0'}
+    (install_dir / config.INSTALLED_SCHEMA_NAME).write_text(json.dumps(schema))
+    monkeypatch.setattr(config, 'INSTALL_DIR_PATTERNS', [str(directory / 'EnergyPlus-*')])
+    monkeypatch.setattr(epjson, '_SCHEMA_CLASSES', dict())
+
+
+def read_epjson(file_path):
+    """Reads the given epJSON file using the sample IDD
+    """
+
+    idf = idfmodel.IDFFile()
+    idf.set_idd(sample_idd())
+    with open(file_path, encoding=epjson.EPJSON_ENCODING) as raw_json:
+        for progress in epjson.EPJSONParser(idf, idd=sample_idd()).parse_epjson(raw_json,
+                                                                                 file_path):
+            pass
+    assert progress == 100
+    return idf
+
+
+class TestEPJSON(object):
+
+    def test_write(self, tmp_path, monkeypatch):
+
+        install_schema(tmp_path, monkeypatch, {'Schedule:Compact': 'data'})
+        idf_file = parse_text("Version,8.1;\n"
+                              "Zone,Zone One,0,1.5,0,0,1,1,autocalculate,0.10;\n"
+                              "Zone,Zone One;\n"
+                              "Zone,;\n"
+                              "Schedule:Compact,Sched,Any Number,Through: 12/31,For: AllDays,"
+                              "Until: 24:00,1;\n")
+        idf_file.file_path = str(tmp_path / 'out.epJSON')
+        assert epjson.EPJSONWriter.write_idf(idf_file)
+        with open(idf_file.file_path) as raw_json:
+            data = json.load(raw_json)
+
+        # Objects are keyed by name unless it's missing or duplicated
+        assert data['Version'] == {'Version 1': {'version_identifier': '8.1'}}
+        zones = data['Zone']
+        assert list(zones) == ['Zone One', 'Zone 2', 'Zone 3']
+        assert zones['Zone 2'] == {'name': 'Zone One'}
+        assert zones['Zone 3'] == {'name': ''}
+
+        # Numbers are written as such even if they don't read back the same
+        assert zones['Zone One']['direction_of_relative_north'] == 0
+        assert zones['Zone One']['x_origin'] == 1.5
+        assert zones['Zone One']['ceiling_height'] == 'autocalculate'
+        assert zones['Zone One']['volume'] == 0.1
+
+        # Extensible fields are grouped under the key of the schema
+        assert data['Schedule:Compact']['Sched']['data'][:2] == [{'field': 'Through: 12/31'},
+                                                                  {'field': 'For: AllDays'}]
+
+    def test_write_without_schema(self, tmp_path, monkeypatch):
+
+        # The names of the extensible groups are unknown, so nothing is written
+        monkeypatch.setattr(config, 'INSTALL_DIR_PATTERNS', [str(tmp_path / 'EnergyPlus-*')])
+        monkeypatch.setattr(epjson, '_SCHEMA_CLASSES', dict())
+        idf_file = parse_text("Version,8.1;\nZone,Zone One;\n")
+        idf_file.file_path = str(tmp_path / 'out.epJSON')
+        assert not epjson.EPJSONWriter.write_idf(idf_file)
+        assert os.listdir(str(tmp_path)) == list()
+
+    def test_read_fields(self, tmp_path, monkeypatch):
+
+        # Without a schema, extensible groups are read whatever their key
+        monkeypatch.setattr(config, 'INSTALL_DIR_PATTERNS', list())
+        monkeypatch.setattr(epjson, '_SCHEMA_CLASSES', dict())
+        file_path = tmp_path / 'in.epJSON'
+        data = {'Version': {'Version 1': {'version_identifier': '8.1'}},
+                'Schedule:Compact': {'Sched': {'data': [{'field': 'Through: 12/31'},
+                                                        {'field': 'For: AllDays'}]}}}
+        file_path.write_text(json.dumps(data))
+        idf = read_epjson(str(file_path))
+        assert values(idf)[-1] == ('schedule:compact',
+                                   ['Sched', '', 'Through: 12/31', 'For: AllDays'])
+
+        # Fields which don't match the IDD stop the parsing instead of being lost
+        for fields, field_name in (({'schedule_type_limits_name': 'Any', 'unknown': 1}, 'unknown'),
+                                   ({'data': [{'field': 'Until: 24:00', 'unknown': 1}]}, 'unknown'),
+                                   ({'data': 'Through: 12/31'}, 'data')):
+            data['Schedule:Compact']['Sched'] = fields
+            file_path.write_text(json.dumps(data))
+            with pytest.raises(parser.InvalidIDFObject) as error:
+                read_epjson(str(file_path))
+            assert "'{}'".format(field_name) in error.value.message
+
+        # With a schema, only the key of the schema is an extensible group
+        install_schema(tmp_path, monkeypatch, {'Schedule:Compact': 'data'})
+        data['Schedule:Compact']['Sched'] = {'data': [{'field': 'Through: 12/31'}]}
+        file_path.write_text(json.dumps(data))
+        assert values(read_epjson(str(file_path)))[-1] == ('schedule:compact',
+                                                           ['Sched', '', 'Through: 12/31'])
+        data['Schedule:Compact']['Sched'] = {'extensions': [{'field': 'Through: 12/31'}]}
+        file_path.write_text(json.dumps(data))
+        with pytest.raises(parser.InvalidIDFObject) as error:
+            read_epjson(str(file_path))
+        assert "'extensions'" in error.value.message
+
+    def test_read_invalid(self, tmp_path):
+
+        # Files which aren't epJSON stop the parsing like invalid IDF files do
+        file_path = tmp_path / 'in.epJSON'
+        for text in ('{"Version": {', '[]', '{"Zone": {"Zone One": 1}}'):
+            file_path.write_text(text)
+            with pytest.raises(parser.InvalidIDFObject) as error:
+                read_epjson(str(file_path))
+            assert error.value.message.startswith('Invalid epJSON file')
+
+    def test_round_trip(self, tmp_path, monkeypatch):
+
+        # Each sample file reads back to the same model (minus trailing empty fields)
+        install_schema(tmp_path, monkeypatch, {'BuildingSurface:Detailed': 'vertices'})
+        idd = sample_idd()
+        file_path = os.path.join(SAMPLE_DIR, '5ZoneWaterLoopHeatPump.idf')
+        idf_file = idfmodel.IDFFile()
+        idf_file.set_idd(idd)
+        with parser.open_idf(file_path) as raw_idf:
+            for _ in parser.IDFParser(idf_file, idd=idd).parse_idf(raw_idf, file_path):
+                pass
+
+        idf_file.file_path = str(tmp_path / 'out.epJSON')
+        assert epjson.EPJSONWriter.write_idf(idf_file)
+        read_back = read_epjson(idf_file.file_path)
+        assert values(read_back) == values(idf_file, numbers=True)
+        assert read_back.file_path == idf_file.file_path
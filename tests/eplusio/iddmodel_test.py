@@ -8,6 +8,7 @@
 
 # System imports
 import os
+import pytest
 
 # Package imports
 from idfplus.eplusio import parser
@@ -27,3 +28,80 @@ class TestIDDModel(object):
 
     def test_idd(self):
         print("placeholder")
+
+    def test_key_tables(self):
+
+        from . import sample_idd
+
+        idd = sample_idd()
+        surface = idd['BuildingSurface:Detailed']
+        keys = surface.ordered_fields()
+        field_count = len(keys)
+        extensible = surface._extensible
+
+        assert extensible > 0
+        for i, key in enumerate(keys):
+            assert surface.key(i) == key
+            assert surface.index(key) == i
+            assert surface[key].index == i
+
+        # Indexes past the end of the object cycle through the extensible group
+        start = field_count - extensible - 1
+        for i in range(field_count, field_count + 3 * extensible):
+            assert surface.key(i) == keys[start + i % extensible]
+
+        # Non-extensible objects have no fields past their end
+        version = idd['Version']
+        assert version.key(0) == 'A1'
+        assert idd.field('Version', 5) is None
+
+    def test_field_arrays(self):
+
+        from . import sample_idd
+
+        idd = sample_idd()
+        for obj_class in ['BuildingSurface:Detailed', 'Zone', 'Schedule:Compact']:
+            idd_object = idd[obj_class]
+            assert idd_object.field_keys == tuple(idd_object.ordered_fields())
+            for i, key in enumerate(idd_object.field_keys):
+                tags = idd_object[key].tags
+                assert idd_object.field_tags[i] is tags
+                assert idd_object.field_names[i] == tags.get('field', '')
+                assert idd_object.field_units[i] == tags.get('units')
+                assert idd_object.field_defaults[i] == tags.get('default')
+                assert idd_object[key].index == i
+
+        zone = idd['Zone']
+        assert zone.field_ref_types[0] == 'reference'
+        assert zone.field_object_lists[0] == tuple()
+        assert zone.field_units[zone.index('N2')] == 'm'
+        assert ('minimum', '1') in zone.field_bounds[zone.index('N5')]
+        assert zone.field_defaults[zone.index('N7')] == 'autocalculate'
+
+        # Choice keys are always tuples, even with a single key
+        surface = idd['BuildingSurface:Detailed']
+        assert 'Wall' in surface.field_choices[surface.index('A2')]
+
+    def test_case_insensitive(self):
+
+        from . import sample_idd
+
+        idd = sample_idd()
+        zone = idd['zone']
+        assert idd['Zone'] is zone
+        assert idd['ZONE'] is zone
+        assert idd.get('Zone') is zone
+        assert idd.get('No:Such:Class') is None
+        assert 'Zone' in idd and 'zone' in idd
+        assert zone.obj_class == 'zone'
+        assert all(key == key.lower() for key in idd)
+        with pytest.raises(KeyError):
+            idd['No:Such:Class']
+
+        # Insertion order is preserved and keys are always stored folded
+        classes = iddmodel.CaseInsensitiveDict([('Version', 1), ('Zone', 2)])
+        classes['SimulationControl'] = 3
+        assert list(classes) == ['version', 'zone', 'simulationcontrol']
+        assert classes.pop('ZONE') == 2
+        assert classes.setdefault('Zone', 4) == 4
+        assert list(classes.items())[-1] == ('zone', 4)
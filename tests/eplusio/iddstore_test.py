@@ -0,0 +1,149 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""IDF+ is an enhanced editor for idf files—the text-based, simulation input files for EnergyPlus.
+
+:copyright: (c) 2019 by Matt Doiron.
+:license: GPL v3, see LICENSE for more details.
+"""
+
+# System imports
+import gc
+import pickle
+
+# Package imports
+from idfplus.eplusio import iddstore
+
+# Test imports
+from . import sample_idd
+
+
+class TestIDDStore(object):
+
+    def test_share_versions(self):
+
+        old = sample_idd('EnergyPlus_IDD_v7.2.0.006.idd')
+        new = sample_idd()
+
+        # Parsed IDD files are shared as they are created, find a class that didn't change
+        same = [obj_class for obj_class in new if obj_class in old and
+                new[obj_class].field_tags == old[obj_class].field_tags]
+        assert same
+        for obj_class in same:
+            old_object = old[obj_class]
+            new_object = new[obj_class]
+            assert new_object.field_tags is old_object.field_tags
+            assert new_object.field_names is old_object.field_names
+            for key in new_object.field_keys:
+                assert new_object[key].tags is old_object[key].tags
+
+        # Sharing is idempotent and preserves all definitions
+        zone = new['Zone']
+        tags = [zone[key].tags for key in zone.field_keys]
+        iddstore.share(new)
+        assert [zone[key].tags for key in zone.field_keys] == tags
+        assert zone.field_tags == tuple(tags)
+
+    def test_store_within_file(self):
+
+        store = iddstore.IDDStore()
+        tags = {'field': 'Name', 'note': ['A', 'note']}
+        shared = store.tags(tags)
+        assert shared == tags
+        assert store.tags(dict(tags)) is shared
+        assert store.tags({'note': ['A', 'note'], 'field': 'Name'}) is not shared
+
+        # Shared objects are only stored once when pickled
+        size = len(pickle.dumps([dict(tags), dict(tags)]))
+        assert len(pickle.dumps([store.tags(tags), store.tags(tags)])) < size
+
+
+class User(object):
+    """Stands in for a model using an IDD file"""
+
+
+class TestIDDRegistry(object):
+
+    def test_acquire_shared(self):
+
+        registry = iddstore.IDDRegistry()
+        loaded = list()
+
+        def load(version):
+            loaded.append(version)
+            return object()
+
+        first, second = User(), User()
+        idd = registry.acquire('8.1', first, load)
+        assert registry.acquire('8.1', second, load) is idd
+        assert loaded == ['8.1']
+        assert registry.users('8.1') == 2
+
+        # The IDD file is kept once its users are gone, until it's evicted
+        del first, second
+        gc.collect()
+        assert registry.users('8.1') == 0
+        assert '8.1' in registry
+        assert registry.acquire('8.1', User(), load) is idd
+        assert loaded == ['8.1']
+
+    def test_evict_unused(self):
+
+        registry = iddstore.IDDRegistry(max_unused=1)
+        users = [User(), User(), User()]
+        for user, version in zip(users, ['7.2', '8.0', '8.1']):
+            registry.acquire(version, user, lambda v: object())
+
+        # Versions still in use are never evicted
+        del user, users[0]
+        gc.collect()
+        del users[0]
+        gc.collect()
+        assert '7.2' not in registry
+        assert '8.0' in registry
+        assert '8.1' in registry
+
+        # Discarded versions are loaded again
+        idd = registry.acquire('8.1', users[0], lambda v: object())
+        registry.discard('8.1')
+        assert '8.1' not in registry
+        assert registry.acquire('8.1', users[0], lambda v: object()) is not idd
+
+    def test_evict_trims_store(self):
+
+        # Each version is a fresh copy of a sample IDD file, shared in its own store
+        store = iddstore.IDDStore()
+        registry = iddstore.IDDRegistry(max_unused=0, store=store)
+        file_names = {'7.2': 'EnergyPlus_IDD_v7.2.0.006.idd',
+                      '8.1': 'EnergyPlus_IDD_v8.1.0.009.idd'}
+
+        def load(version):
+            return store.share(pickle.loads(pickle.dumps(sample_idd(file_names[version]))))
+
+        old_user, new_user = User(), User()
+        old = registry.acquire('7.2', old_user, load)
+        new = registry.acquire('8.1', new_user, load)
+        new_tags = set(id(tags) for idd_object in new.values() for tags in idd_object.field_tags)
+        old_tags = [tags for idd_object in old.values() for tags in idd_object.field_tags
+                    if id(tags) not in new_tags]
+        assert old_tags
+        kept = iddstore.IDDStore()
+        kept.share(pickle.loads(pickle.dumps(new)))
+        assert len(store) > len(kept)
+
+        # Once evicted, the definitions only the old version used are released, but not by
+        # the garbage collector, which may run in the middle of a share
+        del old, old_user
+        gc.collect()
+        assert '7.2' not in registry
+        assert len(store) > len(kept)
+        assert registry.acquire('8.1', new_user, load) is new
+        assert len(store) == len(kept)
+        assert len(store._tuples) == len(kept._tuples)
+        assert len(store._lists) == len(kept._lists)
+        assert len(store._field_tags) == len(kept._field_tags)
+        assert store.tags(dict(old_tags[0])) is not old_tags[0]
+
+        # The definitions of the version left are still shared
+        zone = new['Zone']
+        assert all(store.tags(dict(tags)) is tags for tags in zone.field_tags)
+        assert store.array(tuple(zone.field_names)) is zone.field_names
@@ -44,3 +44,98 @@ class TestIDFModel(object):
         assert isinstance(idf_file.get("Version")[0], idfmodel.IDFObject)
         assert isinstance(idf_file.get("version")[0], idfmodel.IDFObject)
         assert isinstance(idf_file["version"][0], idfmodel.IDFObject)
+
+    def test_shared_values(self):
+
+        from . import parse_text
+
+        idf = parse_text("Version,8.1;\n"
+                         "Zone,Zone One,0,0,0,0,1,1,autocalculate;\n"
+                         "Zone,Zone Two,0,0,0,0,1,1,autocalculate;\n"
+                         "! A comment\n"
+                         "Zone,Zone Three,0,0,0,0,1,1,autocalculate;\n")
+
+        zones = idf["Zone"]
+        assert len(zones) == 3
+        assert zones[0][7].value is zones[1][7].value
+        assert zones[0].obj_class is zones[1].obj_class
+        assert zones[0].comments is zones[1].comments is idfmodel.NO_COMMENTS
+        assert list(zones[2].comments) == [' A comment']
+
+        duplicate = zones[0].duplicate()
+        assert duplicate[1].value is zones[0][1].value
+
+    def test_max_object_length(self):
+
+        from . import parse_text
+
+        idf = parse_text("Version,8.1;\n"
+                         "Zone,Zone One,0,0,0,0,1,1,autocalculate;\n"
+                         "Zone,Zone Two;\n")
+
+        assert idf.max_object_length("Zone") == 8
+        assert idf.max_object_length("Building") == 0
+
+        # Lengths are kept up to date as objects are added, grown and removed
+        idf.remove_objects("zone", 0, 1)
+        assert idf.max_object_length("Zone") == 1
+        idf.allocate_fields("Zone", 0, 4)
+        assert idf.max_object_length("Zone") == 5
+        idf.add_objects("Zone", None, 0)
+        assert idf.max_object_length("Zone") == len(idf["Zone"][0]) > 5
+        idf.remove_objects("Zone", 0, 1)
+        assert idf.max_object_length("Zone") == 5
+
+        # Objects added directly are detected
+        idf["Zone"].append(idf["Zone"][0][0:1] + [None] * 9)
+        assert idf.max_object_length("Zone") == 10
+
+        # Objects which grow or shrink in place are counted again
+        idf = parse_text("Version,8.1;\n"
+                         "Zone,Zone One;\n")
+        zone = idf["Zone"][0]
+        assert idf.max_object_length("Zone") == 1
+        zone.set_defaults()
+        assert idf.max_object_length("Zone") == len(zone) > 1
+        del zone[1:]
+        idf.object_resized(zone)
+        assert idf.max_object_length("Zone") == 1
+
+    def test_listeners(self):
+
+        from . import parse_text
+
+        idf = parse_text("Version,8.1;\n"
+                         "Zone,Zone One;\n")
+        changed = []
+        idf.add_listener(changed.append)
+        idf.add_listener(changed.append)
+
+        # Listeners are told (once) about added and removed objects
+        idf.add_objects("Zone", None)
+        idf.remove_objects("Zone", 0, 1)
+        assert changed == ["zone", "zone"]
+
+        idf.remove_listener(changed.append)
+        idf.add_objects("Zone", None)
+        assert changed == ["zone", "zone"]
+
+    def test_search_text(self):
+
+        from . import parse_text
+
+        idf = parse_text("Version,8.1;\n"
+                         "Zone,Zone One,0,0,0,0,1,1,autocalculate;\n")
+
+        zone = idf["Zone"][0]
+        assert zone.search_text().split("\n") == ["Zone One", "0", "0", "0", "0", "1", "1",
+                                                  "autocalculate"]
+        assert zone.search_text() is zone.search_text()
+
+        # The text follows edits and unit conversions
+        zone[0].value = "Zone Uno"
+        assert zone.search_text().startswith("Zone Uno\n")
+        zone[5].value = "3"
+        ip_text = zone.search_text(si_units=False)
+        assert ip_text.split("\n") == [idf.to_ip(field) for field in zone]
+        assert ip_text != zone.search_text()
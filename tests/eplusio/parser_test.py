@@ -65,3 +65,277 @@ class TestParser(object):
         assert isinstance(idf_file.get("version")[0], idfmodel.IDFObject)
         assert isinstance(idf_file["version"][0], idfmodel.IDFObject)
 
+
+    def test_write(self, tmp_path):
+
+        from . import parse_text
+
+        idf_file = parse_text("Version,8.1;\n"
+                              "! A comment\n"
+                              "Zone,Zone One,0,0,0,0,1,1,autocalculate,autocalculate;\n"
+                              "Schedule:Compact,Sched,Any Number,Through: 12/31,For: AllDays,"
+                              "Until: 24:00,1;\n")
+        idf_file.file_path = str(tmp_path / 'out.idf')
+        assert parser.Writer.write_idf(idf_file)
+
+        with open(idf_file.file_path, newline='') as written:
+            lines = written.read().split(os.linesep)
+        assert lines[0].startswith('!-Generator IDF+')
+        assert '! A comment' in lines
+        zone = lines.index('  Zone,')
+        assert lines[zone + 1] == '    Zone One,                !- Name'
+        assert lines[zone + 2] == '    0,                       !- Direction of Relative North {deg}'
+        assert lines[zone + 9] == '    autocalculate;           !- Volume {m3}'
+
+        # Extensible fields reuse the notes of their group
+        schedule = lines.index('  Schedule:Compact,')
+        assert lines[schedule + 3] == '    Through: 12/31,          !- Field 1'
+        assert lines[schedule + 6] == '    1;                       !- Field 4'
+
+    def test_write_atomic(self, tmp_path):
+
+        from . import parse_text
+
+        idf_file = parse_text("Version,8.1;\nZone,Zone One;\n")
+        target = tmp_path / 'out.idf'
+        target.write_text('old contents')
+        os.chmod(str(target), 0o640)
+
+        # A snapshot is unaffected by later edits and replaces the target in one step
+        snapshot = parser.IDFSnapshot(idf_file)
+        idf_file['Zone'][0][0].value = 'Zone Two'
+        snapshot.file_path = str(target)
+        progress = list()
+        assert parser.Writer.write_snapshot(snapshot, progress.append)
+        assert progress[-1] == 100
+        assert 'Zone One;' in target.read_text()
+        assert os.listdir(str(tmp_path)) == ['out.idf']
+        assert os.stat(str(target)).st_mode & 0o777 == 0o640
+
+        # New files get the default permissions, after the umask
+        new_target = tmp_path / 'new.idf'
+        snapshot.file_path = str(new_target)
+        umask = os.umask(0o027)
+        try:
+            assert parser.Writer.write_snapshot(snapshot)
+        finally:
+            os.umask(umask)
+        assert os.stat(str(new_target)).st_mode & 0o777 == 0o640
+        os.remove(str(new_target))
+
+        # Failures leave nothing behind
+        idf_file.file_path = str(tmp_path / 'missing' / 'out.idf')
+        assert not parser.Writer.write_idf(idf_file)
+        assert os.listdir(str(tmp_path)) == ['out.idf']
+
+    def test_write_links(self, tmp_path):
+
+        from . import parse_text
+
+        idf_file = parse_text("Version,8.1;\nZone,Zone One;\n")
+        real_dir = tmp_path / 'real'
+        real_dir.mkdir()
+        target = real_dir / 'out.idf'
+        target.write_text('old contents')
+
+        # Symbolic links are kept, and the file they point to is replaced
+        link = tmp_path / 'link.idf'
+        link.symlink_to(target)
+        idf_file.file_path = str(link)
+        assert parser.Writer.write_idf(idf_file)
+        assert link.is_symlink()
+        assert 'Zone One;' in target.read_text()
+        assert sorted(os.listdir(str(tmp_path))) == ['link.idf', 'real']
+        assert os.listdir(str(real_dir)) == ['out.idf']
+
+        # Hard links still share the contents
+        hard_link = tmp_path / 'hard.idf'
+        os.link(str(target), str(hard_link))
+        idf_file['Zone'][0][0].value = 'Zone Two'
+        idf_file.file_path = str(target)
+        assert parser.Writer.write_idf(idf_file)
+        assert 'Zone Two;' in hard_link.read_text()
+        assert os.stat(str(hard_link)).st_ino == os.stat(str(target)).st_ino
+        assert os.listdir(str(real_dir)) == ['out.idf']
+
+    def test_write_incremental(self, tmp_path):
+
+        from . import sample_idd
+
+        def parse_file(file_path):
+            idf = idfmodel.IDFFile()
+            idf.set_idd(sample_idd())
+            with codecs.open(file_path, 'r', encoding=config.FILE_ENCODING) as raw_idf:
+                for _ in parser.IDFParser(idf, idd=sample_idd()).parse_idf(raw_idf, file_path):
+                    pass
+            return idf
+
+        source = tmp_path / 'in.idf'
+        source.write_text("!-Option SortedOrder\n"
+                          "Version,8.1;\n\n"
+                          "! First zone\n"
+                          "Zone,Zone One,  0;  ! Custom formatting\n\n"
+                          "Zone,Zone Two,0;\n\n"
+                          "Zone,Zone Three,0;\n")
+        idf_file = parse_file(str(source))
+        assert idf_file.source.path == str(source)
+
+        # Untouched objects are copied verbatim, modified ones are rewritten
+        idf_file['Zone'][1][0].value = 'Zone 2'
+        idf_file.file_path = str(tmp_path / 'out.idf')
+        assert parser.Writer.write_idf(idf_file, incremental=True)
+        with open(idf_file.file_path, newline='') as written:
+            text = written.read()
+        assert "! First zone{0}Zone,Zone One,  0;  ! Custom formatting{0}".format(os.linesep) in text
+        assert '    Zone 2,' in text
+        assert 'Zone Three,0;' in text
+        assert parse_file(idf_file.file_path)['Zone'][1][0].value == 'Zone 2'
+
+        # Spans now refer to the saved file, which becomes the source
+        assert idf_file.source.path == idf_file.file_path
+        data = text.encode(config.FILE_ENCODING)
+        for obj in idf_file['Zone']:
+            start, end = obj.span
+            assert data[start:end].decode(config.FILE_ENCODING).count(';') == 1
+        idf_file['Zone'][2].comments = ['New comment']
+        assert parser.Writer.write_idf(idf_file, incremental=True)
+        with open(idf_file.file_path, newline='') as written:
+            text = written.read()
+        assert 'Zone,Zone One,  0;  ! Custom formatting' in text
+        assert '!New comment' in text
+
+        # Changed options, re-ordered objects or a changed source trigger a full write
+        for change in ('options', 'order', 'source'):
+            idf_file = parse_file(str(source))
+            if change == 'options':
+                idf_file.options.append('ViewInIPunits')
+            elif change == 'order':
+                idf_file['Zone'].reverse()
+            else:
+                source.write_text(source.read_text() + '\n')
+            snapshot = parser.IDFSnapshot(idf_file, incremental=True)
+            assert snapshot.source is None
+            assert all(span is None for _, objects in snapshot.classes
+                       for _, _, span in objects)
+
+    def test_write_incremental_closes_source(self, tmp_path, monkeypatch):
+
+        from . import sample_idd
+
+        source = tmp_path / 'in.idf'
+        source.write_text("Version,8.1;\n\nZone,Zone One,0;\n\nZone,Zone Two,0;\n")
+        idf_file = idfmodel.IDFFile()
+        idf_file.set_idd(sample_idd())
+        with codecs.open(str(source), 'r', encoding=config.FILE_ENCODING) as raw_idf:
+            for _ in parser.IDFParser(idf_file, idd=sample_idd()).parse_idf(raw_idf,
+                                                                            str(source)):
+                pass
+
+        # Track the files opened by the writer, and check them when the target is replaced
+        opened = list()
+        replaced = list()
+
+        def tracking_open(*args, **kwargs):
+            opened.append(open(*args, **kwargs))
+            return opened[-1]
+
+        def checking_replace(src, dst, replace=os.replace):
+            assert all(f.closed for f in opened if f.name == str(source))
+            replaced.append(dst)
+            replace(src, dst)
+
+        monkeypatch.setattr(parser, 'open', tracking_open, raising=False)
+        monkeypatch.setattr(os, 'replace', checking_replace)
+
+        # Saving over the source file, the usual case
+        idf_file['Zone'][1][0].value = 'Zone 2'
+        assert parser.Writer.write_idf(idf_file, incremental=True)
+        assert replaced == [str(source)]
+        assert any(f.name == str(source) for f in opened)
+        assert 'Zone,Zone One,0;' in source.read_text()
+
+    def test_write_parallel(self, tmp_path, monkeypatch):
+
+        from . import parse_text
+
+        idf_file = parse_text("Version,8.1;\n"
+                              "! A comment\n"
+                              "Zone,Zone One,0,0,0,0,1,1,autocalculate,autocalculate;\n"
+                              "Zone,Zone Two;\n"
+                              "Schedule:Compact,Sched,Any Number,Through: 12/31,For: AllDays,"
+                              "Until: 24:00,1;\n")
+
+        # Formatting in worker processes gives exactly the same file
+        idf_file.file_path = str(tmp_path / 'serial.idf')
+        assert parser.Writer.write_idf(idf_file)
+        monkeypatch.setattr(parser, 'PARALLEL_WRITE_THRESHOLD', 0)
+        idf_file.file_path = str(tmp_path / 'parallel.idf')
+        assert parser.Writer.write_idf(idf_file, processes=2)
+        assert (tmp_path / 'serial.idf').read_bytes() == (tmp_path / 'parallel.idf').read_bytes()
+
+    def test_compressed(self, tmp_path):
+
+        from . import parse_text, sample_idd
+
+        idf_file = parse_text("Version,8.1;\nZone,Zone One;\n")
+        plain = tmp_path / 'plain.idf'
+        idf_file.file_path = str(plain)
+        assert parser.Writer.write_idf(idf_file)
+
+        for extension in ('.gz', '.xz', '.bz2'):
+            # Compressed files decompress to the same contents as the plain file
+            target = tmp_path / ('out.idf' + extension)
+            idf_file.file_path = str(target)
+            assert parser.Writer.write_idf(idf_file, incremental=True)
+            assert idf_file.source is None
+            assert target.read_bytes() != plain.read_bytes()
+
+            # ...and read back transparently, with progress up to 100
+            read_back = idfmodel.IDFFile()
+            read_back.set_idd(sample_idd())
+            with parser.open_idf(str(target)) as raw_idf:
+                assert raw_idf.read() == plain.read_bytes().decode(config.FILE_ENCODING)
+            with parser.open_idf(str(target)) as raw_idf:
+                progress = list(parser.IDFParser(read_back, idd=sample_idd())
+                                .parse_idf(raw_idf, str(target)))
+            assert progress[-1] == 100
+            assert read_back['Zone'][0][0].value == 'Zone One'
+            assert read_back.source is None
+
+    def test_source_text(self, tmp_path):
+
+        # Lines are split exactly like codecs' readline, including line endings
+        file_path = str(tmp_path / 'in.idf')
+        with open(file_path, 'wb') as raw_file:
+            raw_file.write(b'Version,8.1;\r\n! caf\xe9\x85x\nZone,\rZone One;')
+        with codecs.open(file_path, 'r', encoding=config.FILE_ENCODING,
+                         errors='backslashreplace') as raw_idf:
+            expected = list(iter(raw_idf.readline, ''))
+        with parser.SourceText(file_path) as source:
+            assert list(source) == expected
+            assert source.source_position() == source.size == os.path.getsize(file_path)
+
+        # Positions are in bytes, even when characters take more than one
+        with open(file_path, 'w', encoding='utf-8', newline='') as raw_file:
+            raw_file.write('! café\nZone,Zone One;\n')
+        with parser.SourceText(file_path, encoding='utf-8') as source:
+            assert source.readline() == '! café\n'
+            assert source.source_position() == 8
+
+    def test_scan_line(self):
+
+        # The quick IDD line scanner matches parse_line, quirks included
+        idd_parser = parser.IDDParser()
+        file_path = os.path.join(APP_ROOT, 'resources', 'eplus', 'EnergyPlus_IDD_v8.1.0.009.idd')
+        with parser.SourceText(file_path) as idd_file:
+            lines = list(idd_file)[:5000]
+        lines += ['', '  ', '\\foo', ' ,', ';', 'A1,\\note a, b', '  A1 , \\Field X',
+                  'N1; \\unitsBasedOnField A2', '\\memo Use ! sparingly', '\\extensible:3 - x',
+                  '\\minimum> 0', '\\note see \\field', '\tA1;', '! comment\n']
+        for line in lines:
+            parsed = idd_parser.parse_line(line)
+            tags = parsed['tags']
+            assert idd_parser.scan_line(line) == (
+                parsed['fields'], parsed['comments'], parsed['comments_special'],
+                parsed['options'], tags.get('tag'), tags.get('value'), parsed['end_object'],
+                parsed['empty_line'])
@@ -0,0 +1,65 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""IDF+ is an enhanced editor for idf files—the text-based, simulation input files for EnergyPlus.
+
+:copyright: (c) 2019 by Matt Doiron.
+:license: GPL v3, see LICENSE for more details.
+"""
+
+# System imports
+import os
+import shutil
+
+# Package imports
+from idfplus.eplusio import precompile, parser, config
+
+# Test imports
+from . import SAMPLE_DIR
+
+
+class TestPrecompile(object):
+
+    def test_find_idd_files(self, tmp_path):
+
+        # Installed IDD files are found one level down, other IDD files directly
+        install_dir = tmp_path / 'EnergyPlus-8-1-0'
+        install_dir.mkdir()
+        installed = install_dir / config.INSTALLED_IDD_NAME
+        shutil.copy(os.path.join(SAMPLE_DIR, 'EnergyPlus_IDD_v7.2.0.006.idd'), str(installed))
+        found = precompile.find_idd_files([str(tmp_path), SAMPLE_DIR, str(installed)],
+                                          standard=False)
+        assert found[0] == str(installed)
+        assert len(found) == 4
+        assert [precompile.idd_version(file_path) for file_path in found] == \
+            ['7.2', '6.0', '7.2', '8.1']
+
+    def test_precompile(self, tmp_path, monkeypatch):
+
+        monkeypatch.setattr(config, 'DATA_DIR', str(tmp_path))
+        file_paths = precompile.find_idd_files([SAMPLE_DIR], standard=False)[1:]
+
+        # Each version is processed in a worker process and cached
+        results = precompile.precompile(file_paths, processes=2)
+        assert sorted(version for _, version, _ in results) == ['7.2', '8.1']
+        assert not any(error for _, _, error in results)
+        assert parser.IDDParser().load_idd('8.1').version == '8.1'
+        assert sorted(os.listdir(str(tmp_path))) == \
+            [config.IDD_FILE_NAME_ROOT.format(version) for version in ('7.2', '8.1')]
+
+        # Cached versions are skipped unless forced
+        assert precompile.precompile(file_paths) == list()
+        assert len(precompile.precompile(file_paths[-1:], force=True)) == 1
+
+    def test_process_idd_error(self, tmp_path, monkeypatch):
+
+        # Any error is returned instead of raised, so the other files still get processed
+        def parse_idd(self, file_path):
+            raise KeyError('field')
+            yield
+
+        monkeypatch.setattr(parser.IDDParser, 'parse_idd', parse_idd)
+        monkeypatch.setattr(config, 'DATA_DIR', config.DATA_DIR)
+        file_path = os.path.join(SAMPLE_DIR, 'EnergyPlus_IDD_v7.2.0.006.idd')
+        assert precompile.process_idd(file_path, str(tmp_path)) == \
+            (file_path, None, "KeyError: 'field'")
+        assert os.listdir(str(tmp_path)) == list()
@@ -0,0 +1,25 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""IDF+ is an enhanced editor for idf files—the text-based, simulation input files for EnergyPlus.
+
+:copyright: (c) 2019 by Matt Doiron.
+:license: GPL v3, see LICENSE for more details.
+"""
+
+# Package imports
+from idfplus.models.classtable import wildcard_regex
+
+
+def test_wildcard_regex():
+    """Test wildcard patterns of the filter box.
+    """
+
+    assert wildcard_regex('zone*one').search('Zone Number One')
+    assert wildcard_regex('zone ?').search('Zone 1')
+    assert wildcard_regex('zone [0-9]').search('Zone 1')
+    assert not wildcard_regex('zone [!0-9]').search('Zone 1')
+    assert not wildcard_regex('Zone', case_sensitive=True).search('zone')
+
+    # Invalid sets, like reversed ranges, are matched literally
+    assert wildcard_regex('zone [z-a]').search('Zone [z-a]')
+    assert not wildcard_regex('zone [z-a]').search('Zone b')